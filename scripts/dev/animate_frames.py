@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+1枚のマスターフレームからアニメーションフレームを合成
+
+待機の上下動（bob）、伸縮（breathe）、歩行（walk）、被弾の反動（recoil）、
+回転（spin）、拡縮の明滅（pulse）を、フレームごとのパラメータ（移動・拡大率・角度）
+を返すモーションカーブとして定義し、アフィン変換を NumPy の1回のバッチ処理
+（最近傍サンプリング、ピクセルアートの色を崩さない）で計算します。同じサイズ・
+同じシーケンスのアセット（敵の一覧など）は積み重ねて、全アセットの全フレームを
+まとめて処理します。1枚だけの場合や NumPy がない場合は Pillow の
+Image.transform でフレームごとに処理します。
+
+アセット設定（PROMPTS）の "motion" でモーションを指定でき、省略時は
+"animation" から決めます（idle → bob、walk → walk、hit → recoil）。
+
+使用例:
+    # 単一フレームから4フレームの待機アニメーション
+    python3 animate_frames.py basic_enemy_single.png basic_enemy_idle_32x32_4f.png --motion bob --frames 4
+
+    # PROMPTS の全アニメーションアセットの final_output を合成し直す
+    python3 animate_frames.py --assets
+
+    # 敵ごとに追加のシーケンスも書き出す（<name>_<motion>_WxH_Nf.png）
+    python3 animate_frames.py --assets basic_enemy fast_enemy --extra recoil:2,spin:8
+
+    # モーション一覧
+    python3 animate_frames.py --list
+
+必要なライブラリ:
+    pip install Pillow numpy
+"""
+
+import sys
+import math
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any, Callable
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pillowのみの処理にフォールバック
+
+from godot_resources import FRAME_SPEC_PATTERN, parse_frame_spec
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+# フレームごとのパラメータ: (dx, dy, sx, sy, angle)
+#   dx, dy: 移動量（フレームの幅・高さに対する比率）
+#   sx, sy: 拡大率
+#   angle: 反時計回りの角度（度）
+Params = Tuple[float, float, float, float, float]
+
+
+def _phase(i: int, n: int) -> float:
+    """ループするモーションの位相（0〜1、最終フレームの次が先頭に戻る）"""
+    return i / n
+
+
+def _progress(i: int, n: int) -> float:
+    """ループしないモーションの進行度（0〜1、最終フレームで1）"""
+    return i / (n - 1) if n > 1 else 1.0
+
+
+def _static(i: int, n: int, a: float) -> Params:
+    return 0.0, 0.0, 1.0, 1.0, 0.0
+
+
+def _bob(i: int, n: int, a: float) -> Params:
+    lift = 0.5 - 0.5 * math.cos(2 * math.pi * _phase(i, n))
+    return 0.0, -0.06 * a * lift, 1.0, 1.0, 0.0
+
+
+def _breathe(i: int, n: int, a: float) -> Params:
+    s = 0.06 * a * math.sin(2 * math.pi * _phase(i, n))
+    return 0.0, 0.0, 1.0 + s, 1.0 - s, 0.0
+
+
+def _walk(i: int, n: int, a: float) -> Params:
+    t = _phase(i, n)
+    lift = abs(math.sin(2 * math.pi * t))
+    s = 0.04 * a * (1.0 - lift)
+    return 0.0, -0.05 * a * lift, 1.0 + s, 1.0 - s, 6.0 * a * math.sin(2 * math.pi * t)
+
+
+def _recoil(i: int, n: int, a: float) -> Params:
+    e = (1.0 - _progress(i, n)) ** 2
+    return 0.0, 0.08 * a * e, 1.0 + 0.12 * a * e, 1.0 - 0.12 * a * e, 0.0
+
+
+def _spin(i: int, n: int, a: float) -> Params:
+    return 0.0, 0.0, 1.0, 1.0, 360.0 * a * _phase(i, n)
+
+
+def _pulse(i: int, n: int, a: float) -> Params:
+    s = 1.0 + 0.08 * a * math.sin(2 * math.pi * _phase(i, n))
+    return 0.0, 0.0, s, s, 0.0
+
+
+# モーション名 -> (カーブ, 変形の基準点（フレームに対する比率）, 説明)
+MOTIONS: Dict[str, Tuple[Callable[[int, int, float], Params], Tuple[float, float], str]] = {
+    "static": (_static, (0.5, 0.5), "identical frames (same as tile_frames)"),
+    "bob": (_bob, (0.5, 1.0), "idle: vertical bob"),
+    "breathe": (_breathe, (0.5, 1.0), "idle: squash/stretch anchored at the feet"),
+    "walk": (_walk, (0.5, 1.0), "walk: bob + tilt + squash on landing"),
+    "recoil": (_recoil, (0.5, 1.0), "hit: knocked back and squashed, then recovers (non-looping)"),
+    "spin": (_spin, (0.5, 0.5), "full rotation around the centre (projectiles, pickups)"),
+    "pulse": (_pulse, (0.5, 0.5), "uniform scale pulse (orbs, effects)"),
+}
+
+# "animation" -> モーション（"motion" が未指定の場合）
+DEFAULT_MOTIONS = {
+    "idle": "bob",
+    "walk": "walk",
+    "hit": "recoil",
+}
+
+
+def motion_for(config: Dict[str, Any]) -> str:
+    """
+    アセット設定からモーション名を決める
+
+    Args:
+        config: アセット設定（PROMPTS の値）
+
+    Returns:
+        モーション名（"motion" → "animation" の既定 → "static" の順）
+    """
+    motion = config.get("motion") or DEFAULT_MOTIONS.get(config.get("animation", ""), "static")
+    if motion not in MOTIONS:
+        raise ValueError(f"Unknown motion: {motion} (available: {', '.join(MOTIONS)})")
+    return motion
+
+
+def motion_params(motion: str, num_frames: int, amplitude: float = 1.0) -> List[Params]:
+    """
+    モーションカーブをサンプリング
+
+    Args:
+        motion: モーション名
+        num_frames: フレーム数
+        amplitude: 動きの大きさ（1.0で既定）
+
+    Returns:
+        フレームごとのパラメータ
+    """
+    if motion not in MOTIONS:
+        raise ValueError(f"Unknown motion: {motion} (available: {', '.join(MOTIONS)})")
+    curve = MOTIONS[motion][0]
+    return [curve(i, num_frames, amplitude) for i in range(num_frames)]
+
+
+def inverse_matrix(params: Params, size: Tuple[int, int], anchor: Tuple[float, float]) -> List[float]:
+    """
+    出力座標 -> 入力座標 のアフィン行列（2x3、Image.transform の AFFINE と同じ並び）
+
+    順方向は p' = c + R·S·(p - c) + t（c: 基準点、R: 回転、S: 拡大、t: 移動）。
+    """
+    dx, dy, sx, sy, angle = params
+    width, height = size
+    cx, cy = anchor[0] * width, anchor[1] * height
+    tx, ty = dx * width, dy * height
+
+    # 画像座標（y下向き）で反時計回りの回転の逆行列
+    theta = math.radians(angle)
+    cos, sin = math.cos(theta), math.sin(theta)
+    a, b = cos / sx, -sin / sx
+    c, d = sin / sy, cos / sy
+
+    # p = c + S^-1·R^-1·(p' - c - t)
+    ox, oy = -cx - tx, -cy - ty
+    return [a, b, cx + a * ox + b * oy, c, d, cy + c * ox + d * oy]
+
+
+def _sample_index(matrices: List[List[float]], size: Tuple[int, int]) -> "np.ndarray":
+    """
+    全フレームの出力ピクセルが参照する入力ピクセルの番号（最近傍）
+
+    入力は右端・下端に透明ピクセルを1列・1行足した (H+1)x(W+1) を平坦化したものとし、
+    範囲外はその透明ピクセルを指す。回転のないフレーム（移動・拡大のみ）は行と列の
+    参照先が独立なので、1次元の座標 (N, H) / (N, W) だけを計算する。
+
+    Returns:
+        (H, N, W) の番号。この並びで集めると reshape(H, N*W) がそのまま横並びのシートになる
+    """
+    width, height = size
+    stride = width + 1
+    transparent = (height + 1) * stride - 1
+
+    m = np.asarray(matrices, dtype=np.float64).reshape(-1, 2, 3)
+    xs = np.arange(width) + 0.5
+    ys = np.arange(height) + 0.5
+    index = np.empty((height, len(m), width), dtype=np.int32)
+
+    axis_aligned = (m[:, 0, 1] == 0) & (m[:, 1, 0] == 0)
+    aligned = np.flatnonzero(axis_aligned)
+    rotated = np.flatnonzero(~axis_aligned)
+
+    if len(aligned):
+        a = m[aligned]
+        ix = np.floor(a[:, 0, 0, None] * xs + a[:, 0, 2, None]).astype(np.int32)
+        iy = np.floor(a[:, 1, 1, None] * ys + a[:, 1, 2, None]).astype(np.int32)
+        ix[(ix < 0) | (ix >= width)] = width
+        iy[(iy < 0) | (iy >= height)] = height
+        index[:, aligned] = (iy * stride).T[:, :, None] + ix[None]
+
+    if len(rotated):
+        # 行ごとの項 (H, N) と列ごとの項 (N, W) の和。+width/+height で正の値にして切り捨て = floor
+        r = m[rotated]
+        ix = ((r[:, 0, 1, None] * ys + r[:, 0, 2, None] + width).T[:, :, None]
+              + (r[:, 0, 0, None] * xs)[None]).astype(np.int32) - width
+        iy = ((r[:, 1, 1, None] * ys + r[:, 1, 2, None] + height).T[:, :, None]
+              + (r[:, 1, 0, None] * xs)[None]).astype(np.int32) - height
+        outside = (ix.view(np.uint32) >= width) | (iy.view(np.uint32) >= height)
+        rotated_index = iy * stride + ix
+        rotated_index[outside] = transparent
+        index[:, rotated] = rotated_index
+
+    return index
+
+
+def _warp_numpy(frames: List[Image.Image], matrices: List[List[float]]) -> "np.ndarray":
+    """
+    同じサイズのマスターフレームをまとめて変換
+
+    参照先の計算はフレームの積み重ねで共有し、集める処理は1回で行う。
+
+    Returns:
+        (M, H, N*W, 4) の uint8（M: マスターフレーム数、N: 変換の数）
+    """
+    width, height = frames[0].size
+    stack = np.zeros((len(frames), height + 1, width + 1), dtype=np.uint32)
+    for i, frame in enumerate(frames):
+        # RGBA を uint32 1要素として扱う
+        stack[i, :height, :width] = np.ascontiguousarray(np.asarray(frame)).view(np.uint32)[..., 0]
+
+    index = _sample_index(matrices, (width, height))
+    out = np.take(stack.reshape(len(frames), -1), index.reshape(height, -1), axis=1)
+    return out.view(np.uint8).reshape(len(frames), height, len(matrices) * width, 4)
+
+
+def _warp_pillow(frame: Image.Image, matrices: List[List[float]]) -> List[Image.Image]:
+    return [
+        frame.transform(frame.size, Image.Transform.AFFINE, data=tuple(m),
+                        resample=Image.Resampling.NEAREST, fillcolor=(0, 0, 0, 0))
+        for m in matrices
+    ]
+
+
+def synthesize_stack(
+    frames: List[Image.Image],
+    sequences: Dict[str, int],
+    amplitude: float = 1.0,
+    use_numpy: bool = True
+) -> List[Dict[str, Image.Image]]:
+    """
+    同じサイズのマスターフレーム群から、それぞれ複数のモーションのスプライトシートを合成
+
+    NumPy の場合、(マスターフレーム × 全シーケンスの全フレーム) を1回のバッチ変換で計算する
+    （参照先の計算を共有できるので、多数の敵を同じ設定でまとめて処理する場合に効く）。
+    マスターフレームが1枚だけなら Pillow の Image.transform の方が速いのでそちらを使う。
+
+    Args:
+        frames: マスターフレーム（すべて同じサイズ）
+        sequences: {モーション名: フレーム数}
+        amplitude: 動きの大きさ
+        use_numpy: NumPyが使える場合にNumPyで処理するか
+
+    Returns:
+        マスターフレームごとの {モーション名: 横並びのスプライトシート（RGBA）}
+    """
+    if not frames:
+        return []
+    frames = [frame if frame.mode == "RGBA" else frame.convert("RGBA") for frame in frames]
+    size = frames[0].size
+    if any(frame.size != size for frame in frames):
+        raise ValueError("All master frames in a stack must have the same size")
+
+    matrices = []
+    for motion, num_frames in sequences.items():
+        if num_frames < 1:
+            raise ValueError(f"{motion}: number of frames must be at least 1")
+        params = motion_params(motion, num_frames, amplitude)
+        anchor = MOTIONS[motion][1]
+        matrices.extend(inverse_matrix(p, size, anchor) for p in params)
+
+    width, height = size
+    results = []
+    if use_numpy and np is not None and len(frames) > 1:
+        strips = _warp_numpy(frames, matrices)
+        for strip in strips:
+            sheets = {}
+            start = 0
+            for motion, num_frames in sequences.items():
+                sheets[motion] = Image.fromarray(
+                    np.ascontiguousarray(strip[:, start * width:(start + num_frames) * width]), "RGBA"
+                )
+                start += num_frames
+            results.append(sheets)
+    else:
+        for frame in frames:
+            warped = _warp_pillow(frame, matrices)
+            sheets = {}
+            start = 0
+            for motion, num_frames in sequences.items():
+                sheet = Image.new("RGBA", (width * num_frames, height), (0, 0, 0, 0))
+                for i, image in enumerate(warped[start:start + num_frames]):
+                    sheet.paste(image, (width * i, 0))
+                sheets[motion] = sheet
+                start += num_frames
+            results.append(sheets)
+    return results
+
+
+def synthesize_batch(
+    frame: Image.Image,
+    sequences: Dict[str, int],
+    amplitude: float = 1.0,
+    use_numpy: bool = True
+) -> Dict[str, Image.Image]:
+    """
+    1枚のマスターフレームから複数のモーションのスプライトシートをまとめて合成
+
+    Args:
+        frame: マスターフレーム
+        sequences: {モーション名: フレーム数}
+        amplitude: 動きの大きさ
+        use_numpy: NumPyが使える場合にNumPyで処理するか
+
+    Returns:
+        {モーション名: 横並びのスプライトシート（RGBA）}
+    """
+    return synthesize_stack([frame], sequences, amplitude, use_numpy)[0]
+
+
+def fit_frame(frame: Image.Image, output) -> Image.Image:
+    """
+    マスターフレームを出力ファイル名のフレームサイズ（_<W>x<H>_<N>f）に縮小
+
+    DALL-E の単一フレーム（1024px）をそのまま合成すると、名前と実サイズが
+    食い違ったシートになるため、合成の前に呼ぶ。
+
+    Args:
+        frame: マスターフレーム
+        output: 出力パス（フレーム指定がなければ縮小しない）
+
+    Returns:
+        フレーム画像（サイズが同じ場合は frame そのもの）
+    """
+    spec = parse_frame_spec(output)
+    if spec is None or frame.size == spec[:2]:
+        return frame
+    return frame.resize(spec[:2], Image.Resampling.LANCZOS)
+
+
+def synthesize_sheet(
+    frame: Image.Image,
+    motion: str,
+    num_frames: int,
+    amplitude: float = 1.0,
+    use_numpy: bool = True
+) -> Image.Image:
+    """
+    1枚のマスターフレームから1つのモーションのスプライトシートを合成
+
+    Args:
+        frame: マスターフレーム
+        motion: モーション名
+        num_frames: フレーム数
+        amplitude: 動きの大きさ
+        use_numpy: NumPyが使える場合にNumPyで処理するか
+
+    Returns:
+        横並びのスプライトシート（RGBA）
+    """
+    if motion == "static":
+        from create_sprite_sheet import tile_frames
+        return tile_frames(frame, num_frames)
+    return synthesize_batch(frame, {motion: num_frames}, amplitude, use_numpy)[motion]
+
+
+def extra_path(final_output: str, motion: str, num_frames: int) -> str:
+    """追加シーケンスの出力パス（<name>_<motion>_WxH_Nf.png）"""
+    match = FRAME_SPEC_PATTERN.search(final_output)
+    if not match:
+        raise ValueError(f"final_output does not follow <name>_WxH_Nf.png: {final_output}")
+    stem = final_output[:match.start()]
+    return f"{stem}_{motion}_{match.group(1)}x{match.group(2)}_{num_frames}f.png"
+
+
+def parse_sequences(value: str) -> Dict[str, int]:
+    """"recoil:2,spin:8" -> {"recoil": 2, "spin": 8}"""
+    sequences = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        motion, _, frames = item.strip().partition(":")
+        if motion not in MOTIONS:
+            raise ValueError(f"Unknown motion: {motion} (available: {', '.join(MOTIONS)})")
+        sequences[motion] = int(frames) if frames else 4
+    return sequences
+
+
+def animate_assets(
+    asset_names: List[str],
+    base_dir: Path,
+    extra: Optional[Dict[str, int]] = None,
+    amplitude: float = 1.0
+) -> Dict[str, List[Path]]:
+    """
+    PROMPTS のアセットの単一フレームから final_output（と追加シーケンス）を合成
+
+    Args:
+        asset_names: アセット名
+        base_dir: プロジェクトルート
+        extra: 追加で書き出すシーケンス {モーション名: フレーム数}
+        amplitude: 動きの大きさ
+
+    Returns:
+        {アセット名: 書き出したファイル}
+    """
+    from generate_asset_with_dalle import PROMPTS
+
+    # (サイズ, シーケンス) ごとにまとめて1回のバッチで合成
+    groups: Dict[Tuple[Any, ...], List[Tuple[str, Image.Image, Dict[str, Path]]]] = {}
+    separate = []
+    for name in asset_names:
+        config = PROMPTS[name]
+        with Image.open(base_dir / config["output"]) as img:
+            # 追加シーケンスも final_output と同じフレームサイズ
+            frame = fit_frame(img.convert("RGBA"), config["final_output"])
+
+        main_motion = motion_for(config)
+        sequences = {main_motion: config["frames"]}
+        outputs = {main_motion: base_dir / config["final_output"]}
+        for motion, num_frames in (extra or {}).items():
+            path = base_dir / extra_path(config["final_output"], motion, num_frames)
+            if motion != main_motion:
+                sequences[motion] = num_frames
+                outputs[motion] = path
+            elif num_frames != config["frames"]:
+                # 本来のモーションを別のフレーム数で追加する場合だけは個別に計算
+                separate.append((name, frame, motion, num_frames, path))
+
+        key = (frame.size, tuple(sequences.items()))
+        groups.setdefault(key, []).append((name, frame, outputs))
+
+    written: Dict[str, List[Path]] = {name: [] for name in asset_names}
+
+    def save_sheet(name: str, sheet: Image.Image, output: Path):
+        output.parent.mkdir(parents=True, exist_ok=True)
+        sheet.save(output, "PNG")
+        written[name].append(output)
+
+    for (_, sequences), members in groups.items():
+        stacked = synthesize_stack([frame for _, frame, _ in members], dict(sequences), amplitude)
+        for (name, _, outputs), sheets in zip(members, stacked):
+            for motion, sheet in sheets.items():
+                save_sheet(name, sheet, outputs[motion])
+
+    for name, frame, motion, num_frames, path in separate:
+        save_sheet(name, synthesize_sheet(frame, motion, num_frames, amplitude), path)
+
+    return written
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Synthesize animation frames from a single master frame")
+    parser.add_argument("input", nargs="?", help="Master frame (single-frame PNG)")
+    parser.add_argument("output", nargs="?", help="Output sprite sheet")
+    parser.add_argument("--motion", default="bob", help="Motion curve (default: bob)")
+    parser.add_argument("--frames", type=int, default=4, help="Number of frames (default: 4)")
+    parser.add_argument("--amplitude", type=float, default=1.0, help="Motion strength (default: 1.0)")
+    parser.add_argument("--assets", nargs="*", help="Rebuild final_output of these PROMPTS assets (no names: all animated)")
+    parser.add_argument("--extra", default="", help="With --assets, also write these sequences, e.g. recoil:2,spin:8")
+    parser.add_argument("--list", action="store_true", help="List motions")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, anchor, description) in MOTIONS.items():
+            print(f"  - {name:<8} {description}")
+        return
+
+    if args.assets is not None:
+        from generate_asset_with_dalle import PROMPTS
+
+        base_dir = Path(args.base_dir)
+        asset_names = args.assets or [
+            name for name, config in PROMPTS.items() if config["frames"] > 0 and config["final_output"]
+        ]
+        unknown = [name for name in asset_names if name not in PROMPTS]
+        if unknown:
+            print(f"❌ Error: Unknown asset(s): {', '.join(unknown)}")
+            sys.exit(1)
+
+        missing = [name for name in asset_names if not (base_dir / PROMPTS[name]["output"]).exists()]
+        if missing:
+            print(f"⚠️  Skipping assets without a single frame: {', '.join(missing)}")
+
+        try:
+            extra = parse_sequences(args.extra)
+            written = animate_assets([n for n in asset_names if n not in missing], base_dir, extra, args.amplitude)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+
+        for name, paths in written.items():
+            print(f"✅ {name} ({motion_for(PROMPTS[name])}): {', '.join(p.name for p in paths)}")
+        if missing:
+            sys.exit(1)
+        return
+
+    if not args.input or not args.output:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.motion not in MOTIONS:
+        print(f"❌ Error: Unknown motion: {args.motion} (available: {', '.join(MOTIONS)})")
+        sys.exit(1)
+    if args.frames < 1:
+        print(f"❌ Error: Invalid number of frames: {args.frames}")
+        sys.exit(1)
+
+    try:
+        with Image.open(args.input) as img:
+            frame = img.convert("RGBA")
+    except Exception as e:
+        print(f"❌ Error: Failed to open image: {e}")
+        sys.exit(1)
+
+    sheet = synthesize_sheet(fit_frame(frame, args.output), args.motion, args.frames, args.amplitude)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    sheet.save(args.output, "PNG")
+    print(f"✅ {args.motion} x{args.frames}: {args.output} ({sheet.size[0]}×{sheet.size[1]})")
+
+
+if __name__ == "__main__":
+    main()
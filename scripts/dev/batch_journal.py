@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+バッチ生成のジャーナル（中断からの再開用）
+
+アセットごとの進行状態（requested → downloaded → sheeted → done / failed）を
+追記専用のJSONLに1行ずつ記録します。各行は書き込みごとに fsync するため、
+ネットワーク断・レート制限・Ctrl-C で処理が止まっても、それまでの状態は
+失われません（書きかけの最終行は読み込み時に無視します）。
+
+再開時は、完了済みで定義（プロンプト等）が変わっておらず出力も残っている
+アセットを飛ばし、失敗・未完了のものだけを処理し直します。
+
+使用例（Python）:
+    journal = BatchJournal(Path(".cache/batches/mvp.jsonl"))
+    journal.record("player_idle", "requested", fingerprint=fingerprint(config))
+    journal.record("player_idle", "done")
+    journal.completed()  # {"player_idle": "<fingerprint>"}
+
+使用例（CLI、状態の確認）:
+    python3 batch_journal.py .cache/batches/mvp.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+
+# 状態の順序（後のものほど進んでいる）
+STATES = ("requested", "downloaded", "sheeted", "done")
+FAILED = "failed"
+
+
+def fingerprint(config: Dict[str, Any]) -> str:
+    """
+    アセット定義の指紋（定義が変わったら完了済みでも作り直すため）
+
+    Args:
+        config: PROMPTS のエントリ
+
+    Returns:
+        SHA-256の16進文字列（先頭16文字）
+    """
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchJournal:
+    """追記専用のバッチジャーナル（スレッドセーフ）"""
+
+    def __init__(self, path: Path, resume: bool = True):
+        """
+        初期化
+
+        Args:
+            path: ジャーナルファイル（JSONL）
+            resume: 既存の記録を引き継ぐか（Falseの場合は空から始める）
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            for entry in self._read():
+                self._apply(entry)
+        else:
+            _fsync_replace(self.path, b"")
+
+        self._file = open(self.path, "ab")
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """ジャーナルを読む（壊れた行は無視する）"""
+        entries = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return [entry for entry in entries if isinstance(entry, dict) and "asset" in entry]
+
+    def _apply(self, entry: Dict[str, Any]):
+        state = self._state.setdefault(entry["asset"], {})
+        if entry.get("state") == "requested":
+            # 新しい試行の開始（前回の状態をリセット）
+            state.clear()
+        state.update(entry)
+
+    def record(self, asset: str, state: str, **extra):
+        """
+        状態を1行追記して fsync する
+
+        Args:
+            asset: アセット名
+            state: STATES のいずれか、または FAILED
+            **extra: 追加情報（fingerprint, error など）
+        """
+        entry = {"asset": asset, "state": state, "time": round(time.time(), 3), **extra}
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(entry)
+
+    def state(self, asset: str) -> Optional[str]:
+        """アセットの最新の状態（記録がなければNone）"""
+        with self._lock:
+            return self._state.get(asset, {}).get("state")
+
+    def completed(self) -> Dict[str, str]:
+        """完了済みアセットの {アセット名: 指紋}"""
+        with self._lock:
+            return {
+                asset: entry.get("fingerprint", "")
+                for asset, entry in self._state.items()
+                if entry.get("state") == "done"
+            }
+
+    def summary(self) -> Dict[str, List[str]]:
+        """状態ごとのアセット名"""
+        with self._lock:
+            result: Dict[str, List[str]] = {}
+            for asset, entry in self._state.items():
+                result.setdefault(entry.get("state", "unknown"), []).append(asset)
+            return result
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _fsync_replace(path: Path, content: bytes):
+    """一時ファイルに書いて fsync してから置き換える（ディレクトリも fsync）"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Show the state of a batch generation journal")
+    parser.add_argument("journal", help="Journal file (JSONL)")
+    args = parser.parse_args()
+
+    path = Path(args.journal)
+    if not path.exists():
+        print(f"❌ Error: Journal not found: {path}")
+        sys.exit(1)
+
+    with BatchJournal(path) as journal:
+        summary = journal.summary()
+
+    icons = {"done": "✅", FAILED: "❌"}
+    for state in (*STATES, FAILED):
+        for asset in sorted(summary.get(state, [])):
+            print(f"{icons.get(state, '⏸️ ')} {asset:<20} {state}")
+
+    total = sum(len(assets) for assets in summary.values())
+    print(f"\n{len(summary.get('done', []))}/{total} done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+アセットパイプラインのベンチマーク
+
+ネットワークを使わず、乱数シード固定の合成画像（DALL-E出力相当の
+1024x1024 / 1792x1024、数百フレームのシート）で各ステージを計測します。
+ケースごとに新しいプロセスで実行し、実行時間・ピークRSS・スループットを
+記録します。ベースライン（JSON）と比較して閾値を超えて遅く（重く）なった
+場合は終了コード1を返すため、性能改善の効果確認や退行検出に使えます。
+
+使用例:
+    # 全ケースを計測してベースラインとして保存
+    # （config/benchmarks/pipeline_baseline.json。コミットして比較の基準にする）
+    python3 benchmark_pipeline.py --save-baseline
+
+    # ベースラインと比較（20%以上の退行で失敗）
+    python3 benchmark_pipeline.py --compare --threshold 0.2
+
+    # 一部のケースのみ（fnmatch形式）
+    python3 benchmark_pipeline.py --cases "pixelize*" --repeat 5
+
+    # CLIの起動時間のみ（--list / --validate / --dry-run）
+    python3 benchmark_pipeline.py --cases "startup/*"
+
+必要なライブラリ:
+    pip install Pillow numpy
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import fnmatch
+import platform
+import argparse
+import resource
+import subprocess
+import tempfile
+import contextlib
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pillowのみの処理にフォールバック
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+# リポジトリで管理するベースライン（.cache/ は .gitignore 対象のため置かない）
+DEFAULT_BASELINE = Path("config") / "benchmarks" / "pipeline_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+# 合成画像のシード
+SEED = 20240601
+
+
+def _noise(width: int, height: int, seed: int) -> Image.Image:
+    """seed で決まるノイズ画像（平均128・標準偏差64の正規分布、Lモード）"""
+    if np is not None:
+        values = np.random.default_rng(seed).normal(128, 64, (height, width))
+        return Image.fromarray(values.clip(0, 255).astype(np.uint8), "L")
+    return Image.frombytes("L", (width, height), random.Random(seed).randbytes(width * height))
+
+
+def synthetic_image(width: int, height: int, seed: int = SEED, mode: str = "RGB") -> Image.Image:
+    """
+    DALL-E出力に近い合成画像（暗い背景 + 中央のグラデーションと模様）
+
+    同じ引数なら常に同じ画像になる（ノイズは seed から生成。NumPyが無い場合は
+    標準ライブラリの乱数で生成するため、NumPyの有無で画像は異なる）。
+    """
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = _noise(width, height, seed)
+    r = Image.eval(base, lambda v: (v * 7 + seed) % 256)
+    g = Image.blend(base.transpose(Image.Transpose.ROTATE_90).resize((width, height)), noise, 0.5)
+    b = Image.eval(noise, lambda v: (v * 3 + seed // 7) % 256)
+    img = Image.merge("RGB", (r, g, b))
+
+    # 外周を暗くして背景の透過処理が働くようにする
+    mask = Image.new("L", (width, height), 0)
+    mask.paste(255, (width // 5, height // 6, width * 4 // 5, height * 5 // 6))
+    img = Image.composite(img, Image.new("RGB", (width, height), (8, 8, 8)), mask)
+
+    return img.convert(mode) if mode != "RGB" else img
+
+
+def _sheet_frames(num_frames: int, size: int) -> Image.Image:
+    """size×size のフレームが num_frames 枚並んだシート（フレームごとに少しずつ異なる）"""
+    frame = synthetic_image(size, size, mode="RGBA")
+    sheet = Image.new("RGBA", (size * num_frames, size), (0, 0, 0, 0))
+    for i in range(num_frames):
+        sheet.paste(frame.rotate(i % 8 * 45), (i * size, 0))
+    return sheet
+
+
+# ---------------------------------------------------------------------------
+# ケース
+# ---------------------------------------------------------------------------
+# 各ケースは (準備関数, 計測対象関数, 入力画素数) を返す。準備は計測に含めない。
+
+def _case_convert_to_pixel_art(width: int, height: int):
+    from convert_dalle_to_pixelart import convert_to_pixel_art
+
+    tmp = Path(tempfile.mkdtemp())
+    input_path = tmp / "input_single.png"
+    synthetic_image(width, height).save(input_path)
+
+    def run():
+        convert_to_pixel_art(str(input_path), str(tmp / "output.png"), 48, 4, 16, verbose=False)
+
+    return run, width * height
+
+
+def _case_pixelize(width: int, height: int):
+    from convert_dalle_to_pixelart import pixelize
+
+    img = synthetic_image(width, height)
+    return (lambda: pixelize(img, 48, 4, 16)), width * height
+
+
+def _case_create_sprite_sheet(width: int, height: int, num_frames: int):
+    from create_sprite_sheet import create_sprite_sheet
+
+    tmp = Path(tempfile.mkdtemp())
+    input_path = tmp / "frame.png"
+    synthetic_image(width, height, mode="RGBA").save(input_path)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_sprite_sheet(str(input_path), str(tmp / "sheet.png"), num_frames)
+
+    return run, width * height * num_frames
+
+
+def _case_generator_sprite_sheet(width: int, height: int, num_frames: int):
+    from generate_asset_with_dalle import DALLEAssetGenerator
+
+    tmp = Path(tempfile.mkdtemp())
+    synthetic_image(width, height, mode="RGBA").save(tmp / "frame.png")
+    generator = DALLEAssetGenerator(api_key="benchmark", base_dir=str(tmp))
+
+    def run():
+        if not generator._create_sprite_sheet("frame.png", "sheet.png", num_frames):
+            raise RuntimeError("_create_sprite_sheet failed")
+
+    return run, width * height * num_frames
+
+
+def _case_tile_frames(size: int, num_frames: int):
+    from create_sprite_sheet import tile_frames
+
+    frame = synthetic_image(size, size, mode="RGBA")
+    return (lambda: tile_frames(frame, num_frames)), size * size * num_frames
+
+
+def _case_animate_frames(size: int, assets: int, use_numpy: bool):
+    from animate_frames import synthesize_stack
+
+    frames = [synthetic_image(size, size, seed=SEED + i, mode="RGBA") for i in range(assets)]
+    sequences = {"bob": 4, "walk": 4, "recoil": 2}
+
+    def run():
+        synthesize_stack(frames, sequences, use_numpy=use_numpy)
+
+    return run, size * size * 10 * assets
+
+
+def _case_pack_atlas(size: int, num_frames: int):
+    from pack_atlas import split_frames, pack_frames
+
+    sheet = _sheet_frames(num_frames, size)
+
+    def run():
+        pack_frames(split_frames(sheet, f"bench_{size}x{size}_{num_frames}f"), max_size=4096)
+
+    return run, sheet.size[0] * sheet.size[1]
+
+
+def _case_palette_apply(width: int, height: int):
+    from palette import build_palette
+
+    img = synthetic_image(width, height)
+    palette = build_palette([img], 16)
+    palette.lut  # LUTの計算は計測に含めない
+    return (lambda: palette.apply(img)), width * height
+
+
+def _case_png_optimize(size: int, num_frames: int, search: bool):
+    from convert_dalle_to_pixelart import pixelize, binarize_alpha
+    from png_optimize import optimize_image
+
+    sheet = binarize_alpha(pixelize(synthetic_image(size * num_frames * 4, size * 4), size, num_frames, 16))
+    return (lambda: optimize_image(sheet, indexed=True, search=search)), sheet.size[0] * sheet.size[1]
+
+
+def _case_cli_startup(script: str, *argv: str):
+    """CLIを子プロセスで起動して終了までの時間（インポートを含む起動コスト）を計測"""
+    tmp = Path(tempfile.mkdtemp())
+    command = [sys.executable, str(Path(__file__).resolve().parent / script), *argv, "--base-dir", str(tmp)]
+
+    def run():
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env={**os.environ, "OPENAI_API_KEY": ""})
+
+    return run, 0
+
+
+CASES: Dict[str, Tuple[Callable, tuple]] = {
+    "convert_to_pixel_art/1024x1024": (_case_convert_to_pixel_art, (1024, 1024)),
+    "convert_to_pixel_art/1792x1024": (_case_convert_to_pixel_art, (1792, 1024)),
+    "pixelize/1024x1024": (_case_pixelize, (1024, 1024)),
+    "pixelize/1792x1024": (_case_pixelize, (1792, 1024)),
+    "create_sprite_sheet/1024x1024x4": (_case_create_sprite_sheet, (1024, 1024, 4)),
+    "create_sprite_sheet/48x48x400": (_case_create_sprite_sheet, (48, 48, 400)),
+    "_create_sprite_sheet/1024x1024x4": (_case_generator_sprite_sheet, (1024, 1024, 4)),
+    "_create_sprite_sheet/1792x1024x6": (_case_generator_sprite_sheet, (1792, 1024, 6)),
+    "tile_frames/48x48x400": (_case_tile_frames, (48, 400)),
+    "animate_frames/32x32x200": (_case_animate_frames, (32, 200, True)),
+    "animate_frames_pillow/32x32x200": (_case_animate_frames, (32, 200, False)),
+    "animate_frames/1024x1024x1": (_case_animate_frames, (1024, 1, True)),
+    "pack_atlas/48x48x400": (_case_pack_atlas, (48, 400)),
+    "palette_apply/1024x1024": (_case_palette_apply, (1024, 1024)),
+    "png_optimize/48x48x4": (_case_png_optimize, (48, 4, False)),
+    "png_optimize_search/48x48x4": (_case_png_optimize, (48, 4, True)),
+    "startup/generate_list": (_case_cli_startup, ("generate_asset_with_dalle.py", "--list")),
+    "startup/generate_validate": (_case_cli_startup, ("generate_asset_with_dalle.py", "--validate")),
+    "startup/generate_dry_run": (_case_cli_startup, ("generate_asset_with_dalle.py", "--dry-run",
+                                                     "--batch", "player_idle,basic_enemy,straight_shot")),
+}
+
+
+def _peak_rss_mb() -> float:
+    """このプロセスのピークRSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(name: str, repeat: int) -> Dict[str, Any]:
+    """ワーカープロセスで1ケースを計測"""
+    factory, args = CASES[name]
+    run, pixels = factory(*args)
+    rss_before = _peak_rss_mb()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    seconds = min(timings)
+    return {
+        "seconds": seconds,
+        "median_seconds": statistics.median(timings),
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - rss_before,
+        "mpix_per_s": pixels / seconds / 1e6 if seconds > 0 else 0.0,
+    }
+
+
+def run_benchmarks(names: List[str], repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    ケースを1つずつ新しいプロセスで実行（ピークRSSがケース間で混ざらないように）
+
+    Returns:
+        {ケース名: 計測結果}
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                results[name] = executor.submit(_run_case, name, repeat).result()
+            except Exception as e:
+                print(f"  ❌ {name}: {e}")
+                continue
+
+        r = results[name]
+        print(f"  {name:<36} {r['seconds'] * 1000:9.1f} ms  {r['peak_rss_mb']:7.1f} MB "
+              f"(+{r['rss_growth_mb']:.1f})  {r['mpix_per_s']:8.1f} MPix/s")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    ベースラインと比較し、閾値を超えた退行を返す
+
+    時間は最小値、メモリはピークRSSの増分で比較する（小さな値の揺れは無視）。
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+
+        limit = base["seconds"] * (1 + threshold)
+        if result["seconds"] > limit and result["seconds"] - base["seconds"] > 0.002:
+            regressions.append(
+                f"{name}: time {base['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms "
+                f"({100 * (result['seconds'] / base['seconds'] - 1):+.0f}%)"
+            )
+
+        rss_limit = base["rss_growth_mb"] * (1 + threshold)
+        if result["rss_growth_mb"] > rss_limit and result["rss_growth_mb"] - base["rss_growth_mb"] > 8:
+            regressions.append(
+                f"{name}: memory +{base['rss_growth_mb']:.1f} -> +{result['rss_growth_mb']:.1f} MB"
+            )
+
+    return regressions
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Benchmark the asset pipeline on synthetic images")
+    parser.add_argument("--cases", nargs="*", default=["*"], help="Case name patterns (default: all)")
+    parser.add_argument("--list", action="store_true", help="List benchmark cases")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported (default: 3)")
+    parser.add_argument("--baseline", help=f"Baseline JSON (default: <base-dir>/{DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail if results regress against the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown / memory growth ratio (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in CASES:
+            print(f"  - {name}")
+        return
+
+    names = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)]
+    if not names:
+        print("❌ Error: No benchmark cases matched")
+        sys.exit(1)
+
+    baseline_path = Path(args.baseline) if args.baseline else Path(args.base_dir) / DEFAULT_BASELINE
+
+    print("=" * 70)
+    print(f"  Pipeline Benchmark: {len(names)} case(s), repeat={args.repeat}")
+    print("=" * 70)
+
+    results = run_benchmarks(names, args.repeat)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    failed = len(results) < len(names)
+
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"❌ Error: Baseline not found: {baseline_path} (run with --save-baseline first)")
+            sys.exit(1)
+
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            failed = True
+        else:
+            print(f"✅ No regressions beyond {args.threshold:.0%} (baseline: {baseline['created']})")
+
+    if args.save_baseline:
+        if baseline_path.exists():
+            # 今回計測しなかったケースは以前の値を残す
+            previous = json.loads(baseline_path.read_text())
+            report["results"] = {**previous.get("results", {}), **results}
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"💾 Baseline saved: {baseline_path}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
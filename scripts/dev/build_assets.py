@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+アセットのインクリメンタルビルド（make方式）
+
+PROMPTS の各アセットについて `output`（単一フレーム）から `final_output`
+（スプライトシート）への変換と、スプライトシートから SpriteFrames
+リソース（`sprite_frames`）の生成、`palette` を指定したアセットの
+共通パレット（config/palettes/<name>.json）の作成、--atlas 指定時の
+全シートのアトラス化をビルドグラフのノードとして扱い、入力ファイルの内容と変換パラメータが前回ビルドから
+変わったものだけを再ビルドします。依存関係のないノードは複数コアで並列に実行します。
+
+出力PNGには .import（godot_resources.write_texture_import()）も書きます。
+ビルド状態は <base-dir>/.cache/asset_build_state.json に保存されます。
+ファイルの変更を監視して自動で再ビルドする場合は watch_assets.py を使います。
+
+使用例:
+    # 変更のあったアセットだけを再ビルド
+    python3 build_assets.py
+
+    # 特定のアセットのみ（依存ノードも含む）
+    python3 build_assets.py player_idle basic_enemy
+
+    # 何がビルドされるかだけ確認
+    python3 build_assets.py --dry-run
+
+    # DALL-E画像の代わりにプレースホルダーのプレイヤースプライトを使用
+    python3 build_assets.py --placeholder-player
+
+    # 全シートをアトラスにもまとめる（<output>.png / <output>.json）
+    python3 build_assets.py --atlas assets/characters/characters_atlas
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+from animate_frames import motion_for
+from generate_asset_with_dalle import PROMPTS, BASE_DIR
+from godot_resources import parse_frame_spec
+from palette import PALETTE_DIR
+
+
+STATE_FILE = Path(".cache") / "asset_build_state.json"
+
+# ステップの実装を変えた場合はバージョンを上げて全ノードを再ビルドさせる
+STEP_VERSIONS = {
+    "pixelart": 3,
+    "sheet": 1,
+    "placeholder_player": 1,
+    "sprite_frames": 1,
+    "palette": 2,
+    "atlas": 1,
+}
+
+
+class BuildNode:
+    """ビルドグラフのノード（1ステップ = 入力 -> 出力）"""
+
+    def __init__(
+        self,
+        name: str,
+        step: str,
+        inputs: List[str],
+        outputs: List[str],
+        params: Dict[str, Any]
+    ):
+        """
+        初期化
+
+        Args:
+            name: ノード名（一意）
+            step: 実行するステップ名（STEP_VERSIONSのキー）
+            inputs: 入力ファイル（base_dirからの相対パス）
+            outputs: 出力ファイル（base_dirからの相対パス）
+            params: ステップのパラメータ（変更されると再ビルド）
+        """
+        self.name = name
+        self.step = step
+        self.inputs = inputs
+        self.outputs = outputs
+        self.params = params
+        self.deps: List[str] = []
+
+    def params_digest(self) -> str:
+        """ステップとパラメータのハッシュ"""
+        payload = json.dumps(
+            {"step": self.step, "version": STEP_VERSIONS[self.step], "params": self.params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_graph(
+    placeholder_player: bool = False,
+    base_dir: Path = BASE_DIR,
+    atlas: Optional[str] = None,
+    prompts: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, BuildNode]:
+    """
+    PROMPTS からビルドグラフを作成
+
+    Args:
+        placeholder_player: プレイヤーをDALL-E画像ではなく
+            create_simple_player_sprite.py の図形で作るか
+        base_dir: プロジェクトルート（SpriteFrames に含めるシートの判定に使用）
+        atlas: 指定時、全シートをまとめるアトラスの出力パス（拡張子なし）
+        prompts: アセット定義（Noneで PROMPTS。watch_assets.py が再読み込みした定義を渡す）
+
+    Returns:
+        {ノード名: BuildNode} の辞書（依存関係は解決済み）
+    """
+    prompts = PROMPTS if prompts is None else prompts
+    nodes: Dict[str, BuildNode] = {}
+
+    for asset_name, config in prompts.items():
+        final_output = config.get("final_output")
+        if not final_output or config["frames"] <= 0:
+            continue
+
+        if placeholder_player and asset_name.startswith("player_"):
+            continue
+
+        spec = parse_frame_spec(final_output)
+        step = config.get("build_step", "pixelart")
+
+        inputs = [config["output"]]
+        if step == "pixelart" and spec:
+            params = {
+                "target_size": spec[1],
+                "num_frames": config["frames"],
+                "motion": motion_for(config),
+                "palette_colors": config.get("palette_colors", 16),
+            }
+            if config.get("palette"):
+                # パレットの内容が変わると再ビルドされるよう入力にも含める
+                params["palette"] = (PALETTE_DIR / f"{config['palette']}.json").as_posix()
+                inputs.append(params["palette"])
+        else:
+            step = "sheet"
+            params = {"num_frames": config["frames"]}
+
+        nodes[asset_name] = BuildNode(
+            name=asset_name,
+            step=step,
+            inputs=inputs,
+            outputs=[final_output],
+            params=params,
+        )
+
+    # 共通パレット: 同じ palette を使うアセットの単一フレームから作成
+    palettes: Dict[str, Dict[str, Any]] = {}
+    for asset_name, config in prompts.items():
+        node = nodes.get(asset_name)
+        if node is None or "palette" not in node.params:
+            continue
+
+        group = palettes.setdefault(node.params["palette"], {"name": config["palette"], "inputs": [], "colors": 0})
+        if (base_dir / config["output"]).exists():
+            group["inputs"].append(config["output"])
+        group["colors"] = max(group["colors"], config.get("palette_colors", 16))
+
+    for path, group in palettes.items():
+        name = f"palette:{group['name']}"
+        nodes[name] = BuildNode(
+            name=name,
+            step="palette",
+            inputs=group["inputs"],
+            outputs=[path],
+            params={"name": group["name"], "colors": group["colors"], "method": "kmeans"},
+        )
+
+    if placeholder_player:
+        from create_simple_player_sprite import PLAYER_SHEETS
+
+        for filename in PLAYER_SHEETS:
+            asset_name = filename.split("_48x48")[0]
+            nodes[asset_name] = BuildNode(
+                name=asset_name,
+                step="placeholder_player",
+                inputs=[],
+                outputs=[f"assets/characters/player/{filename}"],
+                params={"sheet": filename},
+            )
+
+    # SpriteFrames: 同じ .tres を共有するシートを1ノードにまとめる
+    # （シートが存在せず、今回のビルドでも作れないアセットは含めない。アトラスも同様）
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    sheets: List[Dict[str, Any]] = []
+    produced = {output for node in nodes.values() for output in node.outputs}
+    for asset_name, config in prompts.items():
+        sprite_frames = config.get("sprite_frames")
+        node = nodes.get(asset_name)
+        if node is None:
+            continue
+
+        buildable = all(path in produced or (base_dir / path).exists() for path in node.inputs)
+        if not buildable and not (base_dir / node.outputs[0]).exists():
+            continue
+
+        sheets.append({"sheet": node.outputs[0], "num_frames": config["frames"]})
+        if not sprite_frames:
+            continue
+
+        groups.setdefault(sprite_frames, []).append({
+            "name": config.get("animation", "default"),
+            "speed": config.get("fps", 8),
+            "loop": config.get("loop", True),
+            "sheet": node.outputs[0],
+            "num_frames": config["frames"],
+        })
+
+    for sprite_frames, animations in groups.items():
+        name = f"frames:{Path(sprite_frames).stem}"
+        nodes[name] = BuildNode(
+            name=name,
+            step="sprite_frames",
+            inputs=[animation["sheet"] for animation in animations],
+            outputs=[sprite_frames],
+            params={"animations": animations},
+        )
+
+    if atlas and sheets:
+        nodes["atlas"] = BuildNode(
+            name="atlas",
+            step="atlas",
+            inputs=[sheet["sheet"] for sheet in sheets],
+            outputs=[f"{atlas}.json"],
+            params={"sheets": sheets},
+        )
+
+    _resolve_dependencies(nodes)
+    return nodes
+
+
+def _resolve_dependencies(nodes: Dict[str, BuildNode]):
+    """入力ファイルを出力するノードへの依存を設定し、循環を検出"""
+    producers: Dict[str, str] = {}
+    for node in nodes.values():
+        for output in node.outputs:
+            if output in producers:
+                raise ValueError(
+                    f"Output '{output}' is produced by both "
+                    f"'{producers[output]}' and '{node.name}'"
+                )
+            producers[output] = node.name
+
+    for node in nodes.values():
+        node.deps = sorted({producers[i] for i in node.inputs if i in producers})
+
+    # 循環検出（DFS）
+    visiting, done = set(), set()
+
+    def visit(name: str, chain: List[str]):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle: {' -> '.join(chain + [name])}")
+        visiting.add(name)
+        for dep in nodes[name].deps:
+            visit(dep, chain + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in nodes:
+        visit(name, [])
+
+
+def select_nodes(nodes: Dict[str, BuildNode], targets: List[str]) -> Dict[str, BuildNode]:
+    """指定ターゲットとその依存ノードだけを残す"""
+    if not targets:
+        return nodes
+
+    unknown = [t for t in targets if t not in nodes]
+    if unknown:
+        raise ValueError(f"Unknown target(s): {', '.join(unknown)}")
+
+    selected = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(nodes[name].deps)
+
+    return {name: node for name, node in nodes.items() if name in selected}
+
+
+def file_digest(path: Path) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildState:
+    """前回ビルド時の入力フィンガープリントとパラメータの記録"""
+
+    def __init__(self, base_dir: Path):
+        self.path = base_dir / STATE_FILE
+        self.base_dir = base_dir
+        self.records: Dict[str, Dict[str, Any]] = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.records = json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️  Build state is corrupt, rebuilding everything: {self.path}")
+
+    def fingerprint(self, rel_path: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        ファイルのフィンガープリント（mtime/サイズ/内容ハッシュ）
+
+        mtimeとサイズが前回と同じ場合はハッシュ計算を省略する。
+        """
+        stat = (self.base_dir / rel_path).stat()
+        if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+            return previous
+
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": file_digest(self.base_dir / rel_path),
+        }
+
+    def stale_reason(self, node: BuildNode) -> Optional[str]:
+        """
+        ノードが再ビルド必要かを判定
+
+        Returns:
+            再ビルドが必要な理由（不要ならNone）
+        """
+        record = self.records.get(node.name)
+        if record is None:
+            return "never built"
+
+        if record["params"] != node.params_digest():
+            return "parameters changed"
+
+        for output in node.outputs:
+            if not (self.base_dir / output).exists():
+                return f"missing output {output}"
+
+        for rel_path in node.inputs:
+            previous = record["inputs"].get(rel_path)
+            if previous is None:
+                return f"new input {rel_path}"
+            if self.fingerprint(rel_path, previous)["sha256"] != previous["sha256"]:
+                return f"input changed {rel_path}"
+
+        return None
+
+    def record(self, node: BuildNode):
+        """ビルド成功を記録"""
+        previous = self.records.get(node.name, {}).get("inputs", {})
+        self.records[node.name] = {
+            "params": node.params_digest(),
+            "inputs": {
+                rel_path: self.fingerprint(rel_path, previous.get(rel_path))
+                for rel_path in node.inputs
+            },
+            "built_at": time.time(),
+        }
+
+    def save(self):
+        """アトミックに書き込み"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.records, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def run_step(step: str, inputs: List[str], outputs: List[str], params: Dict[str, Any], base_dir: str) -> float:
+    """
+    ステップを実行（ワーカープロセス内で呼ばれる）
+
+    Returns:
+        実行時間（秒）
+    """
+    from godot_resources import write_texture_import
+
+    started = time.perf_counter()
+    base = Path(base_dir)
+    textures = [base / output for output in outputs if output.endswith(".png")]
+
+    for output in outputs:
+        (base / output).parent.mkdir(parents=True, exist_ok=True)
+
+    if step == "pixelart":
+        # 1フレーム分（target_size四方）にピクセル化してからモーションでシートを合成する
+        # （最近傍のアフィン変換なので減色後の色は変わらない）
+        from PIL import Image
+        from animate_frames import synthesize_sheet
+        from convert_dalle_to_pixelart import binarize_alpha, pixelize
+        from png_optimize import save_png
+        with Image.open(base / inputs[0]) as img:
+            frame = pixelize(
+                img,
+                target_size=params["target_size"],
+                num_frames=1,
+                palette_colors=params["palette_colors"],
+                palette=str(base / params["palette"]) if params.get("palette") else None,
+            )
+        sheet = synthesize_sheet(frame, params["motion"], params["num_frames"])
+        save_png(binarize_alpha(sheet), base / outputs[0], indexed=True)
+    elif step == "sheet":
+        from create_sprite_sheet import create_sprite_sheet
+        try:
+            create_sprite_sheet(str(base / inputs[0]), str(base / outputs[0]), params["num_frames"])
+        except SystemExit:
+            raise RuntimeError(f"create_sprite_sheet failed for {inputs[0]}")
+    elif step == "palette":
+        from PIL import Image
+        from palette import build_palette
+        images = [Image.open(base / path) for path in inputs]
+        if not images:
+            raise RuntimeError(f"No source images for palette '{params['name']}'")
+        build_palette(images, params["colors"], params["method"], params["name"]).save(
+            base / outputs[0], sources=[Path(path).name for path in inputs]
+        )
+    elif step == "placeholder_player":
+        from create_simple_player_sprite import PLAYER_SHEETS
+        PLAYER_SHEETS[params["sheet"]]().save(base / outputs[0])
+    elif step == "sprite_frames":
+        from godot_resources import strip_regions, write_sprite_frames
+        animations = [
+            {
+                "name": animation["name"],
+                "speed": animation["speed"],
+                "loop": animation["loop"],
+                "frames": [
+                    {"texture": base / animation["sheet"], **entry}
+                    for entry in strip_regions(base / animation["sheet"], animation["num_frames"])
+                ],
+            }
+            for animation in params["animations"]
+        ]
+        write_sprite_frames(Path(outputs[0]), animations, base)
+    elif step == "atlas":
+        from pack_atlas import pack_frames, split_frames, write_atlas
+        from PIL import Image
+        frames = []
+        for sheet in params["sheets"]:
+            with Image.open(base / sheet["sheet"]) as img:
+                image = img.convert("RGBA")
+            frame_size = (image.size[0] // sheet["num_frames"], image.size[1])
+            frames.extend(split_frames(image, Path(sheet["sheet"]).stem, frame_size))
+        atlases, frame_map = pack_frames(frames)
+        textures = write_atlas(atlases, frame_map, str(base / outputs[0][:-len(".json")]))
+    else:
+        raise ValueError(f"Unknown build step: {step}")
+
+    # Godot が既定の設定で取り込む前にピクセルアート向けの .import を置く
+    for texture in textures:
+        write_texture_import(texture, base)
+
+    return time.perf_counter() - started
+
+
+def build(
+    nodes: Dict[str, BuildNode],
+    base_dir: Path,
+    jobs: Optional[int] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    executor: Optional[Executor] = None
+) -> bool:
+    """
+    ビルドグラフを実行
+
+    依存ノードが終わったものから順に古さを判定し、必要なものだけを
+    プロセスプールへ投入する。
+
+    Args:
+        nodes: ビルド対象ノード
+        base_dir: プロジェクトルート
+        jobs: 並列数（Noneの場合はCPUコア数）
+        force: 全ノードを再ビルドするか
+        dry_run: 判定のみ行い実行しない
+        executor: 使い回すプール（watch_assets.py 用。Noneの場合は jobs 個のプロセスで新規作成）
+
+    Returns:
+        全ノードが成功（またはビルド不要）だったか
+    """
+    state = BuildState(base_dir)
+    pending = dict(nodes)
+    finished: Dict[str, bool] = {}
+    built = skipped = failed = 0
+    started = time.perf_counter()
+
+    pool = contextlib.nullcontext(executor) if executor else ProcessPoolExecutor(max_workers=jobs or os.cpu_count())
+    with pool as executor:
+        running = {}
+
+        while pending or running:
+            # 依存がすべて完了したノードを投入
+            for name in sorted(pending):
+                node = pending[name]
+                if any(dep not in finished for dep in node.deps):
+                    continue
+                del pending[name]
+
+                if not all(finished[dep] for dep in node.deps):
+                    print(f"⏭️  {name}: skipped (dependency failed)")
+                    finished[name] = False
+                    failed += 1
+                    continue
+
+                missing = [i for i in node.inputs if not (base_dir / i).exists()]
+                if missing:
+                    print(f"⚠️  {name}: missing input {missing[0]}")
+                    finished[name] = False
+                    failed += 1
+                    continue
+
+                reason = "forced" if force else state.stale_reason(node)
+                if reason is None:
+                    finished[name] = True
+                    skipped += 1
+                    continue
+
+                print(f"🔧 {name}: {node.step} ({reason})")
+                if dry_run:
+                    finished[name] = True
+                    built += 1
+                    continue
+
+                future = executor.submit(
+                    run_step, node.step, node.inputs, node.outputs, node.params, str(base_dir)
+                )
+                running[future] = node
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    elapsed = future.result()
+                except Exception as e:
+                    print(f"❌ {node.name}: {e}")
+                    finished[node.name] = False
+                    failed += 1
+                    continue
+
+                print(f"✅ {node.name}: {', '.join(node.outputs)} ({elapsed:.2f}s)")
+                state.record(node)
+                state.save()
+                finished[node.name] = True
+                built += 1
+
+    elapsed = time.perf_counter() - started
+    print()
+    print("=" * 60)
+    print(f"  Built: {built}, Up to date: {skipped}, Failed: {failed} ({elapsed:.2f}s)")
+    print("=" * 60)
+
+    return failed == 0
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Incrementally rebuild generated sprite assets")
+    parser.add_argument("targets", nargs="*", help="Asset names to build (default: all)")
+    parser.add_argument("--jobs", "-j", type=int, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be rebuilt")
+    parser.add_argument("--list", action="store_true", help="List build graph nodes")
+    parser.add_argument(
+        "--placeholder-player",
+        action="store_true",
+        help="Build player sheets from create_simple_player_sprite.py shapes"
+    )
+    parser.add_argument("--atlas", help="Also pack all sheets into an atlas (output path without extension)")
+    parser.add_argument("--base-dir", help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir) if args.base_dir else BASE_DIR
+
+    try:
+        nodes = select_nodes(build_graph(args.placeholder_player, base_dir, args.atlas), args.targets)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.list:
+        for node in nodes.values():
+            deps = f" <- {', '.join(node.deps)}" if node.deps else ""
+            print(f"  - {node.name:<20} [{node.step}] {', '.join(node.outputs)}{deps}")
+        return
+
+    success = build(nodes, base_dir, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+スプライトのアルファからコリジョン形状を作成
+
+各フレームのアルファマスクの輪郭をたどり、凸包を Douglas-Peucker 法で
+頂点数の上限まで単純化するか、円・カプセルを当てはめて、Godot の
+Shape2D リソース（.tres）として書き出します。手作業で決めた形状より
+スプライトの見た目に合い、敵が数百体いても物理演算が重くならない
+（円 < カプセル < 凸多角形 の順に安い）ように、auto では許容できる
+一致度（IoU）を満たす最も安い形状を選びます。
+
+形状の座標はフレーム中心（Sprite2D / AnimatedSprite2D の centered）が原点です。
+円・カプセルの中心がずれている場合は、CollisionShape2D の position / rotation に
+表示される値を設定してください。
+
+使用例:
+    # アニメーション全フレームの和集合から形状を選んで .tres を書き出す
+    python3 collision_shapes.py assets/characters/enemies/basic_enemy_idle_32x32_4f.png
+
+    # 凸多角形（頂点6個まで）、Sprite2D の scale 1.2 に合わせる
+    python3 collision_shapes.py "assets/characters/enemies/*_4f.png" --shape convex --max-vertices 6 --scale 1.2
+
+    # pipo-charachip（32x32 グリッド）、フレームごとの形状もJSONに出力
+    python3 collision_shapes.py assets/characters/enemies/pipo-charachip019.png --frame-size 32x32 --report /tmp/shapes.json
+
+出力:
+    <入力名からフレーム指定を除いた名前>_collision.tres（例: basic_enemy_idle_collision.tres）
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import sys
+import glob
+import json
+import math
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+try:
+    from PIL import Image, ImageChops, ImageDraw
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+from godot_resources import FRAME_SPEC_PATTERN, parse_frame_spec, write_shape
+from pack_atlas import split_frames
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+DEFAULT_ALPHA_THRESHOLD = 128
+DEFAULT_MAX_VERTICES = 8
+# 円・カプセルの半径は、不透明画素のこの割合が内側に入るように決める
+DEFAULT_COVERAGE = 0.95
+# auto で安い形状を採用する最低の一致度（IoU）
+DEFAULT_MIN_IOU = 0.75
+
+# 形状ごとの相対コスト（auto はこの順に試す）
+SHAPE_ORDER = ("circle", "capsule", "convex")
+
+Point = Tuple[float, float]
+
+
+def alpha_mask(img: Image.Image, threshold: int = DEFAULT_ALPHA_THRESHOLD) -> Image.Image:
+    """アルファが threshold 以上の画素を255にしたマスク（Lモード）"""
+    return img.convert("RGBA").getchannel("A").point(lambda a: 255 if a >= threshold else 0)
+
+
+def _filled(mask: Image.Image) -> List[Tuple[int, int]]:
+    width = mask.size[0]
+    return [(i % width, i // width) for i, value in enumerate(mask.tobytes()) if value]
+
+
+def trace_outline(mask: Image.Image) -> List[Point]:
+    """
+    マスクの最大の連結成分の外周を画素の角の座標でたどる
+
+    Returns:
+        外周の頂点（時計回り、一直線上の頂点は除く）。空のマスクでは空リスト
+    """
+    filled = set(_filled(mask))
+    if not filled:
+        return []
+
+    # 塗られた画素の辺のうち、隣が空いているものを時計回りの有向辺として集める
+    edges: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for x, y in filled:
+        for (nx, ny), start, end in (
+            ((x, y - 1), (x, y), (x + 1, y)),
+            ((x + 1, y), (x + 1, y), (x + 1, y + 1)),
+            ((x, y + 1), (x + 1, y + 1), (x, y + 1)),
+            ((x - 1, y), (x, y + 1), (x, y)),
+        ):
+            if (nx, ny) not in filled:
+                edges.setdefault(start, []).append(end)
+
+    loops = []
+    while edges:
+        start = next(iter(edges))
+        loop = []
+        current, direction = start, None
+        while True:
+            candidates = edges[current]
+            if len(candidates) > 1 and direction is not None:
+                # 斜めに接する箇所では右折を優先（連結成分ごとに分かれる）
+                candidates.sort(key=lambda p: _turn(direction, (p[0] - current[0], p[1] - current[1])))
+            following = candidates.pop(0)
+            if not candidates:
+                del edges[current]
+            loop.append(current)
+            direction = (following[0] - current[0], following[1] - current[1])
+            current = following
+            if current == start:
+                break
+        loops.append(loop)
+
+    # 外周は時計回り（画面座標で面積が正）。最大のものを採用
+    outline = max(loops, key=_signed_area)
+    return _drop_collinear(outline)
+
+
+def _turn(previous: Tuple[int, int], direction: Tuple[int, int]) -> int:
+    """右折 0、直進 1、左折 2（画面座標）"""
+    cross = previous[0] * direction[1] - previous[1] * direction[0]
+    return 0 if cross > 0 else (1 if cross == 0 else 2)
+
+
+def _signed_area(points: List[Point]) -> float:
+    return sum(
+        x0 * y1 - x1 * y0
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1])
+    ) / 2
+
+
+def _drop_collinear(points: List[Point]) -> List[Point]:
+    result = []
+    for i, point in enumerate(points):
+        prev, nxt = points[i - 1], points[(i + 1) % len(points)]
+        if (point[0] - prev[0]) * (nxt[1] - point[1]) != (point[1] - prev[1]) * (nxt[0] - point[0]):
+            result.append(point)
+    return result
+
+
+def convex_hull(points: List[Point]) -> List[Point]:
+    """凸包（Andrew の monotone chain、画面座標で時計回り）"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def half(sequence):
+        chain: List[Point] = []
+        for p in sequence:
+            while len(chain) >= 2 and (
+                (chain[-1][0] - chain[-2][0]) * (p[1] - chain[-2][1])
+                - (chain[-1][1] - chain[-2][1]) * (p[0] - chain[-2][0])
+            ) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain
+
+    lower = half(points)
+    upper = half(reversed(points))
+    return lower[:-1] + upper[:-1]
+
+
+def _distance_to_segment(p: Point, a: Point, b: Point) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def _douglas_peucker(points: List[Point], epsilon: float) -> List[Point]:
+    """開いた折れ線の単純化（両端は残す）"""
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        best, index = 0.0, None
+        for i in range(first + 1, last):
+            distance = _distance_to_segment(points[i], points[first], points[last])
+            if distance > best:
+                best, index = distance, i
+        if index is not None and best > epsilon:
+            keep[index] = True
+            stack.extend([(first, index), (index, last)])
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify(polygon: List[Point], max_vertices: int) -> List[Point]:
+    """
+    閉じた多角形を Douglas-Peucker 法で頂点数 max_vertices 以下に単純化
+
+    許容誤差を二分探索し、頂点数の上限を満たす最小の誤差で単純化する。
+    """
+    if len(polygon) <= max_vertices:
+        return polygon
+
+    # 最も離れた2点で2本の折れ線に分ける
+    far = max(range(len(polygon)), key=lambda i: math.dist(polygon[0], polygon[i]))
+    first, second = polygon[:far + 1], polygon[far:] + polygon[:1]
+
+    def run(epsilon: float) -> List[Point]:
+        return _douglas_peucker(first, epsilon)[:-1] + _douglas_peucker(second, epsilon)[:-1]
+
+    low, high = 0.0, max(math.dist(polygon[0], polygon[far]), 1.0)
+    best = run(high)
+    for _ in range(24):
+        middle = (low + high) / 2
+        candidate = run(middle)
+        if len(candidate) <= max_vertices:
+            best, high = candidate, middle
+        else:
+            low = middle
+    return best
+
+
+def _quantile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(ratio * len(ordered)))]
+
+
+def fit_circle(mask: Image.Image, coverage: float = DEFAULT_COVERAGE) -> Dict[str, Any]:
+    """不透明画素の重心を中心に、coverage の割合の画素が入る円"""
+    pixels = [(x + 0.5, y + 0.5) for x, y in _filled(mask)]
+    cx = sum(p[0] for p in pixels) / len(pixels)
+    cy = sum(p[1] for p in pixels) / len(pixels)
+    radius = _quantile([math.hypot(x - cx, y - cy) for x, y in pixels], coverage) + 0.5
+    return {"type": "circle", "radius": radius, "center": [cx, cy]}
+
+
+def fit_capsule(mask: Image.Image, coverage: float = DEFAULT_COVERAGE) -> Dict[str, Any]:
+    """長い方向を軸にしたカプセル（横長の場合は rotation 90°）"""
+    pixels = [(x + 0.5, y + 0.5) for x, y in _filled(mask)]
+    cx = sum(p[0] for p in pixels) / len(pixels)
+    cy = sum(p[1] for p in pixels) / len(pixels)
+
+    xs = [x for x, _ in pixels]
+    ys = [y for _, y in pixels]
+    vertical = max(ys) - min(ys) >= max(xs) - min(xs)
+    across = [abs(x - cx) for x in xs] if vertical else [abs(y - cy) for y in ys]
+    along = [abs(y - cy) for y in ys] if vertical else [abs(x - cx) for x in xs]
+
+    radius = _quantile(across, coverage) + 0.5
+    height = max(2 * radius, 2 * (_quantile(along, coverage) + 0.5))
+    return {"type": "capsule", "radius": radius, "height": height,
+            "center": [cx, cy], "rotation": 0 if vertical else 90}
+
+
+def fit_convex(mask: Image.Image, max_vertices: int = DEFAULT_MAX_VERTICES) -> Dict[str, Any]:
+    """最大の連結成分の凸包を max_vertices 頂点以下に単純化"""
+    hull = convex_hull(trace_outline(mask))
+    return {"type": "convex", "points": [list(p) for p in simplify(hull, max(3, max_vertices))]}
+
+
+def rasterize(shape: Dict[str, Any], size: Tuple[int, int]) -> Image.Image:
+    """形状（フレーム左上が原点の座標）をマスクに描く（IoUの評価用）"""
+    mask = Image.new("L", size, 0)
+    draw = ImageDraw.Draw(mask)
+
+    if shape["type"] == "convex":
+        draw.polygon([(x - 0.5, y - 0.5) for x, y in shape["points"]], fill=255)
+        return mask
+
+    cx, cy = (v - 0.5 for v in shape["center"])
+    r = shape["radius"]
+    if shape["type"] == "circle":
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=255)
+        return mask
+
+    half = shape["height"] / 2 - r
+    dx, dy = (0, half) if shape["rotation"] == 0 else (half, 0)
+    for sx, sy in ((cx - dx, cy - dy), (cx + dx, cy + dy)):
+        draw.ellipse((sx - r, sy - r, sx + r, sy + r), fill=255)
+    if shape["rotation"] == 0:
+        draw.rectangle((cx - r, cy - half, cx + r, cy + half), fill=255)
+    else:
+        draw.rectangle((cx - half, cy - r, cx + half, cy + r), fill=255)
+    return mask
+
+
+def iou(a: Image.Image, b: Image.Image) -> float:
+    """2つのマスク（0/255）の Intersection over Union"""
+    intersection = ImageChops.multiply(a, b).histogram()[255]
+    union = ImageChops.lighter(a, b).histogram()[255]
+    return intersection / union if union else 0.0
+
+
+def fit_shape(
+    mask: Image.Image,
+    shape: str = "auto",
+    max_vertices: int = DEFAULT_MAX_VERTICES,
+    coverage: float = DEFAULT_COVERAGE,
+    min_iou: float = DEFAULT_MIN_IOU
+) -> Optional[Dict[str, Any]]:
+    """
+    マスクにコリジョン形状を当てはめる
+
+    Args:
+        mask: alpha_mask() の結果
+        shape: "auto" / "circle" / "capsule" / "convex"
+        max_vertices: 凸多角形の頂点数の上限
+        coverage: 円・カプセルの内側に入れる不透明画素の割合
+        min_iou: auto で円・カプセルを採用する最低の一致度
+
+    Returns:
+        形状（座標はフレーム左上が原点、"iou" 付き）。マスクが空ならNone
+    """
+    if mask.getbbox() is None:
+        return None
+
+    fitters = {
+        "circle": lambda: fit_circle(mask, coverage),
+        "capsule": lambda: fit_capsule(mask, coverage),
+        "convex": lambda: fit_convex(mask, max_vertices),
+    }
+
+    for kind in (SHAPE_ORDER if shape == "auto" else (shape,)):
+        candidate = fitters[kind]()
+        candidate["iou"] = round(iou(mask, rasterize(candidate, mask.size)), 3)
+        if shape != "auto" or kind == SHAPE_ORDER[-1] or candidate["iou"] >= min_iou:
+            return candidate
+    return None
+
+
+def to_godot(shape: Dict[str, Any], frame_size: Tuple[int, int], scale: float = 1.0) -> Dict[str, Any]:
+    """
+    フレーム左上基準の形状を、フレーム中心が原点の Godot 座標に変換
+
+    Returns:
+        write_shape() に渡せる形状（円・カプセルは "position" / "rotation" 付き）
+    """
+    ox, oy = frame_size[0] / 2, frame_size[1] / 2
+    result: Dict[str, Any] = {"type": shape["type"], "iou": shape.get("iou")}
+
+    if shape["type"] == "convex":
+        result["points"] = [[round((x - ox) * scale, 3), round((y - oy) * scale, 3)] for x, y in shape["points"]]
+        return result
+
+    result["radius"] = round(shape["radius"] * scale, 3)
+    if shape["type"] == "capsule":
+        result["height"] = round(shape["height"] * scale, 3)
+        result["rotation"] = shape["rotation"]
+    result["position"] = [round((shape["center"][0] - ox) * scale, 3), round((shape["center"][1] - oy) * scale, 3)]
+    return result
+
+
+def sheet_frames(sheet: Image.Image, stem: str, num_frames: Optional[int] = None,
+                 frame_size: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
+    """
+    シートをフレームに分ける（ファイル名の _<W>x<H>_<N>f、frame_size、num_frames の順に判定）
+
+    Raises:
+        ValueError: シートのサイズがファイル名のフレーム指定（N*W x H）と一致しない
+    """
+    spec = parse_frame_spec(stem) if frame_size is None else None
+    if spec:
+        frame_w, frame_h, count = spec
+        if sheet.size != (frame_w * count, frame_h):
+            raise ValueError(
+                f"{stem} is {sheet.size[0]}x{sheet.size[1]}, expected "
+                f"{frame_w * count}x{frame_h} ({count} frames of {frame_w}x{frame_h})"
+            )
+    elif frame_size is None and num_frames:
+        frame_size = (sheet.size[0] // num_frames, sheet.size[1])
+    return [frame for _, frame in split_frames(sheet, stem, frame_size)]
+
+
+def sheet_shapes(
+    frames: List[Image.Image],
+    alpha_threshold: int = DEFAULT_ALPHA_THRESHOLD,
+    scale: float = 1.0,
+    **params
+) -> Tuple[Optional[Dict[str, Any]], List[Optional[Dict[str, Any]]]]:
+    """
+    アニメーションの形状を求める
+
+    Args:
+        frames: フレーム画像
+        alpha_threshold: 不透明とみなすアルファの下限
+        scale: Sprite2D の scale（座標に掛ける）
+        **params: fit_shape() の引数
+
+    Returns:
+        (全フレームの和集合の形状, フレームごとの形状)（いずれも Godot 座標）
+    """
+    masks = [alpha_mask(frame, alpha_threshold) for frame in frames]
+    size = frames[0].size
+
+    union = masks[0]
+    for mask in masks[1:]:
+        union = ImageChops.lighter(union, mask)
+
+    def convert(mask):
+        shape = fit_shape(mask, **params)
+        return to_godot(shape, size, scale) if shape else None
+
+    return convert(union), [convert(mask) for mask in masks]
+
+
+def collision_path(sheet_path: Path) -> Path:
+    """シートのパスから .tres の出力パス（フレーム指定を除いた名前 + _collision.tres）"""
+    sheet_path = Path(sheet_path)
+    stem = FRAME_SPEC_PATTERN.sub("", sheet_path.stem)
+    return sheet_path.with_name(f"{stem}_collision.tres")
+
+
+def describe(shape: Dict[str, Any]) -> str:
+    """表示用の説明"""
+    if shape["type"] == "convex":
+        text = f"convex ({len(shape['points'])} vertices)"
+    elif shape["type"] == "capsule":
+        text = f"capsule r={shape['radius']} h={shape['height']}"
+        if shape["rotation"]:
+            text += f" rotation={shape['rotation']}°"
+    else:
+        text = f"circle r={shape['radius']}"
+    if "position" in shape and any(shape["position"]):
+        text += f" position=({shape['position'][0]}, {shape['position'][1]})"
+    return f"{text}, IoU {shape['iou']}"
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Fit Godot collision shapes to sprite alpha masks")
+    parser.add_argument("inputs", nargs="+", help="Sprite sheets or single frames (files or glob patterns)")
+    parser.add_argument("--shape", choices=["auto", *SHAPE_ORDER], default="auto",
+                        help="Shape type; auto picks the cheapest with enough IoU (default: auto)")
+    parser.add_argument("--max-vertices", type=int, default=DEFAULT_MAX_VERTICES,
+                        help=f"Vertex budget for convex polygons (default: {DEFAULT_MAX_VERTICES})")
+    parser.add_argument("--coverage", type=float, default=DEFAULT_COVERAGE,
+                        help=f"Fraction of opaque pixels inside circles/capsules (default: {DEFAULT_COVERAGE})")
+    parser.add_argument("--min-iou", type=float, default=DEFAULT_MIN_IOU,
+                        help=f"Minimum IoU for auto to accept a circle/capsule (default: {DEFAULT_MIN_IOU})")
+    parser.add_argument("--alpha-threshold", type=int, default=DEFAULT_ALPHA_THRESHOLD,
+                        help=f"Alpha treated as solid (default: {DEFAULT_ALPHA_THRESHOLD})")
+    parser.add_argument("--frame-size", help="Grid cell size WxH (default: from file name)")
+    parser.add_argument("--frames", type=int, help="Frames in a horizontal strip without a frame spec in its name")
+    parser.add_argument("--scale", type=float, default=1.0, help="Sprite scale applied to the shape (default: 1.0)")
+    parser.add_argument("--output-dir", help="Output directory for .tres files (default: next to each input)")
+    parser.add_argument("--report", help="Write all shapes (including per-frame shapes) to this JSON file")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    frame_size = tuple(int(v) for v in args.frame_size.lower().split("x")) if args.frame_size else None
+
+    paths = []
+    for pattern in args.inputs:
+        matched = sorted(glob.glob(pattern, recursive=True))
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(matched)
+
+    if not paths:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    report = {}
+    failed = 0
+    for path in dict.fromkeys(paths):
+        with Image.open(path) as img:
+            sheet = img.convert("RGBA")
+
+        try:
+            frames = sheet_frames(sheet, Path(path).stem, args.frames, frame_size)
+        except ValueError as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        union, per_frame = sheet_shapes(
+            frames, args.alpha_threshold, args.scale,
+            shape=args.shape, max_vertices=args.max_vertices, coverage=args.coverage, min_iou=args.min_iou,
+        )
+        if union is None:
+            print(f"⚠️  {path}: fully transparent, skipped")
+            failed += 1
+            continue
+
+        output = collision_path(Path(path))
+        if args.output_dir:
+            output = Path(args.output_dir) / output.name
+        write_shape(output.resolve(), union, Path(args.base_dir))
+
+        print(f"✅ {Path(path).name} -> {output.name}: {describe(union)} ({len(frames)} frame(s))")
+        report[path] = {"output": str(output), "shape": union, "frames": per_frame}
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,270 @@
 #!/usr/bin/env python3
 """
 DALL-E生成画像をピクセルアート風に変換
+
+使用例:
+    # プレイヤー3種を変換（従来の動作）
+    python3 convert_dalle_to_pixelart.py
+
+    # ディレクトリ内の *_single.png を全コアで並列変換
+    python3 convert_dalle_to_pixelart.py assets/characters/enemies --target-size 32 --frames 4
+
+    # 白背景をクロマキーで抜く（境界は8段階でぼかす）
+    python3 convert_dalle_to_pixelart.py assets/items --key-color "#ffffff" --key-tolerance 24 --feather 8
+
+    # 共通パレット（palette.py で作成）で減色
+    python3 convert_dalle_to_pixelart.py assets/characters/enemies --palette config/palettes/enemies.json
+
+    # パレットPNG（4bit + tRNS）で保存し、圧縮パラメータも探索
+    python3 convert_dalle_to_pixelart.py assets/characters/enemies --indexed --png-search
+
+    # .import（godot_resources.write_texture_import()）を書かない
+    python3 convert_dalle_to_pixelart.py assets/items --no-import
+
+    # グロブ指定 + ファイルごとのパラメータをマニフェストで指定
+    python3 convert_dalle_to_pixelart.py "assets/characters/**/*_single.png" --manifest convert.json
+
+マニフェスト形式（JSON）:
+    {
+      "defaults": {"target_size": 32, "num_frames": 4, "palette_colors": 16},
+      "files": [
+        {"input": "assets/characters/bosses/*_single.png", "target_size": 96, "num_frames": 6},
+        {"input": "assets/characters/player/player_hit_single.png",
+         "output": "assets/characters/player/player_hit_48x48_2f.png",
+         "target_size": 48, "num_frames": 2}
+      ]
+    }
 """
 
-from PIL import Image
+from PIL import Image, ImageChops
+import io
+import os
 import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 
-def convert_to_pixel_art(input_path, output_path, target_size=48, num_frames=4, palette_colors=16):
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pillowのみの処理にフォールバック
+
+from godot_resources import write_texture_import
+from palette import Palette, load_palette
+from png_optimize import optimize_image
+
+BASE_DIR = "/workspaces/05_poc-godot"
+
+# 引数なしで実行した場合の変換対象（従来の動作）
+PLAYER_MANIFEST = {
+    "defaults": {"target_size": 48, "palette_colors": 16},
+    "files": [
+        {
+            "input": "assets/characters/player/player_idle_single.png",
+            "output": "assets/characters/player/player_idle_48x48_4f.png",
+            "num_frames": 4,
+        },
+        {
+            "input": "assets/characters/player/player_walk_single.png",
+            "output": "assets/characters/player/player_walk_48x48_4f.png",
+            "num_frames": 4,
+        },
+        {
+            "input": "assets/characters/player/player_hit_single.png",
+            "output": "assets/characters/player/player_hit_48x48_2f.png",
+            "num_frames": 2,
+        },
+    ],
+}
+
+DEFAULT_PARAMS = {
+    "target_size": 48,
+    "num_frames": 4,
+    "palette_colors": 16,
+    "alpha_threshold": 30,
+    "feather": 0,
+    "key_color": None,
+    "key_tolerance": 0,
+    "palette": None,
+    "indexed": False,
+    "png_search": False,
+}
+
+def _ramp_lut(threshold, feather):
     """
-    画像をピクセルアート風に変換
+    0-255の値をアルファ値に変換するルックアップテーブル
+
+    feather=0 なら閾値で二値化、それ以外は閾値を中心に feather 幅で線形に変化。
+    """
+    if feather <= 0:
+        return [0 if v < threshold else 255 for v in range(256)]
+
+    low = threshold - feather / 2
+    return [max(0, min(255, round((v - low) * 255 / feather))) for v in range(256)]
+
+
+def parse_color(value):
+    """'#rrggbb' / 'r,g,b' / [r, g, b] を (r, g, b) に変換"""
+    if value is None or isinstance(value, (list, tuple)):
+        return tuple(value) if value is not None else None
+
+    value = value.strip()
+    if value.startswith("#"):
+        return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+    return tuple(int(c) for c in value.split(","))
+
+
+def alpha_key(img, threshold=30, feather=0, key_color=None, key_tolerance=0, use_numpy=True):
+    """
+    背景を透明化したアルファチャンネルを作成
+
+    key_color 未指定時は明るさが threshold 未満の部分を、指定時は
+    key_color との距離（チャンネルごとの差の最大値）が key_tolerance 以下の部分を透明にする
+    （key_tolerance=0 でも背景色と完全に一致する画素は透明になる）。
+
+    >>> img = Image.new('RGB', (2, 1), (255, 255, 255))
+    >>> img.putpixel((1, 0), (250, 250, 250))
+    >>> list(alpha_key(img, key_color=(255, 255, 255)).tobytes())
+    [0, 255]
+    >>> list(alpha_key(img, key_color=(255, 255, 255), use_numpy=False).tobytes())
+    [0, 255]
 
     Args:
-        input_path: 入力画像パス
-        output_path: 出力画像パス
+        img: 入力画像（RGB/RGBA）
+        threshold: 明るさの閾値
+        feather: 境界をぼかす幅（0で二値）
+        key_color: クロマキーの背景色 (r, g, b)
+        key_tolerance: クロマキーの許容距離
+        use_numpy: NumPyが使える場合にNumPyで処理するか
+
+    Returns:
+        アルファチャンネル（Lモード）
+    """
+    rgb = img.convert('RGB')
+    if key_color is None:
+        lut = _ramp_lut(threshold, feather)
+    else:
+        # 距離 <= key_tolerance を透明にするため、閾値は1つ上
+        lut = _ramp_lut(key_tolerance + 1, feather)
+
+    if use_numpy and np is not None:
+        lut_arr = np.asarray(lut, dtype=np.uint8)
+
+        if key_color is None:
+            values = np.asarray(rgb.convert('L'))
+        else:
+            # uint8のまま |arr - key| を計算（int16への拡張コピーを避ける）
+            arr = np.asarray(rgb)
+            key = np.asarray(key_color, dtype=np.uint8)
+            diff = np.maximum(arr, key)
+            diff -= np.minimum(arr, key)
+            values = np.maximum(np.maximum(diff[..., 0], diff[..., 1]), diff[..., 2])
+
+        return Image.fromarray(np.take(lut_arr, values), 'L')
+
+    if key_color is None:
+        values = rgb.convert('L')
+    else:
+        diff = ImageChops.difference(rgb, Image.new('RGB', rgb.size, tuple(key_color)))
+        r, g, b = diff.split()
+        values = ImageChops.lighter(ImageChops.lighter(r, g), b)
+
+    return values.point(lut)
+
+
+def alpha_stats(img, use_numpy=True):
+    """
+    不透明ピクセル数を集計
+
+    Returns:
+        (不透明ピクセル数, 全ピクセル数)
+    """
+    alpha = img.getchannel('A')
+    total = img.size[0] * img.size[1]
+
+    if use_numpy and np is not None:
+        return int(np.count_nonzero(np.asarray(alpha) > 128)), total
+
+    return sum(alpha.histogram()[129:]), total
+
+
+def binarize_alpha(img, threshold=128):
+    """アルファを threshold を境に0/255へ二値化（パレットPNG化の前処理）"""
+    img = img.copy()
+    img.putalpha(img.getchannel('A').point(lambda a: 255 if a >= threshold else 0))
+    return img
+
+
+def pixelize(
+    img,
+    target_size=48,
+    num_frames=4,
+    palette_colors=16,
+    alpha_threshold=30,
+    feather=0,
+    key_color=None,
+    key_tolerance=0,
+    use_numpy=True,
+    palette=None,
+    log=None
+):
+    """
+    メモリ上の画像をピクセルアート風のスプライトシートに変換
+
+    ファイルの読み書きは行わない（convert_to_pixel_art() やパイプラインから使用）。
+
+    Args:
+        img: 入力画像
         target_size: 目標サイズ（高さ）
         num_frames: フレーム数
         palette_colors: パレット色数
-    """
-    print(f"Converting: {input_path}")
+        alpha_threshold: 透明度がない画像で、これより暗い部分を透明にする閾値
+        feather: 透明化の境界をぼかす幅（0で二値）
+        key_color: 指定した場合、この背景色をクロマキーで透明化 (r, g, b)
+        key_tolerance: クロマキーの許容距離
+        use_numpy: NumPyが使える場合にNumPyで処理するか
+        palette: 共通パレット（Palette またはJSONのパス）。指定時は palette_colors を
+            使わず、パレットのLUTで減色する
+        log: 進捗表示用の関数（Noneで表示しない）
 
-    # 画像を読み込み
-    img = Image.open(input_path)
-    print(f"  Original size: {img.size}")
-    print(f"  Original mode: {img.mode}")
+    Returns:
+        変換後の画像（RGBA）
+    """
+    log = log or (lambda *args, **kwargs: None)
+    key_color = parse_color(key_color)
 
     # RGBAに変換
-    if img.mode != 'RGBA':
-        # 透明度がない場合、暗い部分を透明化
-        img = img.convert('RGB')
-        # 画像の明るさベースで透明度を作成
-        from PIL import ImageMath
-        # Lモード（グレースケール）に変換
-        gray = img.convert('L')
-        # 閾値より暗いピクセルを透明に
-        threshold = 30
-        alpha = gray.point(lambda p: 0 if p < threshold else 255)
+    if img.mode != 'RGBA' or key_color is not None:
+        # 透明度がない場合は暗い部分を、クロマキー指定時は背景色を透明化
+        alpha = alpha_key(img, alpha_threshold, feather, key_color, key_tolerance, use_numpy)
+        if img.mode == 'RGBA':
+            alpha = ImageChops.darker(img.getchannel('A'), alpha)
         img = img.convert('RGBA')
         img.putalpha(alpha)
-        print(f"  Added alpha channel (threshold={threshold})")
+        if key_color is None:
+            log(f"  Added alpha channel (threshold={alpha_threshold}, feather={feather})")
+        else:
+            log(f"  Chroma-keyed {key_color} (tolerance={key_tolerance}, feather={feather})")
 
     # ダウンサンプリング
     # スプライトシートの場合、幅はtarget_size * num_framesになる
     new_width = target_size * num_frames
     new_height = target_size
     img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    print(f"  Resized to: {img_resized.size}")
+    log(f"  Resized to: {img_resized.size}")
 
     # 色の量子化（パレット削減）
+    if palette is not None:
+        # 共通パレットへのLUT変換（画像ごとのパレット計算なし）
+        if not isinstance(palette, Palette):
+            palette = load_palette(str(palette))
+        img_resized = palette.apply(img_resized, use_numpy)
+        log(f"  Mapped to palette '{palette.name}' ({len(palette)} colors)")
     # RGBを分離して量子化
-    if palette_colors < 256:
+    elif palette_colors < 256:
         # Pモードに変換（パレット付き）
         img_rgb = img_resized.convert('RGB')
         img_palette = img_rgb.quantize(colors=palette_colors, method=Image.Quantize.MEDIANCUT)
@@ -58,50 +274,326 @@ def convert_to_pixel_art(input_path, output_path, target_size=48, num_frames=4,
         alpha = img_resized.split()[3]
         img_palette.putalpha(alpha)
         img_resized = img_palette
-        print(f"  Quantized to {palette_colors} colors")
+        log(f"  Quantized to {palette_colors} colors")
+
+    return img_resized
+
+
+def convert_to_pixel_art(
+    input_path,
+    output_path,
+    target_size=48,
+    num_frames=4,
+    palette_colors=16,
+    alpha_threshold=30,
+    feather=0,
+    key_color=None,
+    key_tolerance=0,
+    use_numpy=True,
+    palette=None,
+    indexed=False,
+    png_search=False,
+    verbose=True
+):
+    """
+    画像をピクセルアート風に変換
+
+    Args:
+        input_path: 入力画像パス
+        output_path: 出力画像パス
+        target_size: 目標サイズ（高さ）
+        num_frames: フレーム数
+        palette_colors: パレット色数
+        alpha_threshold: 透明度がない画像で、これより暗い部分を透明にする閾値
+        feather: 透明化の境界をぼかす幅（0で二値）
+        key_color: 指定した場合、この背景色をクロマキーで透明化 (r, g, b)
+        key_tolerance: クロマキーの許容距離
+        use_numpy: NumPyが使える場合にNumPyで処理するか
+        palette: 共通パレット（Palette またはJSONのパス）
+        indexed: パレットPNG（Pモード + tRNS、メタデータなし）で保存するか。
+            アルファは128を境に0/255へ二値化する
+        png_search: indexed時にPNGフィルタ・zlib戦略を探索して最小化するか
+        verbose: 進捗を表示するか
+
+    Returns:
+        変換後の画像（RGBA）。indexed時は保存サイズを info["png_bytes"] に
+        (RGBAで保存した場合, 実際のサイズ) として記録する
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log(f"Converting: {input_path}")
+
+    # 画像を読み込み
+    img = Image.open(input_path)
+    log(f"  Original size: {img.size}")
+    log(f"  Original mode: {img.mode}")
+
+    img_resized = pixelize(
+        img, target_size, num_frames, palette_colors, alpha_threshold,
+        feather, key_color, key_tolerance, use_numpy, palette, log
+    )
 
     # 保存
-    img_resized.save(output_path)
-    print(f"  ✅ Saved: {output_path}")
+    if indexed:
+        img_resized = binarize_alpha(img_resized)
+        data, method = optimize_image(img_resized, indexed=True, search=png_search)
+
+        rgba_buffer = io.BytesIO()
+        img_resized.save(rgba_buffer, 'PNG')
+        img_resized.info["png_bytes"] = (rgba_buffer.tell(), len(data))
+
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+        log(f"  ✅ Saved: {output_path} ({rgba_buffer.tell()} -> {len(data)} bytes, {method})")
+    else:
+        img_resized.save(output_path)
+        log(f"  ✅ Saved: {output_path}")
 
     # 統計情報
-    pixels = list(img_resized.getdata())
-    opaque = [p for p in pixels if p[3] > 128]
-    transparent = len(pixels) - len(opaque)
-    print(f"  Opaque pixels: {len(opaque)}/{len(pixels)} ({100*len(opaque)/len(pixels):.1f}%)")
-    print(f"  Transparent pixels: {transparent}/{len(pixels)} ({100*transparent/len(pixels):.1f}%)")
+    opaque, total = alpha_stats(img_resized, use_numpy)
+    transparent = total - opaque
+    log(f"  Opaque pixels: {opaque}/{total} ({100*opaque/total:.1f}%)")
+    log(f"  Transparent pixels: {transparent}/{total} ({100*transparent/total:.1f}%)")
 
     return img_resized
 
 
-if __name__ == "__main__":
-    base_path = "/workspaces/05_poc-godot/assets/characters/player"
-
-    # Player Idle
-    convert_to_pixel_art(
-        f"{base_path}/player_idle_single.png",
-        f"{base_path}/player_idle_48x48_4f.png",
-        target_size=48,
-        num_frames=4,
-        palette_colors=16
-    )
+def _output_path_for(input_path, params, output_dir=None):
+    """
+    出力パスを決定
 
-    # Player Walk
-    convert_to_pixel_art(
-        f"{base_path}/player_walk_single.png",
-        f"{base_path}/player_walk_48x48_4f.png",
-        target_size=48,
-        num_frames=4,
-        palette_colors=16
-    )
+    `<name>_single.png` は `<name>_<size>x<size>_<frames>f.png` に、
+    それ以外は `<name>_pixel.png` になる。
+    """
+    path = Path(input_path)
+    stem = path.stem
+    if stem.endswith("_single"):
+        size = params["target_size"]
+        name = f"{stem[:-len('_single')]}_{size}x{size}_{params['num_frames']}f.png"
+    else:
+        name = f"{stem}_pixel.png"
+
+    return str(Path(output_dir) / name if output_dir else path.with_name(name))
+
+
+def _expand(pattern, base_dir):
+    """ファイル・ディレクトリ・グロブを入力ファイルのリストに展開"""
+    path = Path(pattern)
+    if not path.is_absolute():
+        path = Path(base_dir) / path
+
+    if path.is_dir():
+        return sorted(str(p) for p in path.glob("*_single.png"))
+    if path.is_file():
+        return [str(path)]
+    return sorted(glob.glob(str(path), recursive=True))
+
+
+def collect_jobs(inputs, manifest, base_dir, overrides, output_dir=None):
+    """
+    変換ジョブの一覧を作成
+
+    パラメータの優先順位: コマンドライン > マニフェストのファイル指定 > defaults
+
+    Args:
+        inputs: コマンドラインで指定したファイル/ディレクトリ/グロブ
+        manifest: マニフェスト（defaults/files）
+        base_dir: 相対パスの基準ディレクトリ
+        overrides: コマンドラインで指定したパラメータ
+        output_dir: 出力ディレクトリ（Noneの場合は入力と同じ場所）
+
+    Returns:
+        [{"input", "output", "target_size", "num_frames", "palette_colors"}, ...]
+    """
+    defaults = {**DEFAULT_PARAMS, **manifest.get("defaults", {})}
+
+    # マニフェストのファイル指定を展開（後の指定が優先）
+    per_file = {}
+    manifest_inputs = []
+    for entry in manifest.get("files", []):
+        for path in _expand(entry["input"], base_dir):
+            per_file[path] = {**per_file.get(path, {}), **entry}
+            manifest_inputs.append(path)
+
+    paths = []
+    for pattern in inputs:
+        matched = _expand(pattern, base_dir)
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(matched)
+    if not inputs:
+        paths = manifest_inputs
 
-    # Player Hit
-    convert_to_pixel_art(
-        f"{base_path}/player_hit_single.png",
-        f"{base_path}/player_hit_48x48_2f.png",
-        target_size=48,
-        num_frames=2,
-        palette_colors=16
+    jobs = []
+    for path in dict.fromkeys(paths):
+        entry = per_file.get(path, {})
+        params = {key: entry.get(key, defaults[key]) for key in DEFAULT_PARAMS}
+        params.update(overrides)
+
+        output = entry.get("output")
+        if output and not Path(output).is_absolute():
+            output = str(Path(base_dir) / output)
+
+        if params["palette"] and not Path(params["palette"]).is_absolute():
+            params["palette"] = str(Path(base_dir) / params["palette"])
+
+        jobs.append({
+            "input": path,
+            "output": output or _output_path_for(path, params, output_dir),
+            **params,
+        })
+
+    return jobs
+
+
+def _convert_job(job):
+    """ワーカープロセスで1ファイルを変換"""
+    started = time.perf_counter()
+
+    with Image.open(job["input"]) as img:
+        input_pixels = img.size[0] * img.size[1]
+
+    Path(job["output"]).parent.mkdir(parents=True, exist_ok=True)
+    params = {key: value for key, value in job.items() if key not in ("input", "output")}
+    result = convert_to_pixel_art(job["input"], job["output"], verbose=False, **params)
+
+    return {
+        "seconds": time.perf_counter() - started,
+        "input_pixels": input_pixels,
+        "png_bytes": result.info.get("png_bytes"),
+    }
+
+
+def convert_batch(jobs, workers=None, import_base_dir=None):
+    """
+    変換ジョブをプロセスプールで並列実行
+
+    Args:
+        jobs: collect_jobs() の結果
+        workers: ワーカー数（NoneでCPUコア数）
+        import_base_dir: 指定時、このGodotプロジェクト内の出力に .import を書く
+            （エディタで開く前からピクセルアート向けの設定とUIDが決まる）
+
+    Returns:
+        失敗したジョブ数
+    """
+    workers = workers or os.cpu_count()
+    print(f"🔧 Converting {len(jobs)} file(s) with {workers} worker(s)...")
+    print()
+
+    started = time.perf_counter()
+    total_pixels = 0
+    total_cpu_seconds = 0.0
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_convert_job, job): job for job in jobs}
+
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"  ❌ {job['input']}: {e}")
+                failed += 1
+                continue
+
+            total_pixels += stats["input_pixels"]
+            total_cpu_seconds += stats["seconds"]
+            size_report = ""
+            if stats["png_bytes"]:
+                before, after = stats["png_bytes"]
+                size_report = f", {before:,} -> {after:,} bytes ({-100 * (before - after) / before:+.0f}%)"
+            if import_base_dir is not None:
+                try:
+                    write_texture_import(Path(job["output"]), Path(import_base_dir))
+                except ValueError:
+                    pass  # プロジェクト外（--output-dir など）には書かない
+            print(f"  ✅ {Path(job['input']).name} -> {Path(job['output']).name} "
+                  f"({stats['seconds'] * 1000:.0f} ms{size_report})")
+
+    elapsed = time.perf_counter() - started
+    converted = len(jobs) - failed
+    print()
+    print(f"📊 Converted {converted}/{len(jobs)} file(s) in {elapsed:.2f}s")
+    if elapsed > 0 and converted:
+        print(f"   Throughput: {converted / elapsed:.1f} files/s, "
+              f"{total_pixels / elapsed / 1e6:.1f} MPix/s")
+        print(f"   Parallel speedup: {total_cpu_seconds / elapsed:.1f}x")
+
+    return failed
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Convert DALL-E images to pixel-art sprite sheets")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Files, directories (*_single.png inside) or glob patterns"
     )
+    parser.add_argument("--manifest", help="JSON manifest with defaults and per-file parameters")
+    parser.add_argument("--output-dir", help="Output directory (default: next to each input)")
+    parser.add_argument("--target-size", type=int, help="Frame height in pixels")
+    parser.add_argument("--frames", type=int, help="Number of frames")
+    parser.add_argument("--palette-colors", type=int, help="Palette size")
+    parser.add_argument("--alpha-threshold", type=int, help="Brightness below which pixels become transparent")
+    parser.add_argument("--feather", type=int, help="Width of the soft alpha ramp around the threshold")
+    parser.add_argument("--key-color", help="Chroma-key background color ('#rrggbb' or 'r,g,b')")
+    parser.add_argument("--key-tolerance", type=int, help="Max channel distance treated as background")
+    parser.add_argument("--palette", help="Shared palette JSON (see palette.py) instead of per-image quantization")
+    parser.add_argument("--indexed", action="store_true",
+                        help="Write palette PNGs (P mode + tRNS, binary alpha, no metadata)")
+    parser.add_argument("--png-search", action="store_true",
+                        help="With --indexed, search PNG filters / zlib strategies for the smallest file")
+    parser.add_argument("--no-numpy", action="store_true", help="Use the Pillow-only code path")
+    parser.add_argument("--no-import", action="store_true",
+                        help="Do not write Godot .import files next to outputs inside --base-dir")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--base-dir", default=BASE_DIR, help=f"Base for relative paths (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    if args.manifest:
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+    elif args.inputs:
+        manifest = {}
+    else:
+        manifest = PLAYER_MANIFEST
+
+    overrides = {
+        key: value
+        for key, value in (
+            ("target_size", args.target_size),
+            ("num_frames", args.frames),
+            ("palette_colors", args.palette_colors),
+            ("alpha_threshold", args.alpha_threshold),
+            ("feather", args.feather),
+            ("key_color", args.key_color),
+            ("key_tolerance", args.key_tolerance),
+            ("palette", args.palette),
+        )
+        if value is not None
+    }
+    if args.no_numpy:
+        overrides["use_numpy"] = False
+    if args.indexed:
+        overrides["indexed"] = True
+    if args.png_search:
+        overrides["png_search"] = True
+
+    jobs = collect_jobs(args.inputs, manifest, args.base_dir, overrides, args.output_dir)
+    if not jobs:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    failed = convert_batch(jobs, workers=args.jobs, import_base_dir=None if args.no_import else args.base_dir)
+    if failed:
+        sys.exit(1)
 
     print("\n🎉 All conversions complete!")
+
+
+if __name__ == "__main__":
+    main()
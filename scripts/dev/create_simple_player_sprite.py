@@ -6,6 +6,8 @@
 
 from PIL import Image, ImageDraw
 
+from animate_frames import synthesize_sheet
+
 def create_player_sprite(size=48):
     """プレイヤースプライトを作成（三角形の船型）"""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -43,37 +45,40 @@ def create_sprite_sheet(sprite, num_frames):
 
     return sheet
 
-# Player Idle（4フレーム）
-idle_sprite = create_player_sprite(48)
-idle_sheet = create_sprite_sheet(idle_sprite, 4)
-idle_sheet.save('/workspaces/05_poc-godot/assets/characters/player/player_idle_48x48_4f.png')
-print("✅ Created: player_idle_48x48_4f.png")
-
-# Player Walk（4フレーム - わずかに傾ける）
-walk_frames = []
-for i in range(4):
-    img = create_player_sprite(48)
-    # 左右に少し傾ける
-    angle = 5 if i % 2 == 0 else -5
-    rotated = img.rotate(angle, expand=False, fillcolor=(0, 0, 0, 0))
-    walk_frames.append(rotated)
-
-walk_sheet = Image.new('RGBA', (48 * 4, 48), (0, 0, 0, 0))
-for i, frame in enumerate(walk_frames):
-    walk_sheet.paste(frame, (48 * i, 0))
-walk_sheet.save('/workspaces/05_poc-godot/assets/characters/player/player_walk_48x48_4f.png')
-print("✅ Created: player_walk_48x48_4f.png")
-
-# Player Hit（2フレーム - 赤く点滅）
-hit_sprite = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
-draw = ImageDraw.Draw(hit_sprite)
-cx, cy = 24, 24
-points = [(cx, cy - 16), (cx - 12, cy + 16), (cx + 12, cy + 16)]
-draw.polygon(points, fill=(255, 76, 76, 255))  # 赤
-draw.line(points + [points[0]], fill=(255, 255, 255, 255), width=2)
-
-hit_sheet = create_sprite_sheet(hit_sprite, 2)
-hit_sheet.save('/workspaces/05_poc-godot/assets/characters/player/player_hit_48x48_2f.png')
-print("✅ Created: player_hit_48x48_2f.png")
-
-print("\n🎉 All player sprites created successfully!")
+def create_idle_sheet():
+    """Player Idle（4フレーム）"""
+    idle_sprite = create_player_sprite(48)
+    return create_sprite_sheet(idle_sprite, 4)
+
+def create_walk_sheet():
+    """Player Walk（4フレーム - 上下動しながら左右に傾ける）"""
+    return synthesize_sheet(create_player_sprite(48), "walk", 4)
+
+def create_hit_sheet():
+    """Player Hit（2フレーム - 赤く点滅、反動で縮む）"""
+    hit_sprite = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(hit_sprite)
+    cx, cy = 24, 24
+    points = [(cx, cy - 16), (cx - 12, cy + 16), (cx + 12, cy + 16)]
+    draw.polygon(points, fill=(255, 76, 76, 255))  # 赤
+    draw.line(points + [points[0]], fill=(255, 255, 255, 255), width=2)
+
+    return synthesize_sheet(hit_sprite, "recoil", 2)
+
+# 出力ファイル名 -> 生成関数
+PLAYER_SHEETS = {
+    'player_idle_48x48_4f.png': create_idle_sheet,
+    'player_walk_48x48_4f.png': create_walk_sheet,
+    'player_hit_48x48_2f.png': create_hit_sheet,
+}
+
+def main(output_dir='/workspaces/05_poc-godot/assets/characters/player'):
+    """全プレイヤースプライトを生成"""
+    for filename, builder in PLAYER_SHEETS.items():
+        builder().save(f'{output_dir}/{filename}')
+        print(f"✅ Created: {filename}")
+
+    print("\n🎉 All player sprites created successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@
 スプライトシート作成スクリプト
 
 DALL-Eで生成した単一フレームを複数回複製して、
-横並びのスプライトシートを作成します。
+横並びのスプライトシートを作成します。モーション名を指定すると、
+複製の代わりに animate_frames.py のモーションでフレームを合成します。
 
 使用例:
     # 4フレームのスプライトシート作成
@@ -12,6 +13,9 @@ DALL-Eで生成した単一フレームを複数回複製して、
     # 6フレームのスプライトシート作成
     python3 create_sprite_sheet.py tank_boss_single.png tank_boss_idle_96x96_6f.png 6
 
+    # 上下動（bob）で4フレームを合成
+    python3 create_sprite_sheet.py player_idle_single.png player_idle_48x48_4f.png 4 bob
+
 必要なライブラリ:
     pip install Pillow
 """
@@ -27,7 +31,29 @@ except ImportError:
     sys.exit(1)
 
 
-def create_sprite_sheet(input_path: str, output_path: str, num_frames: int):
+def tile_frames(frame: Image.Image, num_frames: int) -> Image.Image:
+    """
+    単一フレームを横に num_frames 枚並べたスプライトシートを作成（メモリ上）
+
+    Args:
+        frame: 単一フレーム画像
+        num_frames: フレーム数
+
+    Returns:
+        スプライトシート（RGBA）
+    """
+    if frame.mode != "RGBA":
+        frame = frame.convert("RGBA")
+
+    width, height = frame.size
+    sprite_sheet = Image.new("RGBA", (width * num_frames, height), (0, 0, 0, 0))
+    for i in range(num_frames):
+        sprite_sheet.paste(frame, (width * i, 0))
+
+    return sprite_sheet
+
+
+def create_sprite_sheet(input_path: str, output_path: str, num_frames: int, motion: str = "static"):
     """
     単一フレーム画像から横並びのスプライトシートを作成
 
@@ -35,6 +61,7 @@ def create_sprite_sheet(input_path: str, output_path: str, num_frames: int):
         input_path: 入力画像パス（単一フレーム）
         output_path: 出力画像パス（スプライトシート）
         num_frames: フレーム数
+        motion: フレームの合成に使うモーション（animate_frames.MOTIONS、"static" で複製のみ）
     """
     input_file = Path(input_path)
     output_file = Path(output_path)
@@ -59,6 +86,7 @@ def create_sprite_sheet(input_path: str, output_path: str, num_frames: int):
     print(f"   Size: {width}×{height}")
     print(f"   Mode: {mode}")
     print(f"   Frames: {num_frames}")
+    print(f"   Motion: {motion}")
     print()
 
     # RGBAモードに変換（透過対応）
@@ -73,13 +101,14 @@ def create_sprite_sheet(input_path: str, output_path: str, num_frames: int):
     print(f"📝 Creating sprite sheet...")
     print(f"   Output Size: {sheet_width}×{sheet_height}")
 
-    sprite_sheet = Image.new("RGBA", (sheet_width, sheet_height), (0, 0, 0, 0))
-
     # フレームを横並びに配置
+    if motion == "static":
+        sprite_sheet = tile_frames(frame, num_frames)
+    else:
+        from animate_frames import synthesize_sheet
+        sprite_sheet = synthesize_sheet(frame, motion, num_frames)
     for i in range(num_frames):
-        x_offset = width * i
-        sprite_sheet.paste(frame, (x_offset, 0))
-        print(f"   Frame {i+1}/{num_frames}: x={x_offset}")
+        print(f"   Frame {i+1}/{num_frames}: x={width * i}")
 
     # 出力ディレクトリ作成
     output_file.parent.mkdir(parents=True, exist_ok=True)
@@ -98,12 +127,13 @@ def create_sprite_sheet(input_path: str, output_path: str, num_frames: int):
 
 def main():
     """メイン関数"""
-    if len(sys.argv) != 4:
-        print("Usage: python3 create_sprite_sheet.py <input_image> <output_image> <num_frames>")
+    if len(sys.argv) not in (4, 5):
+        print("Usage: python3 create_sprite_sheet.py <input_image> <output_image> <num_frames> [motion]")
         print()
         print("Examples:")
         print("  python3 create_sprite_sheet.py player_idle.png player_idle_48x48_4f.png 4")
         print("  python3 create_sprite_sheet.py tank_boss.png tank_boss_idle_96x96_6f.png 6")
+        print("  python3 create_sprite_sheet.py player_idle.png player_idle_48x48_4f.png 4 bob")
         sys.exit(1)
 
     input_path = sys.argv[1]
@@ -118,12 +148,19 @@ def main():
         print(f"   {e}")
         sys.exit(1)
 
+    motion = sys.argv[4] if len(sys.argv) == 5 else "static"
+    if motion != "static":
+        from animate_frames import MOTIONS
+        if motion not in MOTIONS:
+            print(f"❌ Error: Unknown motion: {motion} (available: {', '.join(MOTIONS)})")
+            sys.exit(1)
+
     print("=" * 60)
     print("  Sprite Sheet Creator")
     print("=" * 60)
     print()
 
-    create_sprite_sheet(input_path, output_path, num_frames)
+    create_sprite_sheet(input_path, output_path, num_frames, motion)
 
 
 if __name__ == "__main__":
@@ -12,31 +12,69 @@ OpenAI DALL-E 3 API を使用してゲームアセットを自動生成
     # カスタムプロンプト
     python3 generate_asset_with_dalle.py --prompt "32x32 pixel art slime" --output slime.png
 
+    # 画像をレスポンスに埋め込んで受け取る（ダウンロード不要）
+    python3 generate_asset_with_dalle.py --asset player_idle --b64-json
+
     # バッチ生成（設定ファイル使用）
     python3 generate_asset_with_dalle.py --batch assets_config.json
 
+    # 並列バッチ生成（同時4件、APIリクエストは毎分10件まで）
+    python3 generate_asset_with_dalle.py --batch assets_config.json --concurrency 4 --rate 10
+
+    # キャッシュを無視して再生成 / キャッシュにあるものだけ配置
+    python3 generate_asset_with_dalle.py --asset player_idle --force
+    python3 generate_asset_with_dalle.py --batch assets_config.json --cache-only
+
+    # 中断したバッチを再開（完了済みのアセットを飛ばす）
+    python3 generate_asset_with_dalle.py --batch assets_config.json --resume
+
+    # ステージごとの計測（Chrome trace / アセットごとのメトリクスJSONL）
+    python3 generate_asset_with_dalle.py --batch assets_config.json --trace trace.json --metrics metrics.jsonl
+
+    # ローカルのスタブサーバーに向けて実行
+    python3 generate_asset_with_dalle.py --batch player_idle --base-url http://127.0.0.1:8000/v1
+
+    # 定義の検証・実行計画の表示（APIキー・openai不要）
+    python3 generate_asset_with_dalle.py --validate
+    python3 generate_asset_with_dalle.py --batch assets_config.json --dry-run
+
 必要なライブラリ:
     pip install openai pillow requests
+    （--list / --validate / --dry-run には不要。生成時にのみ読み込む）
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import json
+import base64
+import hashlib
+import atexit
 import argparse
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from io import BytesIO
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
 
-try:
+from batch_journal import BatchJournal, fingerprint
+from generation_cache import GenerationCache, DEFAULT_MAX_BYTES
+from godot_resources import strip_regions, write_sprite_frames, write_texture_import
+from tracing import Tracer, NULL_TRACER
+
+if TYPE_CHECKING:
     from openai import OpenAI
     import requests
     from PIL import Image
-    from io import BytesIO
-except ImportError as e:
-    print(f"❌ Error: Required library not installed: {e}")
-    print("\nPlease install required libraries:")
-    print("  pip install openai pillow requests")
-    sys.exit(1)
+
+# openai / requests / Pillow は読み込みに時間がかかるため、生成を行うときに
+# load_dependencies() で読み込む（PROMPTS の参照や --list を軽くするため）
+OpenAI = None
+requests = None
+Image = None
 
 
 # プロンプト定義（dalle-prompts.mdから抽出）
@@ -46,21 +84,33 @@ PROMPTS = {
         "prompt": "Create a 48x48 sprite for a 2D game. Super-deformed (SD) minimal character based on a rounded capsule body. STRICTLY front view / straight-on (orthographic), perfectly symmetrical pose, looking directly at the camera. (This is the master design for all other motions.) Extremely thick black outline. Flat 2D anime cel shading. Vector-like clean shapes. No gradients. No textures. No stitches. No decorations. No eye highlights. Eyes are solid black oval dots. Very small straight mouth. Body uses 3 pastel color blocks: off-white base, soft pink on upper left, mint green on lower right. Background must be fully transparent (RGBA with alpha channel). No background color. Clean, readable silhouette at 48x48.",
         "output": "assets/characters/player/player_idle_single.png",
         "frames": 4,
-        "final_output": "assets/characters/player/player_idle_48x48_4f.png"
+        "final_output": "assets/characters/player/player_idle_48x48_4f.png",
+        "animation": "idle",
+        "fps": 8,
+        "loop": True,
+        "sprite_frames": "assets/characters/player/player_frames.tres"
     },
 
     "player_walk": {
         "prompt": "Create a 48x48 sprite for a 2D game. BASED ON the exact same character design as player_idle (same proportions, same color-block layout, same face placement, same outline thickness). Keep the SAME strict front view / straight-on angle (do NOT rotate the character, do NOT change perspective). Only add motion via subtle vertical bob and slight squash/stretch across frames to suggest walking. Extremely thick black outline. Flat 2D anime cel shading. No gradients. No textures. No stitches. No decorations. No eye highlights. Solid black oval eyes, tiny straight mouth. 3 pastel color blocks: off-white, soft pink, mint green. Background must be fully transparent (RGBA with alpha channel). No background color.",
         "output": "assets/characters/player/player_walk_single.png",
         "frames": 4,
-        "final_output": "assets/characters/player/player_walk_48x48_4f.png"
+        "final_output": "assets/characters/player/player_walk_48x48_4f.png",
+        "animation": "walk",
+        "fps": 12,
+        "loop": True,
+        "sprite_frames": "assets/characters/player/player_frames.tres"
     },
 
     "player_hit": {
         "prompt": "Create a 48x48 sprite for a 2D game. BASED ON the exact same character design as player_idle (same proportions, same color-block layout, same face placement, same outline thickness). Keep the SAME strict front view / straight-on angle (do NOT rotate the character, do NOT change perspective). Hit motion: quick squash and slight recoil while preserving the design. Optional brief white flash overlay on one frame. Extremely thick black outline. Flat 2D anime cel shading. No gradients. No textures. No stitches. No decorations. No eye highlights. Solid black oval eyes, tiny straight mouth. 3 pastel color blocks: off-white, soft pink, mint green. Background must be fully transparent (RGBA with alpha channel). No background color.",
         "output": "assets/characters/player/player_hit_single.png",
         "frames": 2,
-        "final_output": "assets/characters/player/player_hit_48x48_2f.png"
+        "final_output": "assets/characters/player/player_hit_48x48_2f.png",
+        "animation": "hit",
+        "fps": 15,
+        "loop": False,
+        "sprite_frames": "assets/characters/player/player_frames.tres"
     },
 
 
@@ -69,25 +119,45 @@ PROMPTS = {
         "prompt": "Create a 32x32 pixel art sprite of a small slime monster, viewed from top-down perspective, facing upward. The slime should be green with a simple cute design. Use a 12-color palette. Transparent background, PNG format. Single sprite, no animation frames. Make it suitable for a vampire survivors-style enemy that appears in large numbers.",
         "output": "assets/characters/enemies/basic_enemy_single.png",
         "frames": 4,
-        "final_output": "assets/characters/enemies/basic_enemy_idle_32x32_4f.png"
+        "final_output": "assets/characters/enemies/basic_enemy_idle_32x32_4f.png",
+        "animation": "idle",
+        "fps": 8,
+        "loop": True,
+        "sprite_frames": "assets/characters/enemies/basic_enemy_frames.tres",
+        "palette": "enemies"
     },
     "strong_enemy": {
         "prompt": "Create a 40x40 pixel art sprite of a skeleton warrior, viewed from top-down perspective, facing upward. The skeleton should hold a sword and shield, with white bones and dark armor accents. Use a 16-color palette. Transparent background, PNG format. Single sprite, no animation frames. Make it look tougher than basic enemies.",
         "output": "assets/characters/enemies/strong_enemy_single.png",
         "frames": 4,
-        "final_output": "assets/characters/enemies/strong_enemy_idle_40x40_4f.png"
+        "final_output": "assets/characters/enemies/strong_enemy_idle_40x40_4f.png",
+        "animation": "idle",
+        "fps": 8,
+        "loop": True,
+        "sprite_frames": "assets/characters/enemies/strong_enemy_frames.tres",
+        "palette": "enemies"
     },
     "fast_enemy": {
         "prompt": "Create a 28x28 pixel art sprite of a small bat creature, viewed from top-down perspective, facing upward. The bat should have spread wings suggesting fast movement, with purple and black colors. Use a 12-color palette. Transparent background, PNG format. Single sprite, no animation frames. Make it look agile and fast.",
         "output": "assets/characters/enemies/fast_enemy_single.png",
         "frames": 4,
-        "final_output": "assets/characters/enemies/fast_enemy_idle_28x28_4f.png"
+        "final_output": "assets/characters/enemies/fast_enemy_idle_28x28_4f.png",
+        "animation": "idle",
+        "fps": 12,
+        "loop": True,
+        "sprite_frames": "assets/characters/enemies/fast_enemy_frames.tres",
+        "palette": "enemies"
     },
     "heavy_enemy": {
         "prompt": "Create a 56x56 pixel art sprite of a large orc warrior, viewed from top-down perspective, facing upward. The orc should be bulky and intimidating, with green skin and heavy armor. Use a 16-color palette. Transparent background, PNG format. Single sprite, no animation frames. Make it look slow but powerful.",
         "output": "assets/characters/enemies/heavy_enemy_single.png",
         "frames": 4,
-        "final_output": "assets/characters/enemies/heavy_enemy_idle_56x56_4f.png"
+        "final_output": "assets/characters/enemies/heavy_enemy_idle_56x56_4f.png",
+        "animation": "idle",
+        "fps": 6,
+        "loop": True,
+        "sprite_frames": "assets/characters/enemies/heavy_enemy_frames.tres",
+        "palette": "enemies"
     },
 
     # Bosses
@@ -95,19 +165,34 @@ PROMPTS = {
         "prompt": "Create a 96x96 pixel art sprite of a massive stone golem boss, viewed from top-down perspective, facing upward. The golem should be heavily armored with rocky texture, glowing red eyes, and intimidating presence. Use a 20-color palette with gray, brown, and red accents. Transparent background, PNG format. Single sprite, no animation frames. Make it look like a final boss that takes many hits.",
         "output": "assets/characters/bosses/tank_boss_single.png",
         "frames": 6,
-        "final_output": "assets/characters/bosses/tank_boss_idle_96x96_6f.png"
+        "final_output": "assets/characters/bosses/tank_boss_idle_96x96_6f.png",
+        "animation": "idle",
+        "fps": 6,
+        "loop": True,
+        "sprite_frames": "assets/characters/bosses/tank_boss_frames.tres",
+        "palette": "bosses"
     },
     "sniper_boss": {
         "prompt": "Create an 80x80 pixel art sprite of a dark archer boss, viewed from top-down perspective, facing upward. The archer should hold a glowing magical bow, wear a dark hooded cloak, and have a mysterious presence. Use a 20-color palette with dark purple, black, and cyan accents. Transparent background, PNG format. Single sprite, no animation frames. Make it look like a ranged boss enemy.",
         "output": "assets/characters/bosses/sniper_boss_single.png",
         "frames": 6,
-        "final_output": "assets/characters/bosses/sniper_boss_idle_80x80_6f.png"
+        "final_output": "assets/characters/bosses/sniper_boss_idle_80x80_6f.png",
+        "animation": "idle",
+        "fps": 8,
+        "loop": True,
+        "sprite_frames": "assets/characters/bosses/sniper_boss_frames.tres",
+        "palette": "bosses"
     },
     "swarm_boss": {
         "prompt": "Create an 88x88 pixel art sprite of a necromancer boss surrounded by swirling dark energy and small skulls, viewed from top-down perspective, facing upward. The necromancer should wear dark robes and hold a staff. Use a 20-color palette with dark green, black, and white accents. Transparent background, PNG format. Single sprite, no animation frames. Make it look like a boss that summons minions.",
         "output": "assets/characters/bosses/swarm_boss_single.png",
         "frames": 6,
-        "final_output": "assets/characters/bosses/swarm_boss_idle_88x88_6f.png"
+        "final_output": "assets/characters/bosses/swarm_boss_idle_88x88_6f.png",
+        "animation": "idle",
+        "fps": 10,
+        "loop": True,
+        "sprite_frames": "assets/characters/bosses/swarm_boss_frames.tres",
+        "palette": "bosses"
     },
 
     # Projectiles
@@ -121,7 +206,11 @@ PROMPTS = {
         "prompt": "Create a 24x24 pixel art sprite of an explosive fireball projectile, viewed from top-down perspective. The fireball should be orange and yellow with a swirling pattern. Use a 12-color palette. Transparent background, PNG format. Single sprite. Make it look like it will explode on impact.",
         "output": "assets/weapons/projectiles/area_blast_single.png",
         "frames": 4,
-        "final_output": "assets/weapons/projectiles/area_blast_projectile_24x24_4f.png"
+        "final_output": "assets/weapons/projectiles/area_blast_projectile_24x24_4f.png",
+        "animation": "default",
+        "fps": 12,
+        "loop": True,
+        "sprite_frames": "assets/weapons/projectiles/area_blast_frames.tres"
     },
 
     # Items
@@ -129,59 +218,441 @@ PROMPTS = {
         "prompt": "Create a 12x12 pixel art sprite of a small glowing experience orb, viewed from top-down perspective. The orb should be bright yellow or gold with a gentle glow. Use an 8-color palette. Transparent background, PNG format. Single sprite. Make it small and collectible.",
         "output": "assets/items/exp_orb_small_single.png",
         "frames": 4,
-        "final_output": "assets/items/exp_orb_small_12x12_4f.png"
+        "final_output": "assets/items/exp_orb_small_12x12_4f.png",
+        "animation": "default",
+        "fps": 8,
+        "loop": True,
+        "sprite_frames": "assets/items/exp_orb_small_frames.tres"
     },
     "exp_orb_medium": {
         "prompt": "Create a 16x16 pixel art sprite of a medium glowing experience orb, viewed from top-down perspective. The orb should be bright green with a stronger glow than the small version. Use a 10-color palette. Transparent background, PNG format. Single sprite. Make it more valuable-looking than the small orb.",
         "output": "assets/items/exp_orb_medium_single.png",
         "frames": 4,
-        "final_output": "assets/items/exp_orb_medium_16x16_4f.png"
+        "final_output": "assets/items/exp_orb_medium_16x16_4f.png",
+        "animation": "default",
+        "fps": 8,
+        "loop": True,
+        "sprite_frames": "assets/items/exp_orb_medium_frames.tres"
     },
 }
 
 
+BASE_DIR = Path("/workspaces/05_poc-godot")
+MODEL = "dall-e-3"
+DEFAULT_SIZE = "1024x1024"
+DEFAULT_QUALITY = "standard"
+DEFAULT_STYLE = "vivid"
+
+# 画像ダウンロード設定
+DOWNLOAD_MAX_BYTES = 32 * 1024 * 1024  # 32 MiB（HD 1792x1024 PNG でも数MB）
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 1.0  # 秒（リトライごとに2倍）
+DOWNLOAD_MAX_RETRY_AFTER = 60.0  # 秒（これより長い Retry-After は無視してバックオフ）
+DOWNLOAD_POOL_SIZE = 16
+
+
+def _download_retry_delay(response: Optional["requests.Response"], attempt: int) -> Optional[float]:
+    """
+    ダウンロードの失敗をリトライするまでの待ち時間
+
+    OpenAI SDK のAPI呼び出しと同じく、429 と 5xx はリトライし、Retry-After
+    （秒またはHTTP日付）があればそれに従う。
+
+    Args:
+        response: 失敗したレスポンス（接続エラー等でレスポンスがない場合はNone）
+        attempt: 何回目の試行か（0始まり）
+
+    Returns:
+        待ち時間（秒）。リトライしないステータスならNone
+    """
+    backoff = DOWNLOAD_BACKOFF * (2 ** attempt)
+    if response is None:
+        return backoff
+    if response.status_code != 429 and response.status_code < 500:
+        return None
+
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None and 0 <= delay <= DOWNLOAD_MAX_RETRY_AFTER:
+            return delay
+    return backoff
+
+
+def load_dependencies():
+    """生成に必要なライブラリ（openai / requests / Pillow）を読み込む"""
+    global OpenAI, requests, Image
+    if OpenAI is not None:
+        return
+
+    try:
+        from openai import OpenAI as _OpenAI
+        import requests as _requests
+        from PIL import Image as _Image
+    except ImportError as e:
+        print(f"❌ Error: Required library not installed: {e}")
+        print("\nPlease install required libraries:")
+        print("  pip install openai pillow requests")
+        sys.exit(1)
+
+    requests, Image, OpenAI = _requests, _Image, _OpenAI
+
+
+def sprite_frames_animations(sprite_frames: str, base_dir: Path = BASE_DIR) -> list:
+    """
+    SpriteFrames リソースに含めるアニメーション定義を PROMPTS から集める
+
+    同じ "sprite_frames" を持つアセットのうち、スプライトシートが
+    存在するものを1つのリソースにまとめる（例: player の idle/walk/hit）。
+
+    Args:
+        sprite_frames: .tres の出力パス（base_dirからの相対パス）
+        base_dir: プロジェクトルート
+
+    Returns:
+        godot_resources.write_sprite_frames() に渡すアニメーション定義
+    """
+    animations = []
+    for config in PROMPTS.values():
+        if config.get("sprite_frames") != sprite_frames:
+            continue
+
+        sheet = base_dir / config["final_output"]
+        if not sheet.exists():
+            continue
+
+        animations.append({
+            "name": config.get("animation", "default"),
+            "speed": config.get("fps", 8),
+            "loop": config.get("loop", True),
+            "frames": [
+                {"texture": sheet, **entry}
+                for entry in strip_regions(sheet, config["frames"])
+            ],
+        })
+
+    return animations
+
+
+def validate_prompts(prompts: Dict[str, Dict[str, Any]] = PROMPTS) -> List[str]:
+    """
+    アセット定義（PROMPTS）の整合性を検証
+
+    Args:
+        prompts: アセット定義
+
+    Returns:
+        エラーメッセージのリスト（問題がなければ空）
+    """
+    errors = []
+    outputs: Dict[str, str] = {}
+
+    for name, config in prompts.items():
+        for key in ("prompt", "output", "frames"):
+            if key not in config:
+                errors.append(f"{name}: missing '{key}'")
+        if not config.get("prompt", "").strip():
+            errors.append(f"{name}: empty prompt")
+
+        frames = config.get("frames", 0)
+        if not isinstance(frames, int) or frames < 0:
+            errors.append(f"{name}: 'frames' must be a non-negative integer (got {frames!r})")
+        elif frames > 0 and "final_output" not in config:
+            errors.append(f"{name}: animated asset needs 'final_output'")
+
+        if "sprite_frames" in config and not (isinstance(frames, int) and frames > 0):
+            errors.append(f"{name}: 'sprite_frames' requires an animated asset")
+
+        if "motion" in config:
+            from animate_frames import MOTIONS
+            if config["motion"] not in MOTIONS:
+                errors.append(f"{name}: unknown motion {config['motion']!r} (available: {', '.join(MOTIONS)})")
+
+        for key in ("output", "final_output"):
+            path = config.get(key)
+            if path is None:
+                continue
+            if not path.endswith(".png"):
+                errors.append(f"{name}: '{key}' must be a .png path ({path})")
+            if path in outputs:
+                errors.append(f"{name}: '{key}' {path} is also written by {outputs[path]}")
+            outputs[path] = name
+
+    return errors
+
+
+def load_batch(spec: str) -> List[str]:
+    """
+    バッチ指定（JSONファイルまたはカンマ区切り）をアセット名のリストにする
+
+    Args:
+        spec: "assets_config.json" または "player_idle,player_walk"
+
+    Returns:
+        アセット名のリスト
+
+    Raises:
+        ValueError: JSONファイルが読めない場合
+    """
+    if not spec.endswith(".json"):
+        return [name.strip() for name in spec.split(",") if name.strip()]
+
+    try:
+        with open(spec) as f:
+            return list(json.load(f).get("assets", []))
+    except (OSError, ValueError, AttributeError) as e:
+        raise ValueError(f"cannot load batch file {spec}: {e}") from e
+
+
+def default_journal_path(spec: str, base_dir: Path = BASE_DIR) -> Path:
+    """
+    バッチ指定に対応するジャーナルのパス（同じ指定なら同じファイル）
+
+    Args:
+        spec: --batch の値
+        base_dir: プロジェクトルート
+
+    Returns:
+        <base_dir>/.cache/batches/<名前>.jsonl
+    """
+    if spec.endswith(".json"):
+        name = Path(spec).stem
+    else:
+        name = "list-" + hashlib.sha256(",".join(load_batch(spec)).encode("utf-8")).hexdigest()[:12]
+    return base_dir / ".cache" / "batches" / f"{name}.jsonl"
+
+
+def plan_assets(
+    assets: List[str],
+    base_dir: Path = BASE_DIR,
+    cache: Optional[GenerationCache] = None
+) -> List[Dict[str, Any]]:
+    """
+    各アセットをどう処理するかを調べる（APIは呼ばない）
+
+    Args:
+        assets: アセット名のリスト
+        base_dir: プロジェクトルート
+        cache: 生成キャッシュ（Noneの場合はキャッシュを考慮しない）
+
+    Returns:
+        アセットごとの {"asset", "action", "output", "exists"}。
+        action は "unknown"（未定義）/ "cached"（キャッシュから配置）/ "generate"（API呼び出し）
+    """
+    plan = []
+    for name in assets:
+        config = PROMPTS.get(name)
+        if config is None:
+            plan.append({"asset": name, "action": "unknown", "output": None, "exists": False})
+            continue
+
+        action = "generate"
+        if cache is not None:
+            key = cache.make_key(config["prompt"], MODEL, DEFAULT_SIZE, DEFAULT_QUALITY,
+                                 DEFAULT_STYLE, config.get("revision"))
+            if key in cache:
+                action = "cached"
+
+        output = config.get("final_output") or config["output"]
+        plan.append({
+            "asset": name,
+            "action": action,
+            "output": output,
+            "exists": (base_dir / output).exists(),
+        })
+
+    return plan
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限（スレッドセーフ）"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        初期化
+
+        Args:
+            rate: 1秒あたりに補充されるトークン数（0以下で無制限）
+            capacity: バケット容量（連続で許可するリクエスト数）
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得（不足している場合は補充まで待機）
+
+        Returns:
+            待機した秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
 class DALLEAssetGenerator:
     """DALL-E 3を使用してアセットを生成"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        base_dir: Optional[str] = None,
+        cache: Optional[GenerationCache] = None,
+        cache_only: bool = False,
+        max_download_bytes: int = DOWNLOAD_MAX_BYTES,
+        response_format: str = "url",
+        keep_single: bool = True,
+        tracer: Optional[Tracer] = None,
+        client: Optional[Any] = None
+    ):
         """
         初期化
 
         Args:
             api_key: OpenAI APIキー（Noneの場合は環境変数から取得）
+            base_url: APIのベースURL（ローカルのスタブサーバーを使う場合に指定）
+            base_dir: アセット出力先のプロジェクトルート
+            cache: 生成キャッシュ（Noneの場合はキャッシュしない）
+            cache_only: キャッシュにある画像のみ使用し、APIを呼ばない
+            max_download_bytes: ダウンロードする画像1枚あたりのサイズ上限（バイト）
+            response_format: "url"（URLからダウンロード）または
+                "b64_json"（レスポンスに埋め込まれた画像をメモリ上でデコード）
+            keep_single: 単一フレーム画像（*_single.png）を保存するか
+                （b64_json でスプライトシートを作るアセットのみ省略可能。
+                シートはメモリ上の画像から作る）
+            tracer: ステージごとの計測（Noneの場合は計測しない）
+            client: 画像生成のバックエンド（OpenAIクライアント互換の
+                images.generate() を持つオブジェクト。Noneの場合は OpenAI を使う）
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
 
-        if not self.api_key:
+        if client is None and not self.api_key:
             raise ValueError(
                 "OpenAI API key not found. "
                 "Set OPENAI_API_KEY environment variable or pass api_key parameter."
             )
 
-        self.client = OpenAI(api_key=self.api_key)
-        self.base_dir = Path("/workspaces/05_poc-godot")
+        load_dependencies()
+        self.client = client if client is not None else OpenAI(api_key=self.api_key, base_url=base_url)
+        self.base_dir = Path(base_dir) if base_dir else BASE_DIR
+        self.rate_limiter: Optional[TokenBucket] = None
+        self.cache = cache
+        self.cache_only = cache_only
+        self._resource_lock = threading.Lock()
+        self.max_download_bytes = max_download_bytes
+        self.response_format = response_format
+        self.keep_single = keep_single
+        self.tracer = tracer or NULL_TRACER
+        self.journal: Optional[BatchJournal] = None
+
+        # バッチ全体で接続を再利用する（並列ダウンロード分のプールを確保）
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=DOWNLOAD_POOL_SIZE,
+            pool_maxsize=DOWNLOAD_POOL_SIZE
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def generate_image(
         self,
         prompt: str,
         output_path: str,
-        size: str = "1024x1024",
-        quality: str = "standard",
-        style: str = "vivid"
+        size: str = DEFAULT_SIZE,
+        quality: str = DEFAULT_QUALITY,
+        style: str = DEFAULT_STYLE,
+        revision: Optional[str] = None,
+        force: bool = False
     ) -> bool:
         """
         DALL-E 3で画像を生成
 
+        詳細は _generate_image() を参照。
+
+        Returns:
+            成功したかどうか
+        """
+        success, _ = self._generate_image(prompt, output_path, size, quality, style, revision, force)
+        return success
+
+    def _generate_image(
+        self,
+        prompt: str,
+        output_path: str,
+        size: str = DEFAULT_SIZE,
+        quality: str = DEFAULT_QUALITY,
+        style: str = DEFAULT_STYLE,
+        revision: Optional[str] = None,
+        force: bool = False,
+        keep_single: bool = True
+    ) -> Tuple[bool, Optional[Image.Image]]:
+        """
+        DALL-E 3で画像を生成（内部メソッド）
+
+        同じパラメータで生成済みの画像がキャッシュにあれば、APIを呼ばずに
+        それを出力先へ配置する（内容が同一なら出力ファイルには触れない）。
+
         Args:
             prompt: 生成プロンプト
             output_path: 出力パス
             size: 画像サイズ（1024x1024, 1792x1024, 1024x1792）
             quality: 品質（standard, hd）
             style: スタイル（vivid, natural）
+            revision: シード/リビジョンタグ（キャッシュキーに含める）
+            force: キャッシュを無視して再生成するか
+            keep_single: b64_json で受け取った画像を output_path へ保存するか
 
         Returns:
-            成功したかどうか
+            (成功したかどうか, b64_jsonで受け取った画像)
+            画像はAPIから b64_json で受け取った場合のみ返し、それ以外はNone
         """
+        output_file = self.base_dir / output_path
+        cache_key = None
+
+        if self.cache is not None:
+            cache_key = self.cache.make_key(prompt, MODEL, size, quality, style, revision)
+
+            if not force:
+                with self.tracer.span("cache_lookup") as span:
+                    installed = self.cache.install(cache_key, output_file)
+                    span["hit"] = installed is not None
+                if installed is not None:
+                    self.tracer.set("cache_hit", True)
+                    state = "updated" if installed else "up to date"
+                    print(f"♻️  Cache hit ({cache_key[:12]}): {output_file} ({state})")
+                    return True, None
+
+        if self.cache_only:
+            print(f"❌ Cache miss (--cache-only): {output_path}")
+            return False, None
+
         try:
             print(f"🎨 Generating image with DALL-E 3...")
             print(f"   Prompt: {prompt[:80]}...")
@@ -189,15 +660,30 @@ class DALLEAssetGenerator:
             print(f"   Quality: {quality}")
             print()
 
+            # レート制限（バッチ実行時のみ）
+            if self.rate_limiter:
+                with self.tracer.span("rate_limit_wait"):
+                    waited = self.rate_limiter.acquire()
+                if waited > 0:
+                    print(f"⏳ Rate limited: waited {waited:.1f} seconds")
+
             # DALL-E 3 API呼び出し
-            response = self.client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size=size,
-                quality=quality,
-                style=style,
-                n=1
-            )
+            with self.tracer.span("api_call", model=MODEL, size=size, quality=quality,
+                                  response_format=self.response_format):
+                response = self.client.images.generate(
+                    model=MODEL,
+                    prompt=prompt,
+                    size=size,
+                    quality=quality,
+                    style=style,
+                    response_format=self.response_format,
+                    n=1
+                )
+
+            if self.response_format == "b64_json":
+                return True, self._decode_image(
+                    response.data[0].b64_json, output_file, cache_key, output_path, keep_single
+                )
 
             # 画像URLを取得
             image_url = response.data[0].url
@@ -207,36 +693,196 @@ class DALLEAssetGenerator:
 
             # 画像をダウンロード
             print(f"⬇️  Downloading image...")
-            img_response = requests.get(image_url, timeout=30)
-            img_response.raise_for_status()
+            with self.tracer.span("download") as span:
+                size_bytes = self._download(image_url, output_file)
+                span["bytes"] = size_bytes
+            self.tracer.count("bytes_downloaded", size_bytes)
 
-            # 画像を保存
-            output_file = self.base_dir / output_path
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(output_file, 'wb') as f:
-                f.write(img_response.content)
-
-            print(f"✅ Image saved: {output_file}")
+            print(f"✅ Image saved: {output_file} ({size_bytes / 1024:.0f} KB)")
             print()
 
-            return True
+            if cache_key:
+                with self.tracer.span("cache_store"):
+                    self.cache.put(cache_key, output_file, {"output": output_path})
+
+            return True, None
 
         except Exception as e:
+            self.tracer.set("error", str(e))
             print(f"❌ Error generating image: {e}")
-            return False
+            return False, None
+
+    def _decode_image(
+        self,
+        b64_data: str,
+        output_file: Path,
+        cache_key: Optional[str],
+        output_path: str,
+        keep_single: bool
+    ) -> Image.Image:
+        """
+        b64_json の画像をメモリ上でデコード（内部メソッド）
+
+        keep_single の場合のみ単一フレーム画像をディスクへ書き出す。
+
+        Returns:
+            デコードした画像
+        """
+        with self.tracer.span("decode", format="b64_json") as span:
+            data = base64.b64decode(b64_data)
+            span["bytes"] = len(data)
+            if len(data) > self.max_download_bytes:
+                raise ValueError(f"Image too large: {len(data)} bytes (limit {self.max_download_bytes})")
+
+            image = Image.open(BytesIO(data))
+            image.load()
+        self.tracer.count("bytes_downloaded", len(data))
+        print(f"✅ Image generated successfully! ({len(data) / 1024:.0f} KB, b64_json)")
+
+        if keep_single:
+            with self.tracer.span("save", file=output_file.name, bytes=len(data)):
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = output_file.with_name(output_file.name + ".tmp")
+                tmp_file.write_bytes(data)
+                os.replace(tmp_file, output_file)
+            print(f"✅ Image saved: {output_file}")
+        print()
+
+        if cache_key:
+            with self.tracer.span("cache_store"):
+                self.cache.put_bytes(cache_key, data, {"output": output_path})
+
+        return image
+
+    def _download(self, url: str, output_file: Path) -> int:
+        """
+        画像をストリーミングでダウンロード（内部メソッド）
+
+        一時ファイルへチャンク単位で書き込み、PNGとして読めることを確認してから
+        出力先へ置き換える（途中で失敗しても壊れたPNGは残らない）。
+        接続が切れた場合は Range ヘッダーで続きから再開し、指数バックオフで
+        リトライする。429 と 5xx も Retry-After に従ってリトライする。
+
+        Args:
+            url: 画像URL
+            output_file: 出力パス
+
+        Returns:
+            ダウンロードしたバイト数
+        """
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = output_file.with_name(
+            f".{output_file.name}.{os.getpid()}.{threading.get_ident()}.part"
+        )
+
+        try:
+            received = 0
+            for attempt in range(DOWNLOAD_RETRIES + 1):
+                headers = {"Range": f"bytes={received}-"} if received else {}
+                try:
+                    with self.session.get(url, headers=headers, stream=True, timeout=30) as response:
+                        response.raise_for_status()
+
+                        # サーバーがRangeに対応していない場合は最初から
+                        if received and response.status_code != 206:
+                            received = 0
+
+                        length = response.headers.get("Content-Length")
+                        if length is not None and received + int(length) > self.max_download_bytes:
+                            raise ValueError(
+                                f"Image too large: {received + int(length)} bytes "
+                                f"(limit {self.max_download_bytes})"
+                            )
+
+                        with open(tmp_file, "ab" if received else "wb") as f:
+                            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                received += len(chunk)
+                                if received > self.max_download_bytes:
+                                    raise ValueError(
+                                        f"Image exceeds size limit ({self.max_download_bytes} bytes)"
+                                    )
+                                f.write(chunk)
+                    break
+
+                except (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError, requests.HTTPError) as e:
+                    response = e.response if isinstance(e, requests.HTTPError) else None
+                    wait = _download_retry_delay(response, attempt)
+                    if wait is None or attempt == DOWNLOAD_RETRIES:
+                        raise
+                    self.tracer.count("retries")
+                    print(f"⚠️  Download failed ({e}); retrying in {wait:.1f}s "
+                          f"from byte {received}...")
+                    time.sleep(wait)
+
+            # 完全な画像であることを確認
+            with self.tracer.span("verify"):
+                with Image.open(tmp_file) as img:
+                    img.verify()
+
+            os.replace(tmp_file, output_file)
+            return received
+
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+    def generate_frame(
+        self,
+        asset_name: str,
+        force: bool = False,
+        keep_single: bool = True
+    ) -> Optional[Image.Image]:
+        """
+        定義済みアセットの単一フレームを生成し、メモリ上の画像として返す
+
+        b64_json で受け取った画像はそのまま返し、URL/キャッシュから
+        ディスクに置かれた場合のみ一度だけ読み込む（パイプライン用）。
+
+        Args:
+            asset_name: アセット名（PROMPTS辞書のキー）
+            force: キャッシュを無視して再生成するか
+            keep_single: b64_json で受け取った画像を *_single.png として保存するか
+
+        Returns:
+            単一フレーム画像（失敗した場合はNone）
+        """
+        config = PROMPTS[asset_name]
+        with self.tracer.asset(asset_name) as metrics:
+            success, image = self._generate_image(
+                prompt=config["prompt"],
+                output_path=config["output"],
+                revision=config.get("revision"),
+                force=force,
+                keep_single=keep_single
+            )
+            metrics["success"] = success
+
+            if not success:
+                return None
+
+            if image is None:
+                with self.tracer.span("decode", format="png"):
+                    image = Image.open(self.base_dir / config["output"])
+                    image.load()
+
+        return image
 
     def generate_asset(
         self,
         asset_name: str,
-        auto_create_sprite_sheet: bool = True
+        auto_create_sprite_sheet: bool = True,
+        force: bool = False
     ) -> bool:
         """
         定義済みアセットを生成
 
+        単一フレーム画像が前回から変わっておらず、スプライトシートも
+        存在する場合はスプライトシートを作り直さない。
+
         Args:
             asset_name: アセット名（PROMPTS辞書のキー）
             auto_create_sprite_sheet: スプライトシートを自動生成するか
+            force: キャッシュを無視して再生成するか
 
         Returns:
             成功したかどうか
@@ -246,6 +892,22 @@ class DALLEAssetGenerator:
             print(f"Available assets: {', '.join(PROMPTS.keys())}")
             return False
 
+        success = False
+        try:
+            with self.tracer.asset(asset_name) as metrics:
+                success = self._generate_asset(asset_name, auto_create_sprite_sheet, force)
+                metrics["success"] = success
+        finally:
+            self._record(asset_name, "done" if success else "failed")
+        return success
+
+    def _record(self, asset_name: str, state: str, **extra):
+        """バッチジャーナルに状態を記録（ジャーナル未使用時は何もしない）"""
+        if self.journal is not None:
+            self.journal.record(asset_name, state, **extra)
+
+    def _generate_asset(self, asset_name: str, auto_create_sprite_sheet: bool, force: bool) -> bool:
+        """generate_asset() の本体（内部メソッド）"""
         config = PROMPTS[asset_name]
 
         print("=" * 70)
@@ -253,29 +915,61 @@ class DALLEAssetGenerator:
         print("=" * 70)
         print()
 
+        single_file = self.base_dir / config["output"]
+        previous_mtime = single_file.stat().st_mtime_ns if single_file.exists() else None
+
+        # スプライトシートを作る場合のみ単一フレームの保存を省略できる
+        makes_sheet = auto_create_sprite_sheet and config["frames"] > 0 and bool(config["final_output"])
+
         # 画像生成
-        success = self.generate_image(
+        self._record(asset_name, "requested", fingerprint=fingerprint(config))
+        success, image = self._generate_image(
             prompt=config["prompt"],
-            output_path=config["output"]
+            output_path=config["output"],
+            revision=config.get("revision"),
+            force=force,
+            keep_single=self.keep_single or not makes_sheet
         )
 
         if not success:
             return False
+        self._record(asset_name, "downloaded")
+
+        single_unchanged = image is None and previous_mtime == single_file.stat().st_mtime_ns
+        sheet_exists = bool(config["final_output"]) and (self.base_dir / config["final_output"]).exists()
 
         # スプライトシート作成
-        if auto_create_sprite_sheet and config["frames"] > 0 and config["final_output"]:
-            print(f"🔧 Creating sprite sheet ({config['frames']} frames)...")
+        if single_unchanged and sheet_exists:
+            print(f"⏭️  Sprite sheet up to date: {config['final_output']}")
+        elif makes_sheet:
+            from animate_frames import motion_for
+
+            motion = motion_for(config)
+            print(f"🔧 Creating sprite sheet ({config['frames']} frames, {motion})...")
             success = self._create_sprite_sheet(
                 input_path=config["output"],
                 output_path=config["final_output"],
-                num_frames=config["frames"]
+                num_frames=config["frames"],
+                frame=image,
+                motion=motion
             )
 
             if success:
+                self._record(asset_name, "sheeted")
                 print(f"✅ Sprite sheet created: {config['final_output']}")
             else:
                 print(f"⚠️  Sprite sheet creation failed, but single frame is available")
 
+        # .import 作成（SpriteFrames がテクスチャのUIDを参照するため先に書く）
+        with self.tracer.span("import"):
+            self._write_imports(config)
+
+        # SpriteFrames リソース作成
+        sprite_frames = config.get("sprite_frames")
+        if auto_create_sprite_sheet and sprite_frames and (self.base_dir / config["final_output"]).exists():
+            with self.tracer.span("sprite_frames"):
+                self._write_sprite_frames(sprite_frames)
+
         print()
         print("=" * 70)
         print("  Generation Complete!")
@@ -283,11 +977,51 @@ class DALLEAssetGenerator:
 
         return True
 
+    def _write_imports(self, config: Dict[str, Any]):
+        """
+        出力PNG（単一フレームとシート）の .import を作成（内部メソッド）
+
+        既存のUIDは引き継ぎ、内容が変わらなければ書き換えない。
+        """
+        for key in ("output", "final_output"):
+            path = config.get(key)
+            if path and (self.base_dir / path).exists():
+                try:
+                    write_texture_import(Path(path), self.base_dir)
+                except Exception as e:
+                    print(f"⚠️  Could not write {path}.import: {e}")
+
+    def _write_sprite_frames(self, sprite_frames: str) -> bool:
+        """
+        SpriteFrames リソース（.tres）を作成（内部メソッド）
+
+        Args:
+            sprite_frames: 出力パス（base_dirからの相対パス）
+
+        Returns:
+            成功したかどうか
+        """
+        try:
+            # 同じ .tres を共有するアセットが並列に処理されるため直列化する
+            with self._resource_lock:
+                animations = sprite_frames_animations(sprite_frames, self.base_dir)
+                write_sprite_frames(Path(sprite_frames), animations, self.base_dir)
+
+            names = ", ".join(a["name"] for a in animations)
+            print(f"✅ SpriteFrames updated: {sprite_frames} ({names})")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error creating SpriteFrames: {e}")
+            return False
+
     def _create_sprite_sheet(
         self,
         input_path: str,
         output_path: str,
-        num_frames: int
+        num_frames: int,
+        frame: Optional[Image.Image] = None,
+        motion: str = "static"
     ) -> bool:
         """
         スプライトシート作成（内部メソッド）
@@ -296,31 +1030,36 @@ class DALLEAssetGenerator:
             input_path: 入力画像パス
             output_path: 出力パス
             num_frames: フレーム数
+            frame: メモリ上の単一フレーム画像（指定時は input_path を読まない）
+            motion: フレームの合成に使うモーション（animate_frames.MOTIONS、"static" で複製のみ）
+
+        出力ファイル名がフレームサイズ（_<W>x<H>_<N>f.png）を持つ場合は、
+        合成の前にマスターフレームをそのサイズへ縮小する。
 
         Returns:
             成功したかどうか
         """
+        from animate_frames import fit_frame, synthesize_sheet
+
         try:
             input_file = self.base_dir / input_path
             output_file = self.base_dir / output_path
 
             # 画像読み込み
-            frame = Image.open(input_file)
-            if frame.mode != "RGBA":
-                frame = frame.convert("RGBA")
-
-            width, height = frame.size
+            if frame is None:
+                with self.tracer.span("decode", format="png"):
+                    frame = Image.open(input_file)
+                    frame.load()
 
             # スプライトシート作成
-            sheet_width = width * num_frames
-            sprite_sheet = Image.new("RGBA", (sheet_width, height), (0, 0, 0, 0))
-
-            for i in range(num_frames):
-                sprite_sheet.paste(frame, (width * i, 0))
+            with self.tracer.span("sheet_build", frames=num_frames, motion=motion):
+                sprite_sheet = synthesize_sheet(fit_frame(frame, output_file), motion, num_frames)
 
             # 保存
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            sprite_sheet.save(output_file, "PNG")
+            with self.tracer.span("save", file=output_file.name) as span:
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                sprite_sheet.save(output_file, "PNG")
+                span["bytes"] = output_file.stat().st_size
 
             return True
 
@@ -328,33 +1067,94 @@ class DALLEAssetGenerator:
             print(f"❌ Error creating sprite sheet: {e}")
             return False
 
-    def generate_batch(self, assets: list, delay: int = 5) -> Dict[str, bool]:
+    def _outputs_exist(self, config: Dict[str, Any]) -> bool:
+        """アセットの最終出力（シートまたは単一画像）が存在するか"""
+        output = config.get("final_output") or config["output"]
+        return (self.base_dir / output).exists()
+
+    def generate_batch(
+        self,
+        assets: list,
+        delay: int = 5,
+        max_workers: int = 1,
+        rate_per_minute: Optional[float] = None,
+        burst: int = 1,
+        force: bool = False,
+        journal: Optional[BatchJournal] = None
+    ) -> Dict[str, bool]:
         """
         複数アセットをバッチ生成
 
+        API呼び出しはトークンバケットでレート制限し、ダウンロードや
+        スプライトシート作成は最大 max_workers 件まで並列に実行する。
+
         Args:
             assets: アセット名のリスト
-            delay: 各生成間の待機時間（秒）
+            delay: API呼び出しの最小間隔（秒、rate_per_minute未指定時に使用）
+            max_workers: 同時に処理するアセット数
+            rate_per_minute: 1分あたりのAPI呼び出し上限（Noneの場合はdelayから算出）
+            burst: 待機なしで連続して許可するAPI呼び出し数
+            force: キャッシュを無視して再生成するか
+            journal: 進行状態を記録するジャーナル。完了済みとして記録され、
+                定義も出力も変わっていないアセットは処理しない
 
         Returns:
             {asset_name: success} の辞書
         """
         results = {}
+        pending = list(assets)
+        if journal is not None and not force:
+            completed = journal.completed()
+            pending = []
+            for asset_name in assets:
+                config = PROMPTS.get(asset_name)
+                if (config is not None and completed.get(asset_name) == fingerprint(config)
+                        and self._outputs_exist(config)):
+                    print(f"⏭️  Already done (journal): {asset_name}")
+                    results[asset_name] = True
+                else:
+                    pending.append(asset_name)
+            if results:
+                print()
+
+        if rate_per_minute is None:
+            rate = 1.0 / delay if delay > 0 else 0.0
+        else:
+            rate = rate_per_minute / 60.0
 
         print("=" * 70)
-        print(f"  Batch Generation: {len(assets)} assets")
+        print(f"  Batch Generation: {len(pending)} assets"
+              + (f" ({len(results)} already done)" if results else ""))
+        print(f"  Concurrency: {max_workers}, Rate: "
+              f"{f'{rate * 60:.1f}/min' if rate > 0 else 'unlimited'}")
         print("=" * 70)
         print()
 
-        for i, asset_name in enumerate(assets, 1):
-            print(f"[{i}/{len(assets)}] {asset_name}")
-            results[asset_name] = self.generate_asset(asset_name)
-
-            # レート制限対策
-            if i < len(assets):
-                print(f"⏳ Waiting {delay} seconds before next generation...")
-                print()
-                time.sleep(delay)
+        self.rate_limiter = TokenBucket(rate, capacity=burst)
+        self.journal = journal
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = {
+                    executor.submit(self.generate_asset, asset_name, force=force): asset_name
+                    for asset_name in pending
+                }
+
+                for i, future in enumerate(as_completed(futures), 1):
+                    asset_name = futures[future]
+                    try:
+                        results[asset_name] = future.result()
+                    except Exception as e:
+                        print(f"❌ Error generating {asset_name}: {e}")
+                        results[asset_name] = False
+
+                    status = "✅" if results[asset_name] else "❌"
+                    print(f"[{i}/{len(pending)}] {status} {asset_name}")
+        finally:
+            self.rate_limiter = None
+            self.journal = None
+
+        # 入力順に並べ直す
+        results = {asset_name: results[asset_name] for asset_name in assets}
 
         # サマリー
         success_count = sum(results.values())
@@ -362,12 +1162,29 @@ class DALLEAssetGenerator:
         print("=" * 70)
         print("  Batch Generation Complete!")
         print("=" * 70)
-        print(f"✅ Success: {success_count}/{len(assets)}")
-        print(f"❌ Failed: {len(assets) - success_count}/{len(assets)}")
+        print(f"✅ Success: {success_count}/{len(results)}")
+        print(f"❌ Failed: {len(results) - success_count}/{len(results)}")
 
         return results
 
 
+def write_trace_outputs(tracer: Tracer, trace_path: Optional[str], metrics_path: Optional[str]):
+    """
+    計測結果を書き出す
+
+    Args:
+        tracer: 記録済みのトレーサー
+        trace_path: Chrome trace の出力先（Noneなら書き出さない）
+        metrics_path: メトリクスJSONLの出力先（Noneなら書き出さない）
+    """
+    if trace_path:
+        tracer.write_chrome_trace(Path(trace_path))
+        print(f"📈 Trace written: {trace_path}")
+    if metrics_path:
+        tracer.write_metrics(Path(metrics_path))
+        print(f"📈 Metrics written: {metrics_path}")
+
+
 def main():
     """メイン関数"""
     parser = argparse.ArgumentParser(
@@ -395,6 +1212,25 @@ def main():
         action="store_true",
         help="List all available asset names"
     )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check the asset definitions (and --batch names) without calling the API"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what --asset/--batch would generate or take from the cache, without calling the API"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume a batch from its journal, skipping assets already completed"
+    )
+    parser.add_argument(
+        "--journal",
+        help="Batch journal file (default: <base-dir>/.cache/batches/<batch name>.jsonl)"
+    )
     parser.add_argument(
         "--no-sprite-sheet",
         action="store_true",
@@ -404,7 +1240,83 @@ def main():
         "--delay",
         type=int,
         default=5,
-        help="Delay between batch generations (seconds, default: 5)"
+        help="Minimum interval between API requests in batch mode "
+             "when --rate is not set (seconds, default: 5)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of assets processed in parallel in batch mode (default: 1)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Maximum API requests per minute in batch mode (overrides --delay)"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Number of API requests allowed back-to-back before rate limiting (default: 1)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the generation cache and always call the API"
+    )
+    parser.add_argument(
+        "--cache-only",
+        action="store_true",
+        help="Only use cached images; never call the API"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the generation cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Generation cache directory (default: <base-dir>/.cache/dalle)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Generation cache size limit in MB (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--b64-json",
+        action="store_true",
+        help="Receive images inline as base64 (response_format=b64_json) instead of downloading a URL"
+    )
+    parser.add_argument(
+        "--no-single-frame",
+        action="store_true",
+        help="With --b64-json, do not write the *_single.png intermediate "
+             "(sprite sheets are built from the in-memory image)"
+    )
+    parser.add_argument(
+        "--trace",
+        help="Write a Chrome trace-event file (chrome://tracing / Perfetto) of every stage"
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Write per-asset metrics (latency, bytes, retries) as JSONL"
+    )
+    parser.add_argument(
+        "--max-download-mb",
+        type=int,
+        default=DOWNLOAD_MAX_BYTES // (1024 * 1024),
+        help="Maximum size of a downloaded image in MB (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--base-url",
+        help="API base URL (e.g. a local stub server: http://127.0.0.1:8000/v1)"
+    )
+    parser.add_argument(
+        "--base-dir",
+        help=f"Project root for asset output (default: {BASE_DIR})"
     )
 
     args = parser.parse_args()
@@ -418,9 +1330,79 @@ def main():
             print(f"  - {name:<20} ({frames})")
         return
 
+    base_dir = Path(args.base_dir) if args.base_dir else BASE_DIR
+
+    assets = None
+    if args.batch:
+        try:
+            assets = load_batch(args.batch)
+        except ValueError as e:
+            print(f"❌ Error loading batch file: {e}")
+            sys.exit(1)
+    elif args.asset:
+        assets = [args.asset]
+
+    # Validate asset definitions
+    if args.validate:
+        errors = validate_prompts()
+        errors += [f"unknown asset '{name}'" for name in assets or [] if name not in PROMPTS]
+        for error in errors:
+            print(f"❌ {error}")
+        if errors:
+            sys.exit(1)
+        print(f"✅ {len(PROMPTS)} asset definitions OK")
+        return
+
+    if args.force and args.cache_only:
+        print("❌ Error: --force and --cache-only cannot be used together")
+        sys.exit(1)
+
+    if args.no_single_frame and not args.b64_json:
+        print("❌ Error: --no-single-frame requires --b64-json")
+        sys.exit(1)
+
+    cache = None
+    if not args.no_cache:
+        cache = GenerationCache(
+            args.cache_dir or base_dir / ".cache" / "dalle",
+            max_bytes=args.cache_max_mb * 1024 * 1024
+        )
+
+    # Dry run
+    if args.dry_run:
+        if assets is None:
+            print("❌ Error: --dry-run requires --asset or --batch")
+            sys.exit(1)
+
+        plan = plan_assets(assets, base_dir, None if args.force else cache)
+        icons = {"generate": "🎨", "cached": "♻️ ", "unknown": "❌"}
+        for entry in plan:
+            state = "exists" if entry["exists"] else "missing"
+            print(f"{icons[entry['action']]} {entry['asset']:<20} {entry['action']:<9} "
+                  f"{entry['output'] or '-'} ({state})")
+
+        calls = sum(entry["action"] == "generate" for entry in plan)
+        print(f"\n{len(plan)} assets, {calls} API calls")
+        sys.exit(1 if any(entry["action"] == "unknown" for entry in plan) else 0)
+
+    # Tracing（--trace / --metrics 指定時のみ。sys.exit() 後に書き出す）
+    tracer = None
+    if args.trace or args.metrics:
+        tracer = Tracer()
+        atexit.register(write_trace_outputs, tracer, args.trace, args.metrics)
+
     # Initialize generator
     try:
-        generator = DALLEAssetGenerator()
+        generator = DALLEAssetGenerator(
+            base_url=args.base_url,
+            base_dir=args.base_dir,
+            cache=cache,
+            cache_only=args.cache_only,
+            max_download_bytes=args.max_download_mb * 1024 * 1024,
+            response_format="b64_json" if args.b64_json else "url",
+            keep_single=not args.no_single_frame,
+            tracer=tracer
+        )
     except ValueError as e:
         print(f"❌ Error: {e}")
         print()
@@ -432,7 +1414,8 @@ def main():
     if args.asset:
         success = generator.generate_asset(
             args.asset,
-            auto_create_sprite_sheet=not args.no_sprite_sheet
+            auto_create_sprite_sheet=not args.no_sprite_sheet,
+            force=args.force
         )
         sys.exit(0 if success else 1)
 
@@ -442,25 +1425,23 @@ def main():
             print("❌ Error: --output is required with --prompt")
             sys.exit(1)
 
-        success = generator.generate_image(args.prompt, args.output)
+        success = generator.generate_image(args.prompt, args.output, force=args.force)
         sys.exit(0 if success else 1)
 
     # Batch generation
     if args.batch:
-        # Check if it's a JSON file
-        if args.batch.endswith('.json'):
-            try:
-                with open(args.batch) as f:
-                    batch_config = json.load(f)
-                assets = batch_config.get("assets", [])
-            except Exception as e:
-                print(f"❌ Error loading batch file: {e}")
-                sys.exit(1)
-        else:
-            # Comma-separated list
-            assets = [a.strip() for a in args.batch.split(',')]
-
-        results = generator.generate_batch(assets, delay=args.delay)
+        journal_path = Path(args.journal) if args.journal else default_journal_path(args.batch, base_dir)
+        with BatchJournal(journal_path, resume=args.resume) as journal:
+            print(f"📒 Journal: {journal_path}" + (" (resuming)" if args.resume else ""))
+            results = generator.generate_batch(
+                assets,
+                delay=args.delay,
+                max_workers=args.concurrency,
+                rate_per_minute=args.rate,
+                burst=args.burst,
+                force=args.force,
+                journal=journal
+            )
 
         # Exit with error if any failed
         sys.exit(0 if all(results.values()) else 1)
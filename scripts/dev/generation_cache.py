@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+画像生成結果のキャッシュ
+
+プロンプトとモデルパラメータのハッシュをキーに、生成済み画像を
+ディスクへ保存します。同じ条件での再生成（再課金・再待機）を防ぎ、
+容量上限を超えた場合は最終アクセスが古いものから削除します（LRU）。
+
+使用例:
+    # キャッシュの状態を表示
+    python3 generation_cache.py --stats
+
+    # キャッシュを空にする
+    python3 generation_cache.py --clear
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+
+DEFAULT_CACHE_DIR = Path("/workspaces/05_poc-godot/.cache/dalle")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+INDEX_FILE = "index.json"
+
+
+class GenerationCache:
+    """コンテンツアドレス型の生成キャッシュ（LRU・容量上限付き）"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_bytes: キャッシュ全体の容量上限（バイト）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model: str,
+        size: str,
+        quality: str,
+        style: str,
+        revision: Optional[str] = None
+    ) -> str:
+        """
+        生成パラメータからキャッシュキーを作成
+
+        Args:
+            prompt: 生成プロンプト
+            model: モデル名
+            size: 画像サイズ
+            quality: 品質
+            style: スタイル
+            revision: シード/リビジョンタグ（同じプロンプトで別画像が欲しい場合に変更）
+
+        Returns:
+            SHA-256の16進文字列
+        """
+        payload = json.dumps(
+            {
+                "prompt": prompt,
+                "model": model,
+                "size": size,
+                "quality": quality,
+                "style": style,
+                "revision": revision,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """キーに対応するキャッシュファイルのパス"""
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        キャッシュを参照
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            キャッシュファイルのパス（存在しない場合はNone）
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            path = self.path_for(key)
+
+            if entry is None or not path.exists():
+                if entry is not None:
+                    del self._index[key]
+                    self._save_index()
+                return None
+
+            entry["last_access"] = time.time()
+            self._save_index()
+            return path
+
+    def put(self, key: str, source: Path, meta: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        ファイルをキャッシュへ登録
+
+        Args:
+            key: キャッシュキー
+            source: 登録する画像ファイル
+            meta: 付随情報（プロンプト先頭など、表示用）
+
+        Returns:
+            キャッシュファイルのパス
+        """
+        return self._store(key, lambda tmp_path: shutil.copyfile(source, tmp_path), meta)
+
+    def put_bytes(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        メモリ上の画像データをキャッシュへ登録
+
+        Args:
+            key: キャッシュキー
+            data: PNGのバイト列
+            meta: 付随情報（プロンプト先頭など、表示用）
+
+        Returns:
+            キャッシュファイルのパス
+        """
+        return self._store(key, lambda tmp_path: tmp_path.write_bytes(data), meta)
+
+    def _store(self, key: str, write: Callable[[Path], Any], meta: Optional[Dict[str, Any]]) -> Path:
+        """write(tmp_path) で書き込んだファイルをキャッシュへアトミックに登録"""
+        path = self.path_for(key)
+
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            write(tmp_path)
+            os.replace(tmp_path, path)
+
+            now = time.time()
+            self._index[key] = {
+                "size": path.stat().st_size,
+                "created": now,
+                "last_access": now,
+                **(meta or {}),
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+        return path
+
+    def install(self, key: str, output_file: Path) -> Optional[bool]:
+        """
+        キャッシュ済み画像を出力先へ配置
+
+        内容が同一の場合はファイルに触れない（mtimeを保つ）。
+
+        Args:
+            key: キャッシュキー
+            output_file: 出力先
+
+        Returns:
+            書き込んだ場合True、既に同一だった場合False、キャッシュミスはNone
+        """
+        cached = self.get(key)
+        if cached is None:
+            return None
+
+        if output_file.exists() and _file_digest(output_file) == _file_digest(cached):
+            return False
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_file.with_name(output_file.name + ".tmp")
+        shutil.copyfile(cached, tmp_path)
+        os.replace(tmp_path, output_file)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        """キャッシュ済みか（参照時刻は更新しない）"""
+        return key in self._index and self.path_for(key).exists()
+
+    def total_bytes(self) -> int:
+        """キャッシュ全体のサイズ（バイト）"""
+        return sum(entry["size"] for entry in self._index.values())
+
+    def clear(self):
+        """キャッシュを全削除"""
+        with self._lock:
+            for key in list(self._index):
+                self.path_for(key).unlink(missing_ok=True)
+            self._index = {}
+            self._save_index()
+
+    def _evict(self, keep: Optional[str] = None):
+        """容量上限を超えた分を最終アクセスが古い順に削除"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+
+            self.path_for(key).unlink(missing_ok=True)
+            del self._index[key]
+            total -= entry["size"]
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """インデックスを読み込み"""
+        index_file = self.cache_dir / INDEX_FILE
+        if not index_file.exists():
+            return {}
+
+        try:
+            with open(index_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  Cache index is corrupt, starting fresh: {index_file}")
+            return {}
+
+    def _save_index(self):
+        """インデックスをアトミックに書き込み"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Godotにキャッシュ内の画像をインポートさせない（--cache-dir がプロジェクト外でも
+        # 親ディレクトリを汚さないよう、キャッシュディレクトリ自身に置く）
+        gdignore = self.cache_dir / ".gdignore"
+        if not gdignore.exists():
+            gdignore.touch()
+
+        index_file = self.cache_dir / INDEX_FILE
+        tmp_file = index_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self._index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+
+
+def _file_digest(path: Path) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Inspect or clear the image generation cache")
+    parser.add_argument("--cache-dir", help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--stats", action="store_true", help="Show cache statistics")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached images")
+    args = parser.parse_args()
+
+    cache = GenerationCache(args.cache_dir)
+
+    if args.clear:
+        cache.clear()
+        print(f"🗑️  Cache cleared: {cache.cache_dir}")
+        return
+
+    if args.stats:
+        print(f"📦 Cache: {cache.cache_dir}")
+        print(f"   Entries: {len(cache)}")
+        print(f"   Size: {cache.total_bytes() / 1024 / 1024:.1f} MB "
+              f"(limit: {cache.max_bytes / 1024 / 1024:.0f} MB)")
+        return
+
+    parser.print_help()
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
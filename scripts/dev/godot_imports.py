@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+PNG の .import をまとめて作成・更新する
+
+Godot のエディタは .import のないPNGを見つけると既定の設定（3D使用を検出すると
+VRAM圧縮、乱数のUID）で取り込み、全ファイルの再インポートが走ります。
+パイプライン（generate_asset_with_dalle.py / pipeline.py /
+convert_dalle_to_pixelart.py）は出力と同時に .import を書きますが、このスクリプトは
+既存のアセットへの一括適用と、設定の食い違いの検出（CI向け）を行います。
+
+設定は godot_resources.PIXEL_ART_IMPORT_PARAMS（ロスレス、ミップマップなし、
+3D検出時も圧縮しない）と IMPORT_CATEGORY_PARAMS（カテゴリごとの上書き）。
+既存の .import のUIDは引き継ぎ、新しいPNGには res:// パスから決まるUIDを付けます。
+
+使用例:
+    # assets/ 以下の全PNGの .import を作成・更新
+    python3 godot_imports.py
+
+    # 食い違いを表示するだけ（書き換えが必要なら終了コード1）
+    python3 godot_imports.py --check
+
+    # 特定ディレクトリだけ、パラメータを上書きして適用
+    python3 godot_imports.py assets/ui --param process/size_limit=1024
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+from godot_resources import read_import_uid, texture_import, write_texture_import
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+
+def import_status(png_path: Path, base_dir: Path, params: Optional[Dict[str, str]] = None) -> str:
+    """
+    PNG の .import の状態
+
+    Returns:
+        "ok"（期待どおり）/ "missing"（.importなし）/ "outdated"（設定が異なる）
+    """
+    import_file = Path(f"{png_path}.import")
+    if not import_file.exists():
+        return "missing"
+    expected = texture_import(png_path, base_dir, read_import_uid(png_path), params)
+    return "ok" if import_file.read_text() == expected else "outdated"
+
+
+def scan(root: Path, base_dir: Path, params: Optional[Dict[str, str]] = None) -> List[Tuple[Path, str]]:
+    """
+    root 以下の PNG の .import の状態を調べる（隠しディレクトリは除く）
+
+    Returns:
+        [(PNGのパス, 状態), ...]
+    """
+    results = []
+    for png_path in sorted(root.rglob("*.png")):
+        if any(part.startswith(".") for part in png_path.relative_to(root).parts):
+            continue
+        results.append((png_path, import_status(png_path, base_dir, params)))
+    return results
+
+
+def _parse_params(values: List[str]) -> Dict[str, str]:
+    params = {}
+    for value in values:
+        key, sep, setting = value.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid --param: {value} (expected KEY=VALUE)")
+        params[key.strip()] = setting.strip()
+    return params
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Write pixel-art Godot .import files for PNGs (keeping existing UIDs)")
+    parser.add_argument("root", nargs="?", help="Directory to scan (default: <base-dir>/assets)")
+    parser.add_argument("--check", action="store_true", help="Only report; exit 1 if any .import is missing or outdated")
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override an import parameter (repeatable, e.g. process/size_limit=1024)")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Godot project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir).resolve()
+    root = Path(args.root).resolve() if args.root else base_dir / "assets"
+    if not root.is_dir():
+        print(f"❌ Error: Directory not found: {root}")
+        sys.exit(1)
+
+    try:
+        params = _parse_params(args.param)
+        results = scan(root, base_dir, params)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    stale = [(path, status) for path, status in results if status != "ok"]
+    for path, status in stale:
+        label = "missing " if status == "missing" else "outdated"
+        print(f"{'⚠️ ' if args.check else '📝'} {label} {path.relative_to(base_dir)}.import")
+        if not args.check:
+            write_texture_import(path, base_dir, params)
+
+    print()
+    if args.check:
+        print(f"📊 {len(results) - len(stale)}/{len(results)} .import file(s) up to date")
+        if stale:
+            sys.exit(1)
+    else:
+        print(f"✅ Wrote {len(stale)} .import file(s), {len(results) - len(stale)} already up to date")
+
+
+if __name__ == "__main__":
+    main()
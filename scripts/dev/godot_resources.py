@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Godotリソース（.tres）の書き出しユーティリティ
+
+スプライトシートやテクスチャアトラスから SpriteFrames リソースを生成し、
+エディタ上での手作業（AtlasTextureの切り出し、FPS・ループ設定）を不要にします。
+コリジョン形状（CircleShape2D / CapsuleShape2D / ConvexPolygonShape2D /
+RectangleShape2D）の .tres も書き出せます（collision_shapes.py から使用）。
+PNG の .import（ピクセルアート向けのインポート設定と決定的なUID）も書き出せます。
+
+使用例:
+    # 横並びのスプライトシートから SpriteFrames を作成
+    python3 godot_resources.py assets/characters/enemies/basic_enemy_idle_32x32_4f.png \\
+        --output assets/characters/enemies/basic_enemy_frames.tres --name idle --fps 8
+
+    # ループしないアニメーション
+    python3 godot_resources.py assets/characters/player/player_hit_48x48_2f.png \\
+        --output /tmp/hit.tres --name hit --fps 15 --no-loop
+"""
+
+import os
+import re
+import sys
+import struct
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+# スプライトシートのファイル名規約: <name>_<W>x<H>_<N>f.png（拡張子なしのステムにも一致）
+FRAME_SPEC_PATTERN = re.compile(r"_(\d+)x(\d+)_(\d+)f(?:\.png)?$")
+
+# Godot 4.3 のテクスチャインポーターの全パラメータ（エディタが書く順）。
+# ピクセルアート向け: ロスレス、ミップマップなし、3D使用時もVRAM圧縮しない。
+# フィルタ（Nearest）は project.godot の default_texture_filter で指定済み。
+PIXEL_ART_IMPORT_PARAMS = {
+    "compress/mode": "0",
+    "compress/high_quality": "false",
+    "compress/lossy_quality": "0.7",
+    "compress/hdr_compression": "1",
+    "compress/normal_map": "0",
+    "compress/channel_pack": "0",
+    "mipmaps/generate": "false",
+    "mipmaps/limit": "-1",
+    "roughness/mode": "0",
+    "roughness/src_normal": '""',
+    "process/fix_alpha_border": "true",
+    "process/premult_alpha": "false",
+    "process/normal_map_invert_y": "false",
+    "process/hdr_as_srgb": "false",
+    "process/hdr_clamp_exposure": "false",
+    "process/size_limit": "0",
+    "detect_3d/compress_to": "0",
+}
+
+# カテゴリ（res:// パスの前方一致）ごとの上書き。最も長く一致したものを使う
+IMPORT_CATEGORY_PARAMS = {
+    # 不透明な背景はアルファ境界の補正が不要
+    "res://assets/backgrounds/": {"process/fix_alpha_border": "false"},
+}
+
+
+def res_path(path: Path, base_dir: Path = BASE_DIR) -> str:
+    """ファイルパスを res:// パスに変換"""
+    path = Path(path)
+    if path.is_absolute():
+        path = path.relative_to(base_dir)
+    return f"res://{path.as_posix()}"
+
+
+def read_import_uid(png_path: Path) -> Optional[str]:
+    """<png>.import からリソースUIDを読み取る（無ければNone）"""
+    import_file = Path(f"{png_path}.import")
+    if not import_file.exists():
+        return None
+
+    with open(import_file) as f:
+        for line in f:
+            if line.startswith("uid="):
+                return line.split("=", 1)[1].strip().strip('"')
+    return None
+
+
+def godot_uid(key: str) -> str:
+    """
+    キー（res:// パス）から決まるリソースUID
+
+    Godot の ResourceUID::id_to_text() と同じ表記（34進数、a-y と 0-8）。
+    エディタの乱数UIDの代わりに使い、何度生成しても同じ .import になるようにする。
+    """
+    value = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") & 0x7FFFFFFFFFFFFFFF
+    text = ""
+    while value:
+        value, c = divmod(value, 34)
+        text = (chr(ord("a") + c) if c < 25 else chr(ord("0") + c - 25)) + text
+    return f"uid://{text}"
+
+
+def import_params(resource: str, overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """res:// パスに対するインポートパラメータ（共通値 → カテゴリ → overrides の順に上書き）"""
+    params = dict(PIXEL_ART_IMPORT_PARAMS)
+    matches = [prefix for prefix in IMPORT_CATEGORY_PARAMS if resource.startswith(prefix)]
+    if matches:
+        params.update(IMPORT_CATEGORY_PARAMS[max(matches, key=len)])
+    params.update(overrides or {})
+    return params
+
+
+def texture_import(png_path: Path, base_dir: Path = BASE_DIR, uid: Optional[str] = None,
+                   params: Optional[Dict[str, str]] = None) -> str:
+    """
+    PNG の .import の内容を生成（Godot のエディタが書くものと同じ形式）
+
+    Args:
+        png_path: PNGのパス
+        base_dir: Godotプロジェクトのルート
+        uid: リソースUID（Noneで godot_uid()）
+        params: インポートパラメータの上書き
+
+    Returns:
+        .import ファイルの内容
+    """
+    resource = res_path(png_path, base_dir)
+    params = import_params(resource, params)
+    if params["compress/mode"] == "2":
+        raise ValueError("VRAM compressed imports are not supported (per-platform dest files)")
+
+    imported = f"res://.godot/imported/{Path(resource).name}-{hashlib.md5(resource.encode('utf-8')).hexdigest()}.ctex"
+    lines = [
+        "[remap]",
+        "",
+        'importer="texture"',
+        'type="CompressedTexture2D"',
+        f'uid="{uid or godot_uid(resource)}"',
+        f'path="{imported}"',
+        "metadata={",
+        '"vram_texture": false',
+        "}",
+        "",
+        "[deps]",
+        "",
+        f'source_file="{resource}"',
+        f'dest_files=["{imported}"]',
+        "",
+        "[params]",
+        "",
+    ]
+    lines.extend(f"{key}={value}" for key, value in params.items())
+    return "\n".join(lines) + "\n"
+
+
+def write_texture_import(png_path: Path, base_dir: Path = BASE_DIR,
+                         params: Optional[Dict[str, str]] = None) -> Path:
+    """
+    PNG の隣に .import を書き出す
+
+    既存の .import のUIDは引き継ぐ（シーンや .tres からの参照を壊さない）。
+    内容が同一の場合はファイルに触れない（Godotの再インポートを避ける）。
+
+    Returns:
+        .import のパス
+
+    Raises:
+        ValueError: PNGが base_dir の外にある場合
+    """
+    base_dir = Path(base_dir).resolve()
+    png_path = _absolute(png_path, base_dir).resolve()
+    content = texture_import(png_path, base_dir, read_import_uid(png_path), params)
+    return _write_if_changed(Path(f"{png_path}.import"), content)
+
+
+def png_size(png_path: Path) -> tuple:
+    """PNGヘッダー（IHDR）から画像サイズを読み取る"""
+    with open(png_path, "rb") as f:
+        header = f.read(24)
+    if header[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"Not a PNG file: {png_path}")
+    return struct.unpack(">II", header[16:24])
+
+
+def parse_frame_spec(name) -> Optional[Tuple[int, int, int]]:
+    """
+    ファイル名（またはステム）のフレーム指定 _<W>x<H>_<N>f を読む
+
+    Args:
+        name: ファイル名・パス・ステム
+
+    Returns:
+        (フレーム幅, フレーム高さ, フレーム数)。指定がなければNone
+    """
+    match = FRAME_SPEC_PATTERN.search(Path(name).name)
+    return (int(match.group(1)), int(match.group(2)), int(match.group(3))) if match else None
+
+
+def strip_regions(png_path: Path, num_frames: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    横並びスプライトシートのフレーム領域を求める
+
+    フレームサイズはファイル名（_<W>x<H>_<N>f.png）から、無ければ
+    「高さ = フレーム幅」とみなして決める。ファイル名の指定と実際の
+    PNGサイズが食い違う場合（縮小前のシートなど）はエラーにする。
+
+    Returns:
+        [{"region": [x, y, w, h]}, ...]
+
+    Raises:
+        ValueError: PNGのサイズがファイル名のフレーム指定と一致しない
+    """
+    width, height = png_size(png_path)
+    spec = parse_frame_spec(png_path)
+
+    if spec:
+        frame_w, frame_h = spec[:2]
+        num_frames = num_frames or spec[2]
+        if (width, height) != (frame_w * num_frames, frame_h):
+            raise ValueError(
+                f"{Path(png_path).name} is {width}x{height}, expected "
+                f"{frame_w * num_frames}x{frame_h} ({num_frames} frames of {frame_w}x{frame_h})"
+            )
+    else:
+        frame_w, frame_h = (width // num_frames, height) if num_frames else (height, height)
+        num_frames = num_frames or max(1, width // frame_w)
+
+    return [{"region": [i * frame_w, 0, frame_w, frame_h]} for i in range(num_frames)]
+
+
+def sprite_frames_tres(animations: List[Dict[str, Any]], base_dir: Path = BASE_DIR) -> str:
+    """
+    SpriteFrames リソース（.tres）の内容を生成
+
+    Args:
+        animations: アニメーション定義のリスト。各要素は
+            {
+              "name": "idle",
+              "speed": 8.0,
+              "loop": True,
+              "frames": [
+                {"texture": Path, "region": [x, y, w, h],
+                 "margin": [left, top, right_extra, bottom_extra]（任意）,
+                 "duration": 1.0（任意）},
+                ...
+              ]
+            }
+        base_dir: res:// の基準ディレクトリ
+
+    Returns:
+        .tres ファイルの内容
+    """
+    textures: Dict[str, str] = {}
+    ext_lines: List[str] = []
+    sub_blocks: List[str] = []
+    animation_blocks: List[str] = []
+
+    for animation in animations:
+        frame_blocks = []
+        for frame in animation["frames"]:
+            texture_path = res_path(frame["texture"], base_dir)
+            if texture_path not in textures:
+                texture_id = f"{len(textures) + 1}_{_slug(Path(texture_path).stem)}"
+                textures[texture_path] = texture_id
+                uid = read_import_uid(_absolute(frame["texture"], base_dir))
+                uid_attr = f' uid="{uid}"' if uid else ""
+                ext_lines.append(
+                    f'[ext_resource type="Texture2D"{uid_attr} path="{texture_path}" id="{texture_id}"]'
+                )
+
+            sub_id = f"AtlasTexture_{len(sub_blocks) + 1}"
+            block = [
+                f'[sub_resource type="AtlasTexture" id="{sub_id}"]',
+                f'atlas = ExtResource("{textures[texture_path]}")',
+                f"region = Rect2({', '.join(str(v) for v in frame['region'])})",
+            ]
+            margin = frame.get("margin")
+            if margin and any(margin):
+                block.append(f"margin = Rect2({', '.join(str(v) for v in margin)})")
+            sub_blocks.append("\n".join(block))
+
+            frame_blocks.append(
+                "{\n"
+                f'"duration": {float(frame.get("duration", 1.0))},\n'
+                f'"texture": SubResource("{sub_id}")\n'
+                "}"
+            )
+
+        animation_blocks.append(
+            "{\n"
+            f'"frames": [{", ".join(frame_blocks)}],\n'
+            f'"loop": {"true" if animation.get("loop", True) else "false"},\n'
+            f'"name": &"{animation["name"]}",\n'
+            f'"speed": {float(animation.get("speed", 5.0))}\n'
+            "}"
+        )
+
+    load_steps = len(ext_lines) + len(sub_blocks) + 1
+    parts = [f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3]']
+    if ext_lines:
+        parts.append("\n".join(ext_lines))
+    parts.extend(sub_blocks)
+    parts.append(f"[resource]\nanimations = [{', '.join(animation_blocks)}]")
+
+    return "\n\n".join(parts) + "\n"
+
+
+def write_sprite_frames(output_path: Path, animations: List[Dict[str, Any]], base_dir: Path = BASE_DIR) -> Path:
+    """
+    SpriteFrames リソースを書き出す
+
+    内容が同一の場合はファイルに触れない（Godotの再インポートを避ける）。
+
+    Returns:
+        出力パス
+    """
+    return _write_if_changed(_absolute(output_path, base_dir), sprite_frames_tres(animations, base_dir))
+
+
+def shape_tres(shape: Dict[str, Any]) -> str:
+    """
+    Shape2D リソース（.tres）の内容を生成
+
+    Args:
+        shape: 形状。"type" に応じて
+            {"type": "circle", "radius": r}
+            {"type": "capsule", "radius": r, "height": h}（縦向き、h はキャップを含む全長）
+            {"type": "rect", "size": [w, h]}
+            {"type": "convex", "points": [[x, y], ...]}
+            （"position" / "rotation" はノード側の設定なのでリソースには含めない）
+
+    Returns:
+        .tres ファイルの内容
+    """
+    kind = shape["type"]
+    if kind == "circle":
+        resource_type, body = "CircleShape2D", [f"radius = {_float(shape['radius'])}"]
+    elif kind == "capsule":
+        resource_type = "CapsuleShape2D"
+        body = [f"radius = {_float(shape['radius'])}", f"height = {_float(shape['height'])}"]
+    elif kind == "rect":
+        resource_type = "RectangleShape2D"
+        body = [f"size = Vector2({_float(shape['size'][0])}, {_float(shape['size'][1])})"]
+    elif kind == "convex":
+        resource_type = "ConvexPolygonShape2D"
+        coords = ", ".join(_float(v) for point in shape["points"] for v in point)
+        body = [f"points = PackedVector2Array({coords})"]
+    else:
+        raise ValueError(f"Unknown shape type: {kind}")
+
+    return f'[gd_resource type="{resource_type}" format=3]\n\n[resource]\n' + "\n".join(body) + "\n"
+
+
+def write_shape(output_path: Path, shape: Dict[str, Any], base_dir: Path = BASE_DIR) -> Path:
+    """
+    Shape2D リソースを書き出す（内容が同一の場合はファイルに触れない）
+
+    Returns:
+        出力パス
+    """
+    return _write_if_changed(_absolute(output_path, base_dir), shape_tres(shape))
+
+
+def _write_if_changed(output_file: Path, content: str) -> Path:
+    """内容が変わった場合のみ一時ファイル経由で書き込む（Godotの再インポートを避ける）"""
+    if output_file.exists() and output_file.read_text() == content:
+        return output_file
+
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    tmp_file.write_text(content)
+    os.replace(tmp_file, output_file)
+    return output_file
+
+
+def _float(value: float) -> str:
+    """Godotの表記（1.0, 12.5）"""
+    return repr(float(round(value, 3)))
+
+
+def _absolute(path: Path, base_dir: Path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else base_dir / path
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")[:24]
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Write a Godot SpriteFrames .tres from a horizontal sprite sheet")
+    parser.add_argument("sheet", help="Sprite sheet PNG (inside the Godot project)")
+    parser.add_argument("--output", required=True, help="Output .tres path")
+    parser.add_argument("--name", default="default", help="Animation name (default: default)")
+    parser.add_argument("--fps", type=float, default=8.0, help="Animation speed (default: 8)")
+    parser.add_argument("--frames", type=int, help="Number of frames (default: from file name)")
+    parser.add_argument("--no-loop", action="store_true", help="Play once instead of looping")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Godot project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    sheet = _absolute(Path(args.sheet).resolve(), base_dir)
+
+    try:
+        frames = [{"texture": sheet, **entry} for entry in strip_regions(sheet, args.frames)]
+        output = write_sprite_frames(
+            Path(args.output).resolve(),
+            [{"name": args.name, "speed": args.fps, "loop": not args.no_loop, "frames": frames}],
+            base_dir,
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"✅ SpriteFrames created: {output} ({len(frames)} frames, {args.fps} FPS)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+生成画像の知覚ハッシュ索引（ほぼ同一の画像の検出と成果物の再利用）
+
+DALL-E の出力は毎回異なり、リトライやプロンプトの微修正で中身がほとんど
+変わらない *_single.png が溜まっていきます。画像ごとに知覚ハッシュ
+（pHash: 32x32 DCT の低周波8x8、dHash: 9x8 の横方向の輝度勾配、各64bit）と
+4x4 に縮小したRGBの色サインをディスクに保存し、BK木でハミング距離の近い画像を
+探します。ハッシュは輝度だけを見るため、色相だけが違う画像（パレット違い、
+チャンネルの入れ替え）は色サインの差で区別します。
+
+pipeline.py --dedupe は、処理済みの画像とほぼ同一で、同じパラメータの成果物が
+残っている場合にピクセル化・シート化をせず、その成果物を再利用します。
+
+索引は <base-dir>/.cache/image_index.json に保存されます（BK木は読み込み時に再構築）。
+
+使用例:
+    # assets/ 以下の *_single.png と生成キャッシュを索引に追加
+    python3 image_index.py --scan
+
+    # ほぼ同一の画像のグループを表示（ハミング距離 6 以下）
+    python3 image_index.py --duplicates --distance 6
+
+    # 指定した画像に近い索引内の画像
+    python3 image_index.py --query assets/characters/enemies/basic_enemy_single.png
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any, Iterable
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+INDEX_FILE = Path(".cache") / "image_index.json"
+INDEX_VERSION = 2
+# リサイズや再エンコード程度の差を同一とみなす距離（64bit中）
+DEFAULT_DISTANCE = 6
+# 色サインの各マス・各チャンネルで許容する差（0-255）
+COLOR_TOLERANCE = 24
+SCAN_PATTERNS = ("assets/**/*_single.png", ".cache/dalle/**/*.png")
+
+# pHash 用の DCT-II 係数（低周波8行のみ使う）
+_DCT = [
+    [math.cos(math.pi * (2 * x + 1) * u / 64) * (math.sqrt(1 / 32) if u == 0 else math.sqrt(2 / 32)) for x in range(32)]
+    for u in range(8)
+]
+
+
+def _grayscale(image: Image.Image) -> Image.Image:
+    """透明部分を黒として輝度画像にする（背景の抜き方の違いでハッシュが変わらないように）"""
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, (0, 0, 0, 255))
+        image = Image.alpha_composite(background, image)
+    return image.convert("L")
+
+
+def dhash(image: Image.Image) -> int:
+    """
+    差分ハッシュ（9x8 に縮小し、各行で右隣より暗い画素を1とする64bit）
+
+    Args:
+        image: 画像
+
+    Returns:
+        64bit整数
+    """
+    pixels = _grayscale(image).resize((9, 8), Image.Resampling.BOX).tobytes()
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            value = (value << 1) | (pixels[row * 9 + column] < pixels[row * 9 + column + 1])
+    return value
+
+
+def phash(image: Image.Image) -> int:
+    """
+    知覚ハッシュ（32x32 の DCT の低周波 8x8 のうち、DC成分を除く中央値より大きい係数を1とする64bit）
+
+    Args:
+        image: 画像
+
+    Returns:
+        64bit整数
+    """
+    pixels = _grayscale(image).resize((32, 32), Image.Resampling.BOX).tobytes()
+    rows = [pixels[y * 32:(y + 1) * 32] for y in range(32)]
+
+    # 列方向 → 行方向の順に、必要な 8x8 だけ計算する
+    partial = [[sum(_DCT[u][y] * rows[y][x] for y in range(32)) for x in range(32)] for u in range(8)]
+    coefficients = [sum(partial[u][x] * _DCT[v][x] for x in range(32)) for u in range(8) for v in range(8)]
+
+    median = sorted(coefficients[1:])[31]
+    value = 0
+    for coefficient in coefficients:
+        value = (value << 1) | (coefficient > median)
+    return value
+
+
+def color_signature(image: Image.Image) -> str:
+    """
+    色サイン（透明部分を黒として 4x4 に縮小したRGB、48バイトの16進文字列）
+
+    Args:
+        image: 画像
+
+    Returns:
+        96文字の16進文字列
+    """
+    image = image.convert("RGBA")
+    background = Image.new("RGBA", image.size, (0, 0, 0, 255))
+    return Image.alpha_composite(background, image).convert("RGB").resize((4, 4), Image.Resampling.BOX).tobytes().hex()
+
+
+def color_distance(a: str, b: str) -> int:
+    """2つの色サインの距離（マス・チャンネルごとの差の最大値）"""
+    return max(abs(x - y) for x, y in zip(bytes.fromhex(a), bytes.fromhex(b)))
+
+
+def hamming(a: int, b: int) -> int:
+    """2つのハッシュのハミング距離"""
+    return bin(a ^ b).count("1")
+
+
+def content_id(image: Image.Image) -> str:
+    """画素内容のSHA-256（PNGの圧縮設定やメタデータの違いは無視する）"""
+    image = image.convert("RGBA")
+    return hashlib.sha256(f"{image.size}".encode() + image.tobytes()).hexdigest()
+
+
+class BKTree:
+    """ハミング距離の BK木（半径内の検索で三角不等式により枝を刈る）"""
+
+    def __init__(self):
+        self._root: Optional[list] = None  # [キー, [値...], {距離: 子ノード}]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: Any):
+        """キーと値を追加（同じキーは1ノードにまとめる）"""
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(key, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [value], {}]
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, Any]]:
+        """
+        半径内の値を探す
+
+        Returns:
+            [(距離, 値), ...]（距離の昇順）
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(key, node[0])
+            if distance <= radius:
+                results.extend((distance, value) for value in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(results, key=lambda result: result[0])
+
+
+class ImageIndex:
+    """知覚ハッシュの索引（画素内容のIDごとに pHash/dHash と処理済みの成果物を記録）"""
+
+    def __init__(self, base_dir: Path = BASE_DIR, path: Optional[Path] = None):
+        """
+        初期化
+
+        Args:
+            base_dir: プロジェクトルート（成果物のパスはここからの相対パスで記録）
+            path: 索引ファイル（Noneで <base_dir>/.cache/image_index.json）
+        """
+        self.base_dir = Path(base_dir)
+        self.path = Path(path) if path else self.base_dir / INDEX_FILE
+        self.images: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+        self._tree = BKTree()
+        for image_id, entry in self.images.items():
+            self._tree.add(int(entry["phash"], 16), image_id)
+
+    def add(self, image: Image.Image, source: Optional[str] = None, asset: Optional[str] = None) -> str:
+        """
+        画像を索引に追加（同じ画素内容は1件にまとめる）
+
+        Args:
+            image: 画像
+            source: 元ファイル（base_dirからの相対パス、表示用）
+            asset: アセット名（表示用）
+
+        Returns:
+            画像ID（画素内容のSHA-256）
+        """
+        image_id = content_id(image)
+        entry = self.images.get(image_id)
+        if entry is None:
+            entry = self.images[image_id] = {
+                "phash": f"{phash(image):016x}",
+                "dhash": f"{dhash(image):016x}",
+                "color": color_signature(image),
+                "sources": [],
+                "assets": [],
+                "outputs": {},
+                "added": time.time(),
+            }
+            self._tree.add(int(entry["phash"], 16), image_id)
+        for key, value in (("sources", source), ("assets", asset)):
+            if value and value not in entry[key]:
+                entry[key].append(value)
+        return image_id
+
+    def add_file(self, path: Path) -> str:
+        """
+        画像ファイルを索引に追加（mtime/サイズが前回と同じならデコードしない）
+
+        Returns:
+            画像ID
+        """
+        path = Path(path)
+        rel_path = self._relative(path)
+        stat = path.stat()
+        record = self.files.get(rel_path)
+        if (record and record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size
+                and record["id"] in self.images):
+            return record["id"]
+
+        with Image.open(path) as img:
+            image_id = self.add(img, source=rel_path)
+        self.files[rel_path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "id": image_id}
+        return image_id
+
+    def near(self, image_id: str, max_distance: int = DEFAULT_DISTANCE) -> List[Tuple[int, str]]:
+        """
+        索引内の画像に近い画像（pHash と dHash の両方が max_distance 以内で、
+        色サインの差が COLOR_TOLERANCE 以内、自身を除く）
+
+        Returns:
+            [(pHashの距離, 画像ID), ...]（距離の昇順）
+        """
+        entry = self.images[image_id]
+        target = int(entry["dhash"], 16)
+        return [
+            (distance, other)
+            for distance, other in self._tree.search(int(entry["phash"], 16), max_distance)
+            if other != image_id
+            and hamming(target, int(self.images[other]["dhash"], 16)) <= max_distance
+            and color_distance(entry["color"], self.images[other]["color"]) <= COLOR_TOLERANCE
+        ]
+
+    def record_output(self, image_id: str, key: str, output: Path):
+        """
+        画像から作った成果物を記録
+
+        Args:
+            image_id: 元画像のID
+            key: 処理内容のキー（同じキーの成果物だけを再利用する）
+            output: 成果物のパス
+        """
+        output = Path(output)
+        self.images[image_id]["outputs"][key] = {
+            "path": self._relative(output),
+            "sha256": _file_digest(output),
+        }
+
+    def reusable_output(self, image_id: str, key: str, max_distance: int = DEFAULT_DISTANCE) -> Optional[Tuple[Path, int]]:
+        """
+        同じ画像（またはほぼ同一の画像）から同じ処理で作った成果物を探す
+
+        成果物が記録後に書き換えられている場合（別の画像から作り直された等）は使わない。
+
+        Returns:
+            (成果物のパス, pHashの距離)。見つからなければNone
+        """
+        for distance, other in [(0, image_id)] + self.near(image_id, max_distance):
+            output = self.images[other]["outputs"].get(key)
+            if output is None:
+                continue
+            path = self.base_dir / output["path"]
+            if path.exists() and _file_digest(path) == output["sha256"]:
+                return path, distance
+        return None
+
+    def duplicates(self, max_distance: int = DEFAULT_DISTANCE) -> List[List[str]]:
+        """
+        ほぼ同一の画像のグループ（2件以上、連結成分）
+
+        Returns:
+            [[画像ID, ...], ...]
+        """
+        groups = []
+        seen = set()
+        for image_id in self.images:
+            if image_id in seen:
+                continue
+            group, stack = [], [image_id]
+            seen.add(image_id)
+            while stack:
+                current = stack.pop()
+                group.append(current)
+                for _, other in self.near(current, max_distance):
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            if len(group) > 1:
+                groups.append(group)
+        return groups
+
+    def prune(self) -> int:
+        """
+        存在しないファイルの記録を削除
+
+        Returns:
+            削除した件数
+        """
+        missing = [rel_path for rel_path in self.files if not (self.base_dir / rel_path).exists()]
+        for rel_path in missing:
+            del self.files[rel_path]
+        return len(missing)
+
+    def save(self):
+        """アトミックに書き込み"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "images": self.images, "files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _relative(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  Image index is corrupt, starting fresh: {self.path}")
+            return
+        if data.get("version") != INDEX_VERSION:
+            return  # ハッシュの定義が変わった場合は作り直す
+        self.images = data.get("images", {})
+        self.files = data.get("files", {})
+
+
+def _file_digest(path: Path) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan(index: ImageIndex, patterns: Iterable[str] = SCAN_PATTERNS) -> int:
+    """
+    パターンに一致する画像を索引に追加
+
+    Returns:
+        追加・確認した画像数
+    """
+    count = 0
+    for pattern in patterns:
+        for path in sorted(index.base_dir.glob(pattern)):
+            try:
+                index.add_file(path)
+                count += 1
+            except OSError as e:
+                print(f"⚠️  {path}: {e}")
+    return count
+
+
+def _label(index: ImageIndex, image_id: str) -> str:
+    entry = index.images[image_id]
+    names = entry.get("sources") or entry.get("assets") or ["(in memory)"]
+    return f"{image_id[:12]} {', '.join(names)}"
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Perceptual-hash index of generated images (near-duplicate lookup)")
+    parser.add_argument("--scan", action="store_true", help=f"Index images matching {', '.join(SCAN_PATTERNS)}")
+    parser.add_argument("--pattern", action="append", help="Glob (relative to --base-dir) to scan instead of the defaults")
+    parser.add_argument("--duplicates", action="store_true", help="List groups of near-identical images")
+    parser.add_argument("--query", help="Show indexed images near this image")
+    parser.add_argument("--distance", type=int, default=DEFAULT_DISTANCE,
+                        help=f"Maximum Hamming distance of pHash and dHash (default: {DEFAULT_DISTANCE})")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    if not (args.scan or args.duplicates or args.query):
+        parser.print_help()
+        sys.exit(1)
+
+    index = ImageIndex(Path(args.base_dir))
+
+    if args.scan:
+        started = time.perf_counter()
+        count = scan(index, args.pattern or SCAN_PATTERNS)
+        pruned = index.prune()
+        index.save()
+        print(f"✅ Indexed {count} file(s) ({len(index.images)} unique image(s), {pruned} missing file(s) removed) "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    if args.query:
+        try:
+            image_id = index.add_file(Path(args.query).resolve())
+        except OSError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        matches = index.near(image_id, args.distance)
+        print(f"🔍 {args.query}: {len(matches)} near-identical image(s)")
+        for distance, other in matches:
+            print(f"   {distance:2d}  {_label(index, other)}")
+        index.save()
+
+    if args.duplicates:
+        groups = index.duplicates(args.distance)
+        print(f"🔁 {len(groups)} group(s) of near-identical images (distance <= {args.distance})")
+        for group in groups:
+            print()
+            for image_id in group:
+                print(f"   {_label(index, image_id)}")
+
+
+if __name__ == "__main__":
+    main()
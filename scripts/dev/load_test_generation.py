@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+バッチ生成の負荷試験（ローカルのスタブサーバーを使用、オフライン）
+
+stub_image_server.py をプロセス内で起動し、合成アセットを
+DALLEAssetGenerator.generate_batch() で高い同時実行数のまま処理します。
+シナリオごとに遅延・500エラー・429・ダウンロード切断・画像サイズを変え、
+スループット、アセットごとの所要時間（p50/p95）、サーバー側で発生した
+エラー数を表示します。
+
+使用例:
+    # 全シナリオ
+    python3 load_test_generation.py
+
+    # 一部のシナリオ、アセット数と同時実行数を変更
+    python3 load_test_generation.py --scenarios "flaky*" --assets 200 --concurrency 32
+
+    # 結果をJSONで保存
+    python3 load_test_generation.py --output load_test.json
+
+必要なライブラリ:
+    pip install openai pillow requests
+"""
+
+import io
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import tempfile
+import statistics
+import contextlib
+from pathlib import Path
+from typing import Dict, List, Any
+
+from generate_asset_with_dalle import PROMPTS, DALLEAssetGenerator, load_dependencies
+from stub_image_server import StubConfig, start_server
+from tracing import Tracer
+
+
+# 各シナリオ: スタブの設定と generate_batch() の引数
+# （"expect" はサーバー統計の最低値。満たさなければ失敗として扱う）
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "baseline": {
+        "server": {"latency": 0.2, "jitter": 0.1, "image_size": (256, 256)},
+        "assets": 64, "concurrency": 16,
+    },
+    "b64_json": {
+        "server": {"latency": 0.2, "jitter": 0.1, "image_size": (256, 256)},
+        "assets": 64, "concurrency": 16, "response_format": "b64_json",
+    },
+    "flaky": {
+        # 切断が再開（Range）の対象になるよう、PNGをダウンロードのチャンク（64KB）より大きくする
+        "server": {"latency": 0.1, "error_rate": 0.1, "truncate_rate": 0.2, "image_size": (256, 256),
+                   "payload_kb": 512, "seed": 1},
+        "assets": 64, "concurrency": 16, "expect": {"range_downloads": 1},
+    },
+    "rate_limited": {
+        "server": {"latency": 0.05, "rate_limit_rate": 0.3, "retry_after": 0.2, "image_size": (256, 256), "seed": 2},
+        "assets": 64, "concurrency": 16,
+    },
+    "client_throttled": {
+        "server": {"latency": 0.05, "max_rpm": 600, "retry_after": 0.5, "image_size": (256, 256)},
+        "assets": 32, "concurrency": 16, "rate": 600, "burst": 4,
+    },
+    "large_payload": {
+        "server": {"latency": 0.1, "download_latency": 0.1, "image_size": (1024, 1024), "payload_kb": 4096},
+        "assets": 32, "concurrency": 16,
+    },
+}
+
+# 合成アセット名の接頭辞（PROMPTS に一時的に登録する）
+ASSET_PREFIX = "load_test_"
+
+
+def _synthetic_assets(count: int) -> Dict[str, Dict[str, Any]]:
+    """PROMPTS と同じ形式の合成アセット定義"""
+    return {
+        f"{ASSET_PREFIX}{i:04d}": {
+            "prompt": f"Load test sprite #{i}: 32x32 pixel art slime, transparent background.",
+            "output": f"assets/load_test/sprite_{i:04d}_single.png",
+            "frames": 4,
+            "final_output": f"assets/load_test/sprite_{i:04d}_32x32_4f.png",
+        }
+        for i in range(count)
+    }
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(ratio * (len(ordered) - 1))))]
+
+
+def run_scenario(name: str, assets: int = 0, concurrency: int = 0, max_retries: int = 5) -> Dict[str, Any]:
+    """
+    シナリオを1つ実行
+
+    Args:
+        name: シナリオ名
+        assets: アセット数（0でシナリオの既定値）
+        concurrency: 同時実行数（0でシナリオの既定値）
+        max_retries: クライアント（OpenAI SDK）の最大リトライ回数
+
+    Returns:
+        計測結果
+    """
+    scenario = SCENARIOS[name]
+    count = assets or scenario["assets"]
+    workers = concurrency or scenario["concurrency"]
+
+    load_dependencies()
+    from openai import OpenAI
+
+    server = start_server(StubConfig(**scenario["server"]))
+    synthetic = _synthetic_assets(count)
+    PROMPTS.update(synthetic)
+    tracer = Tracer()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = DALLEAssetGenerator(
+                base_dir=tmp,
+                response_format=scenario.get("response_format", "url"),
+                tracer=tracer,
+                client=OpenAI(api_key="stub", base_url=server.base_url, max_retries=max_retries),
+            )
+
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = generator.generate_batch(
+                    list(synthetic),
+                    delay=0,
+                    max_workers=workers,
+                    rate_per_minute=scenario.get("rate"),
+                    burst=scenario.get("burst", 1),
+                )
+            elapsed = time.perf_counter() - started
+
+            metrics = [json.loads(line) for line in _metrics_lines(tracer, Path(tmp))]
+    finally:
+        for asset_name in synthetic:
+            PROMPTS.pop(asset_name, None)
+        server.shutdown()
+        server.server_close()
+
+    latencies = [m["seconds"] for m in metrics if m.get("success")]
+    succeeded = sum(results.values())
+    return {
+        "assets": count,
+        "concurrency": workers,
+        "succeeded": succeeded,
+        "seconds": elapsed,
+        "assets_per_s": succeeded / elapsed if elapsed > 0 else 0.0,
+        "p50_seconds": statistics.median(latencies) if latencies else 0.0,
+        "p95_seconds": _percentile(latencies, 0.95),
+        "download_retries": sum(m.get("retries", 0) for m in metrics),
+        "bytes_downloaded": sum(m.get("bytes_downloaded", 0) for m in metrics),
+        "server": dict(server.stats),
+        "unmet": [
+            f"{key} {server.stats[key]} < {minimum}"
+            for key, minimum in scenario.get("expect", {}).items()
+            if server.stats[key] < minimum
+        ],
+    }
+
+
+def _metrics_lines(tracer: Tracer, tmp: Path) -> List[str]:
+    """トレーサーのアセットごとのメトリクス（JSONL）の各行"""
+    path = tmp / "metrics.jsonl"
+    tracer.write_metrics(path)
+    return path.read_text().splitlines()
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Offline load test of batch generation against a local stub server")
+    parser.add_argument("--scenarios", nargs="*", default=["*"], help="Scenario name patterns (default: all)")
+    parser.add_argument("--list", action="store_true", help="List scenarios")
+    parser.add_argument("--assets", type=int, default=0, help="Override the number of assets per scenario")
+    parser.add_argument("--concurrency", type=int, default=0, help="Override the batch concurrency")
+    parser.add_argument("--max-retries", type=int, default=5, help="OpenAI client retries (default: %(default)s)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"  - {name:<18} {json.dumps(scenario['server'])}")
+        return
+
+    names = [name for name in SCENARIOS if any(fnmatch.fnmatch(name, pattern) for pattern in args.scenarios)]
+    if not names:
+        print("❌ Error: No scenarios matched")
+        sys.exit(1)
+
+    print("=" * 70)
+    print(f"  Generation Load Test: {len(names)} scenario(s)")
+    print("=" * 70)
+
+    results = {}
+    for name in names:
+        r = run_scenario(name, args.assets, args.concurrency, args.max_retries)
+        results[name] = r
+        status = "✅" if r["succeeded"] == r["assets"] and not r["unmet"] else "⚠️ "
+        server = r["server"]
+        print(f"{status} {name:<18} {r['succeeded']:>4}/{r['assets']:<4} x{r['concurrency']:<3} "
+              f"{r['seconds']:7.2f} s  {r['assets_per_s']:6.1f} assets/s  "
+              f"p50 {r['p50_seconds']:.2f} s  p95 {r['p95_seconds']:.2f} s")
+        print(f"   server: {server['generate']} requests, {server['rate_limited']} x429, "
+              f"{server['errors']} x500, {server['truncated']} truncated, "
+              f"{server['range_downloads']} resumed; client download retries: {r['download_retries']}")
+        for unmet in r["unmet"]:
+            print(f"   ❌ expected: {unmet}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if any(r["succeeded"] < r["assets"] or r["unmet"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+テクスチャアトラス作成スクリプト
+
+複数キャラクターのスプライトシートからフレームを切り出し、
+透明な余白をトリミング・同一フレームを統合したうえで、
+MaxRects法で2の累乗サイズのアトラスに詰め込みます。
+フレームの配置情報はJSONのフレームマップとして出力します。
+
+フレームの切り出し方:
+    - ファイル名が `<name>_<W>x<H>_<N>f.png` の場合: W×H のフレームが横にN枚
+    - --frame-size WxH 指定時: 画像全体をそのサイズのグリッドとして分割
+    - それ以外: 画像全体を1フレームとして扱う
+
+使用例:
+    # 全敵のスプライトシートを1枚のアトラスにまとめる
+    python3 pack_atlas.py assets/characters/enemies/*_4f.png \\
+        --output assets/characters/enemies/enemies_atlas
+
+    # 最大サイズ1024、余白2px
+    python3 pack_atlas.py "assets/characters/**/*f.png" --output build/atlas --max-size 1024 --padding 2
+
+出力:
+    <output>.png（複数枚になる場合は <output>_0.png, <output>_1.png, ...）
+    <output>.json（フレームマップ）
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import sys
+import glob
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+from godot_resources import parse_frame_spec
+
+
+class MaxRectsBin:
+    """MaxRects法（Best Short Side Fit）による矩形詰め込み"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free_rects: List[Tuple[int, int, int, int]] = [(0, 0, width, height)]
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """
+        矩形を配置
+
+        Returns:
+            配置位置 (x, y)（入らない場合はNone）
+        """
+        best = None
+        best_score = (float("inf"), float("inf"))
+
+        for fx, fy, fw, fh in self.free_rects:
+            if width <= fw and height <= fh:
+                leftover_w, leftover_h = fw - width, fh - height
+                score = (min(leftover_w, leftover_h), max(leftover_w, leftover_h))
+                if score < best_score:
+                    best, best_score = (fx, fy), score
+
+        if best is None:
+            return None
+
+        self._split(best[0], best[1], width, height)
+        self._prune()
+        return best
+
+    def _split(self, x: int, y: int, width: int, height: int):
+        """配置した矩形と重なる空き領域を分割"""
+        result = []
+        for rect in self.free_rects:
+            fx, fy, fw, fh = rect
+            if x >= fx + fw or x + width <= fx or y >= fy + fh or y + height <= fy:
+                result.append(rect)
+                continue
+
+            if x > fx:
+                result.append((fx, fy, x - fx, fh))
+            if x + width < fx + fw:
+                result.append((x + width, fy, fx + fw - x - width, fh))
+            if y > fy:
+                result.append((fx, fy, fw, y - fy))
+            if y + height < fy + fh:
+                result.append((fx, y + height, fw, fy + fh - y - height))
+
+        self.free_rects = result
+
+    def _prune(self):
+        """他の空き領域に完全に含まれる空き領域を削除"""
+        rects = self.free_rects
+        keep = []
+        for i, (ax, ay, aw, ah) in enumerate(rects):
+            contained = False
+            for j, (bx, by, bw, bh) in enumerate(rects):
+                if i == j:
+                    continue
+                if bx <= ax and by <= ay and ax + aw <= bx + bw and ay + ah <= by + bh:
+                    # 同一矩形の場合は先に出現したものを残す
+                    if (ax, ay, aw, ah) != (bx, by, bw, bh) or j < i:
+                        contained = True
+                        break
+            if not contained:
+                keep.append((ax, ay, aw, ah))
+        self.free_rects = keep
+
+
+def load_frames(path: str, frame_size: Optional[Tuple[int, int]] = None) -> List[Tuple[str, Image.Image]]:
+    """
+    画像からフレームを切り出す
+
+    Args:
+        path: 画像パス
+        frame_size: グリッドのセルサイズ（Noneの場合はファイル名から判定）
+
+    Returns:
+        [(フレーム名, 画像), ...]（フレーム名は "<stem>/<index>"）
+    """
+    stem = Path(path).stem
+    with Image.open(path) as img:
+        sheet = img.convert("RGBA")
+
+    return split_frames(sheet, stem, frame_size)
+
+
+def split_frames(
+    sheet: Image.Image,
+    stem: str,
+    frame_size: Optional[Tuple[int, int]] = None
+) -> List[Tuple[str, Image.Image]]:
+    """
+    メモリ上のスプライトシートからフレームを切り出す
+
+    Args:
+        sheet: スプライトシート
+        stem: フレーム名の接頭辞（`<name>_<W>x<H>_<N>f` 形式ならフレームサイズも判定）
+        frame_size: グリッドのセルサイズ（Noneの場合は stem から判定）
+
+    Returns:
+        [(フレーム名, 画像), ...]（フレーム名は "<stem>/<index>"）
+    """
+    sheet = sheet.convert("RGBA")
+
+    if frame_size is None:
+        spec = parse_frame_spec(stem)
+        frame_size = spec[:2] if spec else sheet.size
+
+    frame_w, frame_h = frame_size
+    columns = sheet.size[0] // frame_w
+    rows = sheet.size[1] // frame_h
+
+    frames = []
+    for row in range(rows):
+        for column in range(columns):
+            box = (column * frame_w, row * frame_h, (column + 1) * frame_w, (row + 1) * frame_h)
+            frames.append((f"{stem}/{len(frames)}", sheet.crop(box)))
+
+    return frames
+
+
+def _trim(frame: Image.Image) -> Tuple[Image.Image, Tuple[int, int]]:
+    """透明な余白を除去し、(トリミング後の画像, 元画像内のオフセット) を返す"""
+    bbox = frame.getchannel("A").getbbox()
+    if bbox is None:
+        # 完全に透明なフレームは1×1の透明ピクセルで表す
+        return Image.new("RGBA", (1, 1), (0, 0, 0, 0)), (0, 0)
+    return frame.crop(bbox), (bbox[0], bbox[1])
+
+
+def _next_size(width: int, height: int) -> Tuple[int, int]:
+    """次に試すアトラスサイズ（幅と高さを交互に倍にする）"""
+    return (width * 2, height) if width <= height else (width, height * 2)
+
+
+def _pack_into(sizes: List[Tuple[int, int]], width: int, height: int, padding: int,
+               require_all: bool) -> Dict[int, Tuple[int, int]]:
+    """指定サイズのビンへ詰め込み、{インデックス: (x, y)} を返す"""
+    # 右端・下端のフレームには余白が不要なため、ビンを余白分だけ広げておく
+    packer = MaxRectsBin(width + padding, height + padding)
+    placed = {}
+    for index, (w, h) in enumerate(sizes):
+        position = packer.insert(w + padding, h + padding)
+        if position is None:
+            if require_all:
+                return {}
+            continue
+        placed[index] = position
+    return placed
+
+
+def _extent(sizes: List[Tuple[int, int]], placed: Dict[int, Tuple[int, int]]) -> Tuple[int, int]:
+    """配置したフレームが使っている範囲（幅, 高さ）"""
+    return (max(x + sizes[i][0] for i, (x, _) in placed.items()),
+            max(y + sizes[i][1] for i, (_, y) in placed.items()))
+
+
+def _pack_tight(sizes: List[Tuple[int, int]], placed: Dict[int, Tuple[int, int]], max_width: int,
+                padding: int, max_size: int) -> Tuple[Dict[int, Tuple[int, int]], Tuple[int, int]]:
+    """
+    2の累乗にしない場合の配置（幅を変えて詰め直し、使用範囲の面積が最小のものを選ぶ）
+
+    Args:
+        sizes: フレームサイズ
+        placed: 2の累乗サイズのビンで全フレームを詰めた配置
+        max_width: 試す幅の上限（その2の累乗サイズの幅）
+
+    Returns:
+        (配置, アトラスサイズ)
+    """
+    best, best_size = placed, _extent(sizes, placed)
+    min_width = max(w for w, _ in sizes)
+    step = max(1, (max_width - min_width) // 32)
+    for width in range(min_width, max_width + 1, step):
+        candidate = _pack_into(sizes, width, max_size, padding, require_all=True)
+        if not candidate:
+            continue
+        size = _extent(sizes, candidate)
+        if size[0] * size[1] < best_size[0] * best_size[1]:
+            best, best_size = candidate, size
+    return best, best_size
+
+
+def pack_frames(
+    frames: List[Tuple[str, Image.Image]],
+    max_size: int = 2048,
+    padding: int = 1,
+    trim: bool = True,
+    power_of_two: bool = True
+) -> Tuple[List[Image.Image], Dict[str, Any]]:
+    """
+    フレームをアトラスへ詰め込む
+
+    Args:
+        frames: [(フレーム名, 画像), ...]
+        max_size: アトラス1枚の最大辺（2の累乗）
+        padding: フレーム間の余白（px）
+        trim: 透明な余白を除去するか
+        power_of_two: アトラスを2の累乗サイズにするか。Falseの場合は使用範囲
+            ぎりぎりのサイズにする（Godot 4 は2の累乗でないテクスチャも扱える）
+
+    Returns:
+        (アトラス画像のリスト, フレームマップ)
+    """
+    # トリミングと重複排除
+    unique: List[Image.Image] = []
+    unique_index: Dict[str, int] = {}
+    frame_entries: Dict[str, Dict[str, Any]] = {}
+
+    for name, frame in frames:
+        frame = frame.convert("RGBA")
+        trimmed, offset = _trim(frame) if trim else (frame, (0, 0))
+        digest = hashlib.sha1(
+            f"{trimmed.size}".encode() + trimmed.tobytes()
+        ).hexdigest()
+
+        if digest not in unique_index:
+            unique_index[digest] = len(unique)
+            unique.append(trimmed)
+
+        frame_entries[name] = {
+            "image": unique_index[digest],
+            "offset": list(offset),
+            "source_size": list(frame.size),
+        }
+
+    sizes = [img.size for img in unique]
+    for w, h in sizes:
+        if w + padding > max_size or h + padding > max_size:
+            raise ValueError(f"Frame {w}x{h} does not fit into a {max_size}px atlas")
+
+    # 大きいものから詰める
+    order = sorted(range(len(unique)), key=lambda i: (max(sizes[i]), sizes[i][0] * sizes[i][1]), reverse=True)
+    remaining = order
+    atlases: List[Image.Image] = []
+    regions: Dict[int, Tuple[int, List[int]]] = {}
+
+    while remaining:
+        remaining_sizes = [sizes[i] for i in remaining]
+        area = sum((w + padding) * (h + padding) for w, h in remaining_sizes)
+
+        # 全部入る最小の2の累乗サイズを探す
+        width = height = 16
+        while width * height < area:
+            width, height = _next_size(width, height)
+
+        placed = {}
+        while width <= max_size and height <= max_size:
+            placed = _pack_into(remaining_sizes, width, height, padding, require_all=True)
+            if placed:
+                break
+            width, height = _next_size(width, height)
+
+        # 1枚に収まらない場合は最大サイズで入るだけ詰め、残りは次のアトラスへ
+        if not placed:
+            width = height = max_size
+            placed = _pack_into(remaining_sizes, width, height, padding, require_all=False)
+            if not power_of_two:
+                width, height = _extent(remaining_sizes, placed)
+        elif not power_of_two:
+            placed, (width, height) = _pack_tight(remaining_sizes, placed, width, padding, max_size)
+
+        atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        for local_index, (x, y) in placed.items():
+            image_index = remaining[local_index]
+            atlas.paste(unique[image_index], (x, y))
+            w, h = sizes[image_index]
+            regions[image_index] = (len(atlases), [x, y, w, h])
+
+        atlases.append(atlas)
+        remaining = [i for n, i in enumerate(remaining) if n not in placed]
+
+    frame_map: Dict[str, Any] = {"atlases": [], "frames": {}, "animations": {}}
+    for atlas in atlases:
+        frame_map["atlases"].append({"size": list(atlas.size)})
+
+    for name, entry in frame_entries.items():
+        atlas_index, region = regions[entry["image"]]
+        frame_map["frames"][name] = {
+            "atlas": atlas_index,
+            "region": region,
+            "offset": entry["offset"],
+            "source_size": entry["source_size"],
+        }
+        animation = name.rsplit("/", 1)[0]
+        frame_map["animations"].setdefault(animation, []).append(name)
+
+    frame_map["stats"] = {
+        "frames": len(frames),
+        "unique_frames": len(unique),
+        "source_pixels": sum(f.size[0] * f.size[1] for _, f in frames),
+        "atlas_pixels": sum(a.size[0] * a.size[1] for a in atlases),
+    }
+
+    return atlases, frame_map
+
+
+def write_atlas(atlases: List[Image.Image], frame_map: Dict[str, Any], output: str) -> List[Path]:
+    """
+    アトラス画像とフレームマップを保存
+
+    Args:
+        atlases: アトラス画像のリスト
+        frame_map: フレームマップ
+        output: 出力パス（拡張子なし）
+
+    Returns:
+        保存したアトラス画像のパス
+    """
+    output_base = Path(output)
+    output_base.parent.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for index, atlas in enumerate(atlases):
+        suffix = "" if len(atlases) == 1 else f"_{index}"
+        path = output_base.with_name(f"{output_base.name}{suffix}.png")
+        atlas.save(path, "PNG", optimize=True)
+        frame_map["atlases"][index]["image"] = path.name
+        paths.append(path)
+
+    with open(output_base.with_name(f"{output_base.name}.json"), "w") as f:
+        json.dump(frame_map, f, indent=2)
+
+    return paths
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Pack sprite frames into power-of-two texture atlases")
+    parser.add_argument("inputs", nargs="+", help="Sprite sheet files or glob patterns")
+    parser.add_argument("--output", required=True, help="Output path without extension")
+    parser.add_argument("--max-size", type=int, default=2048, help="Maximum atlas side (default: 2048)")
+    parser.add_argument("--padding", type=int, default=1, help="Padding between frames (default: 1)")
+    parser.add_argument("--frame-size", help="Grid cell size WxH (default: from file name)")
+    parser.add_argument("--no-trim", action="store_true", help="Keep transparent borders")
+    args = parser.parse_args()
+
+    if args.max_size & (args.max_size - 1):
+        print(f"❌ Error: --max-size must be a power of two: {args.max_size}")
+        sys.exit(1)
+
+    frame_size = None
+    if args.frame_size:
+        frame_size = tuple(int(v) for v in args.frame_size.lower().split("x"))
+
+    paths = []
+    for pattern in args.inputs:
+        matched = sorted(glob.glob(pattern, recursive=True))
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(matched)
+
+    if not paths:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    frames = []
+    for path in dict.fromkeys(paths):
+        frames.extend(load_frames(path, frame_size))
+
+    if not frames:
+        print("❌ Error: No frames found (sheets are smaller than their frame size)")
+        sys.exit(1)
+
+    print(f"📖 Input: {len(paths)} file(s), {len(frames)} frame(s)")
+
+    try:
+        atlases, frame_map = pack_frames(frames, args.max_size, args.padding, not args.no_trim)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    written = write_atlas(atlases, frame_map, args.output)
+
+    stats = frame_map["stats"]
+    print(f"✅ Atlas created: {', '.join(str(p) for p in written)}")
+    for atlas in frame_map["atlases"]:
+        print(f"   {atlas['image']}: {atlas['size'][0]}×{atlas['size'][1]}")
+    print(f"   Frames: {stats['frames']} ({stats['frames'] - stats['unique_frames']} duplicate(s) merged)")
+    print(f"   Pixels: {stats['source_pixels']} -> {stats['atlas_pixels']} "
+          f"({100 * stats['atlas_pixels'] / stats['source_pixels']:.0f}%)")
+    print(f"   Frame map: {args.output}.json")
+
+
+if __name__ == "__main__":
+    main()
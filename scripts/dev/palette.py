@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+プロジェクト共通パレット
+
+複数アセットの画素からパレット（median-cut / k-means）を一度だけ作成して
+JSONに保存し、各画像は 32×32×32 のRGBキューブ上で事前計算した
+最近傍色テーブル（LUT）を引くだけで減色します。同じカテゴリの敵や
+ボスが同じ色で描かれ、画像ごとの quantize() も不要になります。
+
+パレットファイル: config/palettes/<name>.json
+
+使用例:
+    # 敵の単一フレームから16色の共通パレットを作成
+    python3 palette.py build enemies "assets/characters/enemies/*_single.png" --colors 16
+
+    # パレットを表示
+    python3 palette.py show config/palettes/enemies.json
+
+    # パレットを使ってピクセルアート化
+    python3 convert_dalle_to_pixelart.py assets/characters/enemies --palette config/palettes/enemies.json
+
+必要なライブラリ:
+    pip install Pillow numpy
+"""
+
+import sys
+import glob
+import json
+import argparse
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, List, Iterable
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pillowのみの処理にフォールバック
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+PALETTE_DIR = Path("config") / "palettes"
+
+# LUTの分解能（チャンネルあたり 2^LUT_BITS 段階）
+LUT_BITS = 5
+SAMPLE_SIZE = 65536
+THUMBNAIL_SIZE = 128
+KMEANS_ITERATIONS = 16
+
+
+class Palette:
+    """固定パレットと最近傍色LUT"""
+
+    def __init__(self, colors, name: Optional[str] = None, method: Optional[str] = None):
+        """
+        初期化
+
+        Args:
+            colors: [(r, g, b), ...]
+            name: パレット名
+            method: 作成方法（表示用）
+        """
+        self.colors = [tuple(int(c) for c in color) for color in colors]
+        self.name = name
+        self.method = method
+        self._lut = None
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    @property
+    def lut(self):
+        """RGBキューブ（2^LUT_BITS の3乗）の各セル中心から最も近いパレット番号"""
+        if self._lut is None:
+            self._lut = _build_lut(tuple(self.colors))
+        return self._lut
+
+    def apply(self, img: Image.Image, use_numpy: bool = True) -> Image.Image:
+        """
+        画像をパレットの色に置き換える（アルファは保持）
+
+        Args:
+            img: 入力画像
+            use_numpy: NumPyが使える場合にLUTで処理するか
+
+        Returns:
+            変換後の画像（RGBA）
+        """
+        rgba = img.convert("RGBA")
+
+        if use_numpy and np is not None:
+            arr = np.asarray(rgba)
+            shift = 8 - LUT_BITS
+            cell = (
+                (arr[..., 0] >> shift).astype(np.intp) << (2 * LUT_BITS)
+                | (arr[..., 1] >> shift).astype(np.intp) << LUT_BITS
+                | (arr[..., 2] >> shift).astype(np.intp)
+            )
+            out = np.empty_like(arr)
+            out[..., :3] = np.asarray(self.colors, dtype=np.uint8)[self.lut[cell]]
+            out[..., 3] = arr[..., 3]
+            return Image.fromarray(out, "RGBA")
+
+        result = rgba.convert("RGB").quantize(
+            palette=self.to_pillow(), dither=Image.Dither.NONE
+        ).convert("RGBA")
+        result.putalpha(rgba.getchannel("A"))
+        return result
+
+    def to_pillow(self) -> Image.Image:
+        """Image.quantize(palette=...) に渡せるPモード画像"""
+        flat = [c for color in self.colors for c in color]
+        flat += list(flat[-3:]) * (256 - len(self.colors))
+        img = Image.new("P", (1, 1))
+        img.putpalette(flat)
+        return img
+
+    def save(self, path: Path, sources: Optional[List[str]] = None):
+        """JSONとして保存（内容が同一の場合はファイルに触れない）"""
+        path = Path(path)
+        content = json.dumps(
+            {
+                "name": self.name,
+                "method": self.method,
+                "colors": [list(color) for color in self.colors],
+                "hex": ["#%02x%02x%02x" % color for color in self.colors],
+                "sources": sources or [],
+            },
+            indent=2,
+        ) + "\n"
+
+        if path.exists() and path.read_text() == content:
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(content)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Palette":
+        """JSONから読み込み"""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["colors"], data.get("name"), data.get("method"))
+
+
+def load_palette(path: str) -> Palette:
+    """
+    パレットを読み込む（プロセス内でキャッシュし、LUTも使い回す）
+
+    キャッシュは mtime/サイズ込みで引くため、watch_assets.py の常駐ワーカーでも
+    パレットの書き換え後に古い色が使われることはない。
+    """
+    stat = Path(path).stat()
+    return _load_palette(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _load_palette(path: str, mtime_ns: int, size: int) -> Palette:
+    return Palette.load(Path(path))
+
+
+def palette_path(name: str, base_dir: Path = BASE_DIR) -> Path:
+    """パレット名から config/palettes/<name>.json のパスを返す"""
+    return Path(base_dir) / PALETTE_DIR / f"{name}.json"
+
+
+@lru_cache(maxsize=32)
+def _build_lut(colors: tuple):
+    """LUTを計算（同じ色の組み合わせでは再計算しない）"""
+    if np is None:
+        return None
+
+    levels = 1 << LUT_BITS
+    step = 256 // levels
+    centers = np.arange(levels, dtype=np.float32) * step + (step - 1) / 2
+    r, g, b = np.meshgrid(centers, centers, centers, indexing="ij")
+    cube = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+
+    palette = np.asarray(colors, dtype=np.float32)
+    distances = ((cube[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+    return distances.argmin(axis=1).astype(np.uint8)
+
+
+def _keyed(img: Image.Image) -> Image.Image:
+    """
+    アルファのない画像（DALL-E の *_single.png）は背景を透明化した RGBA にする
+
+    ピクセルアート化（convert_dalle_to_pixelart.pixelize()）と同じ判定で背景を抜き、
+    背景色がパレットの1色を占めないようにする。
+    """
+    if img.mode == "RGBA":
+        return img
+    from convert_dalle_to_pixelart import alpha_key  # 循環インポートを避ける
+    keyed = img.convert("RGBA")
+    keyed.putalpha(alpha_key(img))
+    return keyed
+
+
+def _sample_pixels(images: Iterable[Image.Image], sample_size: int = SAMPLE_SIZE, seed: int = 0):
+    """各画像を縮小し、不透明な画素をまとめてサンプリング（N×3 の float32）"""
+    chunks = []
+    for img in images:
+        thumb = _keyed(img)
+        thumb.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BOX)
+        arr = np.asarray(thumb).reshape(-1, 4)
+        chunks.append(arr[arr[:, 3] > 128, :3])
+
+    pixels = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.uint8)
+    if len(pixels) > sample_size:
+        rng = np.random.default_rng(seed)
+        pixels = pixels[rng.choice(len(pixels), sample_size, replace=False)]
+    return pixels.astype(np.float32)
+
+
+def median_cut(pixels, num_colors: int):
+    """
+    median-cut法でパレットを作成
+
+    Args:
+        pixels: N×3 の画素
+        num_colors: 色数
+
+    Returns:
+        num_colors×3 以下の色（float32）
+    """
+    boxes = [pixels]
+    while len(boxes) < num_colors:
+        ranges = [np.ptp(box, axis=0).max() if len(box) > 1 else -1 for box in boxes]
+        index = int(np.argmax(ranges))
+        if ranges[index] <= 0:
+            break
+
+        box = boxes[index]
+        channel = int(np.ptp(box, axis=0).argmax())
+        order = np.argsort(box[:, channel], kind="stable")
+        middle = len(box) // 2
+        boxes[index:index + 1] = [box[order[:middle]], box[order[middle:]]]
+
+    return np.stack([box.mean(axis=0) for box in boxes])
+
+
+def kmeans(pixels, centers, iterations: int = KMEANS_ITERATIONS):
+    """
+    k-means法でパレットを改善（初期値は median_cut の結果）
+
+    Args:
+        pixels: N×3 の画素
+        centers: 初期パレット（K×3）
+        iterations: 最大反復回数
+
+    Returns:
+        K×3 の色（float32）
+    """
+    centers = centers.astype(np.float32).copy()
+    for _ in range(iterations):
+        distances = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack(
+            [np.bincount(labels, weights=pixels[:, c], minlength=len(centers)) for c in range(3)],
+            axis=1,
+        )
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+
+        if np.abs(updated - centers).max() < 0.5:
+            centers = updated
+            break
+        centers = updated
+
+    return centers
+
+
+def build_palette(
+    images: Iterable[Image.Image],
+    num_colors: int = 16,
+    method: str = "kmeans",
+    name: Optional[str] = None
+) -> Palette:
+    """
+    複数画像の共通パレットを作成
+
+    Args:
+        images: 入力画像
+        num_colors: 色数
+        method: "kmeans"（median-cutを初期値に改善）または "mediancut"
+        name: パレット名
+
+    Returns:
+        Palette
+    """
+    images = list(images)
+    if not images:
+        raise ValueError("No images to build a palette from")
+
+    if np is None:
+        # 縮小画像の不透明な画素を1行に並べ、Pillowのmedian-cutで減色
+        opaque = bytearray()
+        for img in images:
+            thumb = _keyed(img)
+            thumb.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BOX)
+            data = thumb.tobytes()
+            for i in range(0, len(data), 4):
+                if data[i + 3] > 128:
+                    opaque += data[i:i + 3]
+        if not opaque:
+            raise ValueError("Images have no opaque pixels")
+        mosaic = Image.frombytes("RGB", (len(opaque) // 3, 1), bytes(opaque))
+        quantized = mosaic.quantize(colors=num_colors, method=Image.Quantize.MEDIANCUT)
+        flat = quantized.getpalette()[:3 * num_colors]
+        colors = [tuple(flat[i:i + 3]) for i in range(0, len(flat), 3)]
+        return Palette(colors, name, "mediancut")
+
+    pixels = _sample_pixels(images)
+    if len(pixels) == 0:
+        raise ValueError("Images have no opaque pixels")
+
+    centers = median_cut(pixels, num_colors)
+    if method == "kmeans":
+        centers = kmeans(pixels, centers)
+    elif method != "mediancut":
+        raise ValueError(f"Unknown palette method: {method}")
+
+    colors = np.clip(np.rint(centers), 0, 255).astype(np.uint8)
+    # 明るさ順に並べる（差分が安定するように）
+    order = np.argsort(colors.astype(np.int32) @ np.array([299, 587, 114]), kind="stable")
+    return Palette([tuple(c) for c in colors[order]], name, method)
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Build and inspect shared color palettes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Build a palette from images")
+    build_parser.add_argument("name", help="Palette name")
+    build_parser.add_argument("inputs", nargs="+", help="Image files or glob patterns")
+    build_parser.add_argument("--colors", type=int, default=16, help="Number of colors (default: 16)")
+    build_parser.add_argument("--method", choices=["kmeans", "mediancut"], default="kmeans",
+                              help="Palette algorithm (default: kmeans)")
+    build_parser.add_argument("--output", help="Output path (default: config/palettes/<name>.json)")
+    build_parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+
+    show_parser = subparsers.add_parser("show", help="Print a palette")
+    show_parser.add_argument("path", help="Palette JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "show":
+        palette = Palette.load(Path(args.path))
+        print(f"🎨 {palette.name or args.path}: {len(palette)} colors ({palette.method})")
+        for color in palette.colors:
+            print("   #%02x%02x%02x" % color)
+        return
+
+    paths = []
+    for pattern in args.inputs:
+        matched = sorted(glob.glob(pattern, recursive=True))
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(matched)
+
+    if not paths:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    images = [Image.open(path) for path in dict.fromkeys(paths)]
+    try:
+        palette = build_palette(images, args.colors, args.method, args.name)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    output = Path(args.output) if args.output else palette_path(args.name, Path(args.base_dir))
+    palette.save(output, sources=[Path(p).name for p in dict.fromkeys(paths)])
+    print(f"✅ Palette created: {output} ({len(palette)} colors from {len(images)} image(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+パレットスワップによる敵バリエーションの量産
+
+生成済みのスプライトシート（DALL-E出力をピクセル化したもの、
+assets/characters/enemies の pipo-charachip など）を読み込み、
+色の置き換えルールを適用して色違いのバリエーションを作ります。
+新しい画像生成は不要です。
+
+シートの色を一度だけ一意化して「色番号 → 色」の表にしておき、
+各バリエーションは表の色（数十〜数百色）だけを変換して画素へ引き直すため、
+1シートから多数のバリエーションを高速に作れます。シートごとに
+プロセスプールで並列に処理し、まとめて1枚のアトラスにもできます
+（Godotで色違いの敵を混在させても1回の描画にまとめられる）。
+
+ルール（config/variants/<name>.json の "variants"）:
+    {"name": "elite", "hue": 150, "saturation": 1.2, "value": 0.9}  色相回転（度）・彩度・明度の倍率
+    {"name": "gold", "map": {"#3fae3f": "#d4a017"}}                  色の直接置き換え（完全一致）
+    {"name": "boss", "palette": "bosses"}                             共通パレット（palette.py）の最近傍色へ
+    （"hue" と "map" などは組み合わせ可能。"map" が先に適用される）
+
+使用例:
+    # ルールファイルで全敵のバリエーションを作成し、アトラスにまとめる
+    python3 palette_swap.py "assets/characters/enemies/*_4f.png" --rules enemies \\
+        --output-dir assets/characters/enemies/variants \\
+        --atlas assets/characters/enemies/variants/enemies_variants_atlas
+
+    # 色相回転だけをその場で指定（pipo-charachip は 32x32 のグリッド）
+    python3 palette_swap.py assets/characters/enemies/pipo-charachip019.png \\
+        --hue red=-120 --hue blue=100 --output-dir build/variants --atlas build/variants/atlas --frame-size 32x32
+
+出力:
+    <output-dir>/<name>_<variant>_<W>x<H>_<N>f.png（フレーム指定のないファイルは <stem>_<variant>.png）
+
+必要なライブラリ:
+    pip install Pillow numpy
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import colorsys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pillowのみの処理にフォールバック
+
+from palette import load_palette, palette_path
+from godot_resources import FRAME_SPEC_PATTERN
+from pack_atlas import load_frames, pack_frames, write_atlas
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+VARIANT_DIR = Path("config") / "variants"
+
+
+def rules_path(name: str, base_dir: Path = BASE_DIR) -> Path:
+    """ルール名から config/variants/<name>.json のパスを返す"""
+    return Path(base_dir) / VARIANT_DIR / f"{name}.json"
+
+
+def load_rules(spec: str, base_dir: Path = BASE_DIR) -> List[Dict[str, Any]]:
+    """
+    ルールファイルを読み込む
+
+    Args:
+        spec: JSONファイルのパス、またはルール名（config/variants/<name>.json）
+        base_dir: プロジェクトルート
+
+    Returns:
+        バリエーションのルールのリスト
+    """
+    path = Path(spec) if spec.endswith(".json") else rules_path(spec, base_dir)
+    with open(path) as f:
+        data = json.load(f)
+
+    rules = data.get("variants", [])
+    for rule in rules:
+        if "name" not in rule:
+            raise ValueError(f"{path}: every variant needs a 'name'")
+    return rules
+
+
+def _parse_hex(color: str) -> Tuple[int, int, int]:
+    color = color.lstrip("#")
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+def _shift_hsv(colors, hue: float, saturation: float, value: float):
+    """(k, 3) の色配列の色相・彩度・明度を変える"""
+    if np is None:
+        shifted = []
+        for r, g, b in colors:
+            h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+            r, g, b = colorsys.hsv_to_rgb((h + hue / 360) % 1.0, min(1.0, s * saturation), min(1.0, v * value))
+            shifted.append((round(r * 255), round(g * 255), round(b * 255)))
+        return shifted
+
+    rgb = np.asarray(colors, dtype=np.float32) / 255
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    delta = maxc - minc
+    safe = np.where(delta > 0, delta, 1)
+
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    h = np.where(maxc == r, (g - b) / safe,
+                 np.where(maxc == g, 2 + (b - r) / safe, 4 + (r - g) / safe)) / 6
+    h = np.where(delta > 0, h, 0)
+    s = np.where(maxc > 0, delta / np.where(maxc > 0, maxc, 1), 0)
+
+    h = (h + hue / 360) % 1.0
+    s = np.clip(s * saturation, 0, 1)
+    v = np.clip(maxc * value, 0, 1)
+
+    i = np.floor(h * 6).astype(np.int32) % 6
+    f = h * 6 - np.floor(h * 6)
+    p, q, t = v * (1 - s), v * (1 - s * f), v * (1 - s * (1 - f))
+    choices = [
+        np.stack(channels, axis=1)
+        for channels in ((v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q))
+    ]
+    out = np.choose(i[:, None], choices)
+    return np.rint(out * 255).astype(np.uint8)
+
+
+def remap_colors(colors, rule: Dict[str, Any], base_dir: Path = BASE_DIR):
+    """
+    ルールに従って色の表を変換
+
+    Args:
+        colors: (k, 3) の色（NumPy配列、NumPyが無い場合はタプルのリスト）
+        rule: バリエーションのルール
+        base_dir: パレット名の解決に使うプロジェクトルート
+
+    Returns:
+        変換後の色（入力と同じ形式）
+    """
+    if "map" in rule:
+        mapping = {_parse_hex(src): _parse_hex(dst) for src, dst in rule["map"].items()}
+        if np is None:
+            colors = [mapping.get(tuple(color), tuple(color)) for color in colors]
+        else:
+            colors = np.array(colors, dtype=np.uint8)
+            for src, dst in mapping.items():
+                colors[(colors == src).all(axis=1)] = dst
+
+    if any(key in rule for key in ("hue", "saturation", "value")):
+        colors = _shift_hsv(colors, rule.get("hue", 0), rule.get("saturation", 1.0), rule.get("value", 1.0))
+
+    if "palette" in rule:
+        name = rule["palette"]
+        path = Path(name) if name.endswith(".json") else palette_path(name, base_dir)
+        strip = Image.new("RGB", (len(colors), 1))
+        strip.putdata([tuple(int(c) for c in color) for color in colors])
+        mapped = list(load_palette(str(path)).apply(strip).convert("RGB").getdata())
+        colors = np.asarray(mapped, dtype=np.uint8) if np is not None else mapped
+
+    return colors
+
+
+class ColorTable:
+    """シートの色を一意化した表（バリエーションは表の色だけを変換して引き直す）"""
+
+    def __init__(self, img: Image.Image):
+        """
+        初期化
+
+        Args:
+            img: 元のスプライトシート
+        """
+        self.rgba = img.convert("RGBA")
+
+        if np is not None:
+            arr = np.asarray(self.rgba)
+            packed = (arr[..., 0].astype(np.uint32) << 16) | (arr[..., 1].astype(np.uint32) << 8) | arr[..., 2]
+            unique, self.index = np.unique(packed.ravel(), return_inverse=True)
+            self.colors = np.stack([(unique >> 16) & 0xFF, (unique >> 8) & 0xFF, unique & 0xFF], axis=1).astype(np.uint8)
+            self.alpha = arr[..., 3]
+        else:
+            pixels = list(self.rgba.convert("RGB").getdata())
+            self.colors = list(dict.fromkeys(pixels))
+            lookup = {color: i for i, color in enumerate(self.colors)}
+            self.index = [lookup[pixel] for pixel in pixels]
+            self.alpha = self.rgba.getchannel("A")
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def render(self, colors) -> Image.Image:
+        """変換後の色の表から画像を作る（アルファは元のまま）"""
+        if np is not None:
+            height, width = self.alpha.shape
+            out = np.empty((height, width, 4), dtype=np.uint8)
+            out[..., :3] = np.asarray(colors, dtype=np.uint8)[self.index].reshape(height, width, 3)
+            out[..., 3] = self.alpha
+            return Image.fromarray(out, "RGBA")
+
+        img = Image.new("RGB", self.rgba.size)
+        img.putdata([tuple(colors[i]) for i in self.index])
+        img.putalpha(self.alpha)
+        return img
+
+
+def make_variants(img: Image.Image, rules: List[Dict[str, Any]], base_dir: Path = BASE_DIR) -> Dict[str, Image.Image]:
+    """
+    1枚のシートから全バリエーションを作る
+
+    Args:
+        img: 元のスプライトシート
+        rules: バリエーションのルール
+        base_dir: プロジェクトルート
+
+    Returns:
+        {バリエーション名: 画像}
+    """
+    table = ColorTable(img)
+    return {rule["name"]: table.render(remap_colors(table.colors, rule, base_dir)) for rule in rules}
+
+
+def variant_path(path: Path, variant: str, output_dir: Optional[Path] = None) -> Path:
+    """
+    バリエーションの出力パス（フレーム指定 `_<W>x<H>_<N>f` はファイル名の末尾に残す）
+
+    例: basic_enemy_idle_32x32_4f.png + elite -> basic_enemy_idle_elite_32x32_4f.png
+    """
+    path = Path(path)
+    stem = path.stem
+    match = FRAME_SPEC_PATTERN.search(stem)
+    if match:
+        name = f"{stem[:match.start()]}_{variant}{stem[match.start():]}"
+    else:
+        name = f"{stem}_{variant}"
+    return (output_dir or path.parent) / f"{name}.png"
+
+
+def _variant_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """ワーカープロセスで1シート分のバリエーションを作成"""
+    started = time.perf_counter()
+
+    with Image.open(job["input"]) as img:
+        img.load()
+        variants = make_variants(img, job["rules"], Path(job["base_dir"]))
+
+    outputs = []
+    for name, variant in variants.items():
+        output = variant_path(job["input"], name, Path(job["output_dir"]) if job["output_dir"] else None)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output.with_name(output.name + ".tmp")
+        variant.save(tmp_path, "PNG", optimize=True)
+        os.replace(tmp_path, output)
+        outputs.append(str(output))
+
+    return {"seconds": time.perf_counter() - started, "outputs": outputs}
+
+
+def hue_rule(spec: str) -> Dict[str, Any]:
+    """--hue NAME=DEGREES を解釈"""
+    try:
+        name, degrees = spec.split("=", 1)
+        return {"name": name, "hue": float(degrees)}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid --hue: {spec} (expected NAME=DEGREES)")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Mass-produce recolored sprite variants by palette swapping")
+    parser.add_argument("inputs", nargs="+", help="Sprite sheet files or glob patterns")
+    parser.add_argument("--rules", help="Variant rules: JSON file or name under config/variants/")
+    parser.add_argument("--hue", type=hue_rule, action="append", default=[], metavar="NAME=DEGREES",
+                        help="Add a hue-rotation variant (repeatable)")
+    parser.add_argument("--output-dir", help="Output directory (default: next to each input)")
+    parser.add_argument("--atlas", help="Also pack all variants into one atlas (output path without extension)")
+    parser.add_argument("--frame-size", help="Atlas grid cell size WxH (default: from file name)")
+    parser.add_argument("--max-size", type=int, default=2048, help="Maximum atlas side (default: 2048)")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    try:
+        rules = (load_rules(args.rules, Path(args.base_dir)) if args.rules else []) + args.hue
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading rules: {e}")
+        sys.exit(1)
+
+    if not rules:
+        print("❌ Error: No variants given (use --rules or --hue)")
+        sys.exit(1)
+
+    paths = []
+    for pattern in args.inputs:
+        matched = sorted(glob.glob(pattern, recursive=True))
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(matched)
+    paths = list(dict.fromkeys(paths))
+
+    if not paths:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    jobs = [
+        {"input": path, "rules": rules, "output_dir": args.output_dir, "base_dir": args.base_dir}
+        for path in paths
+    ]
+    workers = args.jobs or os.cpu_count()
+    print(f"🎨 {len(paths)} sheet(s) x {len(rules)} variant(s) with {workers} worker(s)...")
+
+    started = time.perf_counter()
+    outputs = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_variant_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  ❌ {job['input']}: {e}")
+                failed += 1
+                continue
+
+            outputs.extend(result["outputs"])
+            print(f"  ✅ {Path(job['input']).name}: {len(result['outputs'])} variant(s) "
+                  f"({result['seconds'] * 1000:.0f} ms)")
+
+    elapsed = time.perf_counter() - started
+    print()
+    print(f"📊 {len(outputs)} variant(s) in {elapsed:.2f}s"
+          + (f" ({len(outputs) / elapsed:.1f} variants/s)" if elapsed > 0 else ""))
+
+    if args.atlas and outputs:
+        frame_size = tuple(int(v) for v in args.frame_size.lower().split("x")) if args.frame_size else None
+        frames = [frame for output in sorted(outputs) for frame in load_frames(output, frame_size)]
+        try:
+            atlases, frame_map = pack_frames(frames, args.max_size)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+
+        written = write_atlas(atlases, frame_map, args.atlas)
+        print(f"🗺️  Atlas: {', '.join(str(p) for p in written)} ({len(frames)} frames)")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
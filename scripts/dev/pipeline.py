@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+メモリ上で処理をつなぐアセットパイプライン
+
+生成 → ピクセルアート化 → スプライトシート → アトラス の各ステージを
+Pillow画像のストリーム（SpriteItemのイテレータ）として連結します。
+中間ファイル（*_single.png の再読み込みなど）を経由せず、PNGのエンコードは
+最終成果物に対してのみ行います。--debug-dir を指定すると各ステージの
+中間画像も書き出します。
+
+使用例:
+    # 既存の *_single.png からスプライトシートを作成（ファイル読み込みは1回のみ）
+    python3 pipeline.py basic_enemy fast_enemy
+
+    # DALL-E で生成（b64_json）してそのままシート化し、アトラスにまとめる
+    python3 pipeline.py basic_enemy strong_enemy fast_enemy heavy_enemy \\
+        --generate --atlas assets/characters/enemies/enemies_atlas
+
+    # 中間画像を確認
+    python3 pipeline.py player_idle --debug-dir /tmp/pipeline-debug
+
+    # シートと一緒にコリジョン形状（<name>_collision.tres）も書き出す
+    python3 pipeline.py basic_enemy fast_enemy --collision auto
+
+    # 処理済みの画像とほぼ同一ならシートを作り直さず再利用（image_index.py）
+    python3 pipeline.py --generate basic_enemy --dedupe
+
+Python から:
+    from pipeline import from_assets, pixelize, tile, save, run
+    items = run(from_assets(["basic_enemy"]), pixelize(), tile(), save())
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any, Callable, Iterable, Iterator
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+from collision_shapes import collision_path, sheet_frames, sheet_shapes
+from convert_dalle_to_pixelart import pixelize as pixelize_image, binarize_alpha
+from godot_resources import parse_frame_spec, write_shape, write_texture_import
+from image_index import DEFAULT_DISTANCE, ImageIndex
+from animate_frames import fit_frame, motion_for, synthesize_sheet
+from pack_atlas import split_frames, pack_frames, write_atlas
+from palette import palette_path
+from png_optimize import save_png
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+
+class SpriteItem:
+    """パイプラインを流れる1アセット分のデータ"""
+
+    def __init__(self, name: str, image: Image.Image, config: Optional[Dict[str, Any]] = None):
+        """
+        初期化
+
+        Args:
+            name: アセット名
+            image: 現在の画像（ステージごとに置き換わる）
+            config: アセット設定（PROMPTS の値。output/final_output/frames など）
+        """
+        self.name = name
+        self.image = image
+        self.config = config or {}
+        self.timings: Dict[str, float] = {}
+        self.collision: Optional[Dict[str, Any]] = None
+        self.reused: Optional[Tuple[Path, int]] = None
+
+    @property
+    def num_frames(self) -> int:
+        """フレーム数"""
+        return max(1, self.config.get("frames", 1))
+
+    @property
+    def target_size(self) -> Optional[int]:
+        """フレームの高さ（final_output のファイル名から判定）"""
+        spec = parse_frame_spec(self.config.get("final_output") or "")
+        return spec[1] if spec else None
+
+
+Stage = Callable[[Iterable[SpriteItem]], Iterator[SpriteItem]]
+
+
+def _timed(label: str, item: SpriteItem, func: Callable[[Image.Image], Image.Image]) -> SpriteItem:
+    """ステージ処理を実行し、所要時間を記録"""
+    started = time.perf_counter()
+    item.image = func(item.image)
+    item.timings[label] = item.timings.get(label, 0.0) + time.perf_counter() - started
+    return item
+
+
+# ---------------------------------------------------------------------------
+# ソース
+# ---------------------------------------------------------------------------
+
+def from_assets(asset_names: Iterable[str], base_dir: Path = BASE_DIR) -> Iterator[SpriteItem]:
+    """
+    既存の単一フレーム画像（PROMPTS の output）を読み込む
+
+    Args:
+        asset_names: アセット名
+        base_dir: プロジェクトルート
+
+    Yields:
+        SpriteItem
+    """
+    from generate_asset_with_dalle import PROMPTS
+
+    for asset_name in asset_names:
+        config = PROMPTS[asset_name]
+        started = time.perf_counter()
+        image = Image.open(Path(base_dir) / config["output"])
+        image.load()
+
+        item = SpriteItem(asset_name, image, config)
+        item.timings["load"] = time.perf_counter() - started
+        yield item
+
+
+def from_generator(
+    generator,
+    asset_names: Iterable[str],
+    force: bool = False,
+    keep_single: bool = False,
+    max_workers: int = 1
+) -> Iterator[SpriteItem]:
+    """
+    DALL-E でアセットを生成し、メモリ上の画像として流す
+
+    generator.response_format が "b64_json" の場合はディスクを経由しない。
+    生成に失敗したアセットは警告を出して飛ばす。
+
+    Args:
+        generator: DALLEAssetGenerator
+        asset_names: アセット名
+        force: キャッシュを無視して再生成するか
+        keep_single: *_single.png も保存するか
+        max_workers: 同時に生成するアセット数
+
+    Yields:
+        SpriteItem（入力順）
+    """
+    from generate_asset_with_dalle import PROMPTS
+
+    def generate(asset_name: str):
+        started = time.perf_counter()
+        return generator.generate_frame(asset_name, force, keep_single), time.perf_counter() - started
+
+    asset_names = list(asset_names)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for asset_name, (image, seconds) in zip(asset_names, executor.map(generate, asset_names)):
+            if image is None:
+                print(f"⚠️  {asset_name}: generation failed, skipped")
+                continue
+
+            item = SpriteItem(asset_name, image, PROMPTS[asset_name])
+            item.timings["generate"] = seconds
+            yield item
+
+
+# ---------------------------------------------------------------------------
+# ステージ
+# ---------------------------------------------------------------------------
+
+def pixelize(base_dir: Path = BASE_DIR, **params) -> Stage:
+    """
+    ピクセルアート化するステージ（1フレーム分の target_size 四方に縮小・減色）
+
+    シートにするには後ろに tile() をつなぐ（減色後に最近傍で変形するので色は増えない）。
+    target_size/palette を省略した場合はアセット設定から決める
+    （palette は base_dir/config/palettes/<name>.json が存在する場合のみ）。
+    その他の引数は convert_dalle_to_pixelart.pixelize() と同じ。
+    """
+    def stage(items: Iterable[SpriteItem]) -> Iterator[SpriteItem]:
+        for item in items:
+            item_params = {
+                "target_size": item.target_size or item.image.size[1],
+                "num_frames": 1,
+                "palette_colors": item.config.get("palette_colors", 16),
+                **params,
+            }
+            if "palette" not in params and item.config.get("palette"):
+                path = palette_path(item.config["palette"], base_dir)
+                if path.exists():
+                    item_params["palette"] = str(path)
+
+            yield _timed("pixelize", item, lambda img: pixelize_image(img, **item_params))
+
+    return stage
+
+
+def tile() -> Stage:
+    """
+    単一フレームからスプライトシートを合成するステージ
+
+    フレームはアセット設定のモーション（animate_frames.motion_for()）で合成する。
+    フレームが final_output の名前のサイズと異なる場合（--mode sheet で
+    元画像をそのまま渡した場合など）は、先にそのサイズへ縮小する。
+    """
+    def stage(items: Iterable[SpriteItem]) -> Iterator[SpriteItem]:
+        for item in items:
+            motion = motion_for(item.config)
+            output = item.config.get("final_output") or ""
+            yield _timed("tile", item, lambda img: synthesize_sheet(fit_frame(img, output), motion, item.num_frames))
+
+    return stage
+
+
+def dump(directory: Path, label: str) -> Stage:
+    """中間画像を <directory>/<label>/<name>.png に書き出すデバッグ用ステージ"""
+    def stage(items: Iterable[SpriteItem]) -> Iterator[SpriteItem]:
+        output_dir = Path(directory) / label
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for item in items:
+            item.image.save(output_dir / f"{item.name}.png")
+            yield item
+
+    return stage
+
+
+def save(base_dir: Path = BASE_DIR, indexed: bool = False, png_search: bool = False,
+         godot_import: bool = True) -> Stage:
+    """
+    最終成果物（final_output）を書き出すステージ
+
+    一時ファイルに書いてから置き換える（途中で失敗しても壊れたPNGを残さない）。
+    indexed の場合はアルファを二値化し、256色以下の画像をパレットPNGにする
+    （png_optimize.save_png()）。
+    godot_import の場合は隣に .import も書く（godot_resources.write_texture_import()）。
+    """
+    def stage(items: Iterable[SpriteItem]) -> Iterator[SpriteItem]:
+        for item in items:
+            output_file = Path(base_dir) / item.config["final_output"]
+            started = time.perf_counter()
+
+            if indexed:
+                item.image = binarize_alpha(item.image.convert("RGBA"))
+                save_png(item.image, output_file, indexed=True, search=png_search)
+            else:
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = output_file.with_name(output_file.name + ".tmp")
+                item.image.save(tmp_file, "PNG")
+                tmp_file.replace(output_file)
+            if godot_import:
+                write_texture_import(output_file, base_dir)
+
+            item.timings["save"] = time.perf_counter() - started
+            yield item
+
+    return stage
+
+
+def collision(base_dir: Path = BASE_DIR, **params) -> Stage:
+    """
+    シートのアルファからコリジョン形状を求め、<name>_collision.tres を書き出すステージ
+
+    形状は全フレームの和集合に当てはめる（collision_shapes.sheet_shapes()）。
+    結果は item.config ではなく item.collision に入れる。
+
+    Args:
+        base_dir: プロジェクトルート
+        **params: sheet_shapes() の引数（shape, max_vertices, scale など）
+    """
+    def stage(items: Iterable[SpriteItem]) -> Iterator[SpriteItem]:
+        for item in items:
+            started = time.perf_counter()
+            final_output = item.config.get("final_output") or f"{item.name}.png"
+            frames = sheet_frames(item.image, Path(final_output).stem, item.num_frames)
+            item.collision, _ = sheet_shapes(frames, **params)
+            if item.collision is not None:
+                write_shape(collision_path(Path(final_output)), item.collision, base_dir)
+            item.timings["collision"] = time.perf_counter() - started
+            yield item
+
+    return stage
+
+
+def processing_key(item: SpriteItem, variant: str, base_dir: Path = BASE_DIR) -> str:
+    """
+    成果物を再利用してよいかを決めるキー（処理の種類とアセット設定のうち出力に効くもの）
+
+    共通パレットは内容のハッシュを含める（パレットを作り直したら再利用しない）。
+    """
+    palette = None
+    if item.config.get("palette"):
+        path = palette_path(item.config["palette"], base_dir)
+        if path.exists():
+            palette = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    payload = json.dumps({
+        "variant": variant,
+        "target_size": item.target_size,
+        "num_frames": item.num_frames,
+        "palette_colors": item.config.get("palette_colors", 16),
+        "palette": palette,
+        "motion": motion_for(item.config),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def dedupe(
+    index: ImageIndex,
+    *stages: Stage,
+    variant: str = "",
+    base_dir: Path = BASE_DIR,
+    max_distance: int = DEFAULT_DISTANCE,
+    godot_import: bool = True
+) -> Stage:
+    """
+    ほぼ同一の画像を処理済みなら stages を飛ばし、その成果物を再利用するステージ
+
+    画像を知覚ハッシュの索引（image_index.ImageIndex）に登録し、pHash/dHash の
+    距離が max_distance 以内の画像から同じキー（processing_key()）で作った
+    成果物が残っていれば、それを final_output に置く（同じファイルなら触れない）。
+    それ以外は stages に流し、書き出された final_output を索引に記録する。
+    stages は final_output を書き出すもの（save() を含む）を渡す。
+
+    Args:
+        index: 知覚ハッシュの索引
+        stages: 重複でない場合に実行するステージ
+        variant: 処理の種類（モード・保存形式など、キーに含める）
+        base_dir: プロジェクトルート
+        max_distance: 同一とみなすハミング距離
+        godot_import: 成果物を別の場所へ置いた場合に .import も書くか
+    """
+    def stage(items: Iterable[SpriteItem]) -> Iterator[SpriteItem]:
+        try:
+            for item in items:
+                started = time.perf_counter()
+                output_file = Path(base_dir) / item.config["final_output"]
+                image_id = index.add(item.image, source=item.config.get("output"), asset=item.name)
+                key = processing_key(item, variant, base_dir)
+                found = index.reusable_output(image_id, key, max_distance)
+                item.timings["dedupe"] = time.perf_counter() - started
+
+                if found is None:
+                    for processed in run(iter([item]), *stages):
+                        if output_file.exists():
+                            index.record_output(image_id, key, output_file)
+                        yield processed
+                    continue
+
+                path, distance = found
+                if path.resolve() != output_file.resolve():
+                    output_file.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_file = output_file.with_name(output_file.name + ".tmp")
+                    shutil.copyfile(path, tmp_file)
+                    os.replace(tmp_file, output_file)
+                    if godot_import:
+                        write_texture_import(output_file, base_dir)
+                index.record_output(image_id, key, output_file)
+
+                with Image.open(output_file) as img:
+                    item.image = img.convert("RGBA")
+                item.reused = (path, distance)
+                yield item
+        finally:
+            index.save()
+
+    return stage
+
+
+def run(source: Iterable[SpriteItem], *stages: Stage) -> List[SpriteItem]:
+    """
+    ソースにステージを順に連結して最後まで流す
+
+    Args:
+        source: SpriteItem のイテレータ
+        stages: ステージ（Iterator[SpriteItem] -> Iterator[SpriteItem]）
+
+    Returns:
+        処理済みの SpriteItem のリスト
+    """
+    stream: Iterable[SpriteItem] = source
+    for stage in stages:
+        stream = stage(stream)
+    return list(stream)
+
+
+def pack(
+    items: Iterable[SpriteItem],
+    output: Path,
+    max_size: int = 2048,
+    padding: int = 1,
+    trim: bool = True
+) -> List[Path]:
+    """
+    スプライトシートのフレームをアトラスにまとめて書き出す（終端ステージ）
+
+    フレームはメモリ上のシートから切り出し、final_output の名前で登録する。
+
+    Returns:
+        保存したアトラス画像のパス
+    """
+    frames = []
+    for item in items:
+        stem = Path(item.config.get("final_output") or item.name).stem
+        frame_size = (item.image.size[0] // item.num_frames, item.image.size[1])
+        frames.extend(split_frames(item.image, stem, frame_size))
+
+    atlases, frame_map = pack_frames(frames, max_size, padding, trim)
+    return write_atlas(atlases, frame_map, str(output))
+
+
+def main():
+    """メイン関数"""
+    from generate_asset_with_dalle import PROMPTS
+
+    parser = argparse.ArgumentParser(description="Run the asset pipeline in memory (generate -> pixelize -> sheet -> atlas)")
+    parser.add_argument("assets", nargs="*", help="Asset names (default: all animated assets)")
+    parser.add_argument("--generate", action="store_true", help="Generate with DALL-E (b64_json) instead of reading *_single.png")
+    parser.add_argument("--force", action="store_true", help="With --generate, ignore the generation cache")
+    parser.add_argument("--keep-single", action="store_true", help="With --generate, also write *_single.png")
+    parser.add_argument("--concurrency", type=int, default=1, help="With --generate, assets generated in parallel (default: 1)")
+    parser.add_argument("--mode", choices=["pixelart", "sheet"], default="pixelart",
+                        help="pixelart: downscale + quantize one frame, then synthesize the motion frames; "
+                             "sheet: synthesize the motion frames only (default: pixelart)")
+    parser.add_argument("--atlas", help="Also pack all sheets into an atlas (output path without extension)")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the individual sprite sheets")
+    parser.add_argument("--indexed", action="store_true", help="Write sheets as palette PNGs when they have <= 256 colors")
+    parser.add_argument("--no-import", action="store_true", help="Do not write Godot .import files next to the outputs")
+    parser.add_argument("--collision", choices=["auto", "circle", "capsule", "convex"],
+                        help="Also write <name>_collision.tres fitted to the sheet's alpha")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Reuse existing sheets for images near-identical to ones already processed (see image_index.py)")
+    parser.add_argument("--dedupe-distance", type=int, default=DEFAULT_DISTANCE,
+                        help=f"Maximum pHash/dHash Hamming distance treated as identical (default: {DEFAULT_DISTANCE})")
+    parser.add_argument("--debug-dir", help="Dump intermediate images of every stage here")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    asset_names = args.assets or [
+        name for name, config in PROMPTS.items() if config["frames"] > 0 and config["final_output"]
+    ]
+
+    unknown = [name for name in asset_names if name not in PROMPTS]
+    if unknown:
+        print(f"❌ Error: Unknown asset(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    if args.generate:
+        from generate_asset_with_dalle import DALLEAssetGenerator
+        from generation_cache import GenerationCache
+
+        try:
+            generator = DALLEAssetGenerator(
+                base_dir=str(base_dir),
+                cache=GenerationCache(base_dir / ".cache" / "dalle"),
+                response_format="b64_json"
+            )
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        source = from_generator(generator, asset_names, args.force, args.keep_single, args.concurrency)
+    else:
+        missing = [name for name in asset_names if not (base_dir / PROMPTS[name]["output"]).exists()]
+        if missing:
+            print(f"⚠️  Skipping assets without a single frame: {', '.join(missing)}")
+        source = from_assets([name for name in asset_names if name not in missing], base_dir)
+
+    if args.dedupe and args.no_save:
+        print("❌ Error: --dedupe reuses saved sheets and cannot be combined with --no-save")
+        sys.exit(1)
+
+    stages: List[Stage] = []
+    if args.debug_dir:
+        stages.append(dump(Path(args.debug_dir), "0_source"))
+    if args.mode == "pixelart":
+        stages.append(pixelize(base_dir))
+        if args.debug_dir:
+            stages.append(dump(Path(args.debug_dir), "1_pixelart"))
+    stages.append(tile())
+    if args.debug_dir:
+        stages.append(dump(Path(args.debug_dir), "2_sheet"))
+    if not args.no_save:
+        stages.append(save(base_dir, indexed=args.indexed, godot_import=not args.no_import))
+    if args.dedupe:
+        stages = [dedupe(
+            ImageIndex(base_dir), *stages,
+            variant=f"{args.mode}:indexed={args.indexed}",
+            base_dir=base_dir,
+            max_distance=args.dedupe_distance,
+            godot_import=not args.no_import,
+        )]
+    if args.collision:
+        stages.append(collision(base_dir, shape=args.collision))
+
+    started = time.perf_counter()
+    items = run(source, *stages)
+
+    for item in items:
+        timings = ", ".join(f"{label} {seconds * 1000:.0f} ms" for label, seconds in item.timings.items())
+        if item.reused:
+            path, distance = item.reused
+            print(f"♻️  {item.name}: {item.config['final_output']} reused from {path.relative_to(base_dir)} "
+                  f"(distance {distance}, {timings})")
+        else:
+            print(f"✅ {item.name}: {item.config['final_output']} ({timings})")
+
+    if args.atlas and items:
+        written = pack(items, base_dir / args.atlas)
+        if not args.no_import:
+            for path in written:
+                write_texture_import(path, base_dir)
+        print(f"✅ Atlas created: {', '.join(str(p) for p in written)}")
+
+    print()
+    print(f"📊 Processed {len(items)}/{len(asset_names)} asset(s) in {time.perf_counter() - started:.2f}s")
+
+    if len(items) < len(asset_names):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+PNGの軽量化（パレット化・メタデータ除去・圧縮パラメータ探索）
+
+減色済みのスプライトをRGBAのまま保存すると1画素4バイトになり、
+リポジトリの肥大化やGodotの再インポート・読み込みの遅さにつながります。
+このスクリプトは、画素を変えずに（ロスレスで）以下を行います。
+
+    - 256色以下の画像をパレット（Pモード）+ tRNS透過に変換
+      （16色以下なら4bit、4色以下なら2bitに詰める）
+    - テキスト・ICCプロファイル・EXIF等のメタデータを除去
+    - --search 指定時: PNGフィルタ（None/Sub/Up/Average/Paeth/適応）と
+      zlib戦略の全組み合わせを試して最小のものを採用
+
+変換後に画素が一致することを確認し、元より小さくなった場合のみ置き換えます。
+
+使用例:
+    # プレイヤーのスプライトシートを軽量化
+    python3 png_optimize.py assets/characters/player/*_4f.png
+
+    # 全スプライトを全コアで探索付き最適化
+    python3 png_optimize.py "assets/**/*.png" --search
+
+    # 書き換えずにサイズだけ確認
+    python3 png_optimize.py "assets/**/*.png" --search --dry-run
+
+必要なライブラリ:
+    pip install Pillow numpy
+"""
+
+import io
+import os
+import sys
+import glob
+import zlib
+import struct
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict, Any
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Pillowのエンコーダのみで処理
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 探索するzlib戦略
+ZLIB_STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+}
+FILTERS = ["none", "sub", "up", "average", "paeth", "adaptive"]
+
+
+def to_indexed(img: Image.Image) -> Optional[Image.Image]:
+    """
+    画像をロスレスにパレット画像（Pモード）へ変換
+
+    RGBAの組み合わせごとに1エントリを割り当て、アルファはtRNSで保持する。
+    完全に透明な画素は色に関係なく1エントリにまとめる。
+
+    Args:
+        img: 入力画像
+
+    Returns:
+        Pモード画像（info["transparency"] にエントリごとのアルファ）。
+        256色を超える場合はNone
+    """
+    rgba = img.convert("RGBA")
+
+    # 完全透明の画素は (0, 0, 0, 0) にそろえる
+    alpha = rgba.getchannel("A")
+    if alpha.getextrema()[0] == 0:
+        clear = Image.new("RGBA", rgba.size, (0, 0, 0, 0))
+        rgba = Image.composite(rgba, clear, alpha.point(lambda a: 255 if a else 0))
+
+    colors = rgba.getcolors(256)
+    if colors is None:
+        return None
+
+    # 透明なエントリを先頭に置く（tRNSを短くできる）
+    entries = sorted((color for _, color in colors), key=lambda c: (c[3] == 255, c))
+    index = {color: i for i, color in enumerate(entries)}
+
+    if np is not None:
+        arr = np.asarray(rgba).reshape(-1, 4)
+        keys = arr.view(np.uint32).ravel()
+        entry_keys = np.asarray(entries, dtype=np.uint8).view(np.uint32).ravel()
+        order = np.argsort(entry_keys)
+        positions = np.searchsorted(entry_keys[order], keys)
+        data = order[positions].astype(np.uint8).reshape(rgba.size[1], rgba.size[0])
+        indexed = Image.fromarray(data, "L").convert("P")
+    else:
+        indexed = Image.new("P", rgba.size)
+        indexed.putdata([index[pixel] for pixel in rgba.getdata()])
+
+    indexed.putpalette([c for color in entries for c in color[:3]])
+    transparency = bytes(color[3] for color in entries if color[3] < 255)
+    if transparency:
+        indexed.info["transparency"] = transparency
+    return indexed
+
+
+def _bit_depth(num_colors: int) -> int:
+    """パレット数に必要なビット深度"""
+    for bits in (1, 2, 4):
+        if num_colors <= 1 << bits:
+            return bits
+    return 8
+
+
+def _scanlines(img: Image.Image) -> Tuple[Any, int, int, int]:
+    """
+    フィルタ前のスキャンライン（高さ×行バイト数の配列）を作成
+
+    Returns:
+        (行データ, 1画素のバイト数（最低1）, ビット深度, PNGカラータイプ)
+    """
+    width, height = img.size
+
+    if img.mode == "P":
+        num_colors = len(img.getpalette()) // 3
+        bits = _bit_depth(num_colors)
+        arr = np.asarray(img, dtype=np.uint8)
+        if bits < 8:
+            per_byte = 8 // bits
+            padded_width = -(-width // per_byte) * per_byte
+            padded = np.zeros((height, padded_width), dtype=np.uint8)
+            padded[:, :width] = arr
+            groups = padded.reshape(height, -1, per_byte)
+            shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * bits
+            arr = (groups << shifts).sum(axis=2, dtype=np.uint16).astype(np.uint8)
+        return arr, 1, bits, 3
+
+    if img.mode == "RGBA":
+        return np.asarray(img, dtype=np.uint8).reshape(height, width * 4), 4, 8, 6
+    if img.mode == "RGB":
+        return np.asarray(img, dtype=np.uint8).reshape(height, width * 3), 3, 8, 2
+    if img.mode == "L":
+        return np.asarray(img, dtype=np.uint8), 1, 8, 0
+
+    raise ValueError(f"Unsupported mode for PNG search: {img.mode}")
+
+
+def _filtered(rows, bpp: int) -> Dict[str, Any]:
+    """5種類のPNGフィルタを全行に適用した結果（フィルタ番号を先頭列に付加済み）"""
+    x = rows.astype(np.int16)
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    upleft = np.zeros_like(x)
+    upleft[1:, bpp:] = x[:-1, :-bpp]
+
+    p = left + up - upleft
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upleft)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+
+    results = {
+        "none": x,
+        "sub": x - left,
+        "up": x - up,
+        "average": x - (left + up) // 2,
+        "paeth": x - paeth,
+    }
+    return {
+        name: np.concatenate(
+            [np.full((len(x), 1), code, dtype=np.uint8), (data & 0xFF).astype(np.uint8)], axis=1
+        )
+        for code, (name, data) in enumerate(results.items())
+    }
+
+
+def _adaptive(filtered: Dict[str, Any]):
+    """行ごとに「符号付き差分の絶対値和」が最小のフィルタを選ぶ（libpngと同じ指標）"""
+    stacked = np.stack([filtered[name] for name in FILTERS[:5]])
+    signed = stacked[:, :, 1:].astype(np.int8).astype(np.int16)
+    cost = np.abs(signed).sum(axis=2)
+    choice = cost.argmin(axis=0)
+    return stacked[choice, np.arange(stacked.shape[1])]
+
+
+def _transparency(img: Image.Image) -> Optional[bytes]:
+    """Pモード画像のtRNS（エントリごとのアルファ）"""
+    transparency = img.info.get("transparency")
+    if isinstance(transparency, int):
+        # 透明なエントリが1つだけの形式
+        return bytes(255 if i != transparency else 0 for i in range(transparency + 1))
+    return bytes(transparency) if transparency else None
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def _assemble(img: Image.Image, bits: int, color_type: int, idat: bytes) -> bytes:
+    """PNGファイルを組み立てる（IHDR/PLTE/tRNS/IDAT/IENDのみ）"""
+    width, height = img.size
+    parts = [PNG_SIGNATURE, _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bits, color_type, 0, 0, 0))]
+
+    if color_type == 3:
+        parts.append(_chunk(b"PLTE", bytes(img.getpalette())))
+        transparency = _transparency(img)
+        if transparency:
+            parts.append(_chunk(b"tRNS", transparency))
+
+    parts.append(_chunk(b"IDAT", idat))
+    parts.append(_chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+def _pillow_encode(img: Image.Image) -> bytes:
+    """Pillowでメタデータなしに保存"""
+    clean = img.copy()
+    clean.info = {}
+    options: Dict[str, Any] = {"optimize": True, "icc_profile": None}
+    if img.mode == "P" and _transparency(img):
+        options["transparency"] = _transparency(img)
+
+    buffer = io.BytesIO()
+    clean.save(buffer, "PNG", **options)
+    return buffer.getvalue()
+
+
+def encode_png(img: Image.Image, search: bool = False) -> Tuple[bytes, str]:
+    """
+    画像をメタデータなしのPNGにエンコード
+
+    Args:
+        img: 入力画像（P/RGBA/RGB/L）
+        search: フィルタとzlib戦略の全組み合わせを試すか（NumPyが必要）
+
+    Returns:
+        (PNGのバイト列, 採用した方式の説明)
+    """
+    best = _pillow_encode(img)
+    best_method = "pillow"
+
+    if not search or np is None or img.mode not in ("P", "RGBA", "RGB", "L"):
+        return best, best_method
+
+    rows, bpp, bits, color_type = _scanlines(img)
+    filtered = _filtered(rows, bpp)
+    filtered["adaptive"] = _adaptive(filtered)
+
+    for filter_name in FILTERS:
+        raw = filtered[filter_name].tobytes()
+        for strategy_name, strategy in ZLIB_STRATEGIES.items():
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+            idat = compressor.compress(raw) + compressor.flush()
+            if len(idat) + 64 >= len(best):
+                continue
+
+            data = _assemble(img, bits, color_type, idat)
+            if len(data) < len(best):
+                best, best_method = data, f"{filter_name}/{strategy_name}"
+
+    return best, best_method
+
+
+def _same_pixels(a: Image.Image, b: Image.Image) -> bool:
+    """RGBAとして画素が一致するか（完全透明な画素の色は無視）"""
+    a, b = a.convert("RGBA"), b.convert("RGBA")
+    if a.size != b.size:
+        return False
+
+    if np is not None:
+        x, y = np.asarray(a), np.asarray(b)
+        visible = (x[..., 3] > 0) | (y[..., 3] > 0)
+        return bool((x[..., 3] == y[..., 3]).all() and (x[visible] == y[visible]).all())
+
+    clear = Image.new("RGBA", a.size, (0, 0, 0, 0))
+    a = Image.composite(a, clear, a.getchannel("A").point(lambda v: 255 if v else 0))
+    b = Image.composite(b, clear, b.getchannel("A").point(lambda v: 255 if v else 0))
+    return a.tobytes() == b.tobytes()
+
+
+def optimize_image(img: Image.Image, indexed: bool = True, search: bool = False) -> Tuple[bytes, str]:
+    """
+    画像を最小のPNGにエンコード（ロスレス）
+
+    Args:
+        img: 入力画像
+        indexed: 256色以下ならパレット画像にするか
+        search: フィルタ・圧縮パラメータを探索するか
+
+    Returns:
+        (PNGのバイト列, 方式の説明)
+    """
+    if img.mode not in ("P", "RGBA", "RGB", "L", "LA"):
+        img = img.convert("RGBA")
+
+    if indexed and img.mode != "P":
+        converted = to_indexed(img)
+        if converted is not None:
+            data, method = encode_png(converted, search)
+            return data, f"indexed {len(converted.getpalette()) // 3}c, {method}"
+
+    return encode_png(img, search)
+
+
+def save_png(img: Image.Image, path: Path, indexed: bool = True, search: bool = False) -> int:
+    """
+    画像を最適化したPNGとして保存（一時ファイル経由で置き換え）
+
+    Returns:
+        書き込んだバイト数
+    """
+    data, _ = optimize_image(img, indexed, search)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def optimize_file(path: str, indexed: bool = True, search: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    PNGファイルを最適化（ワーカープロセスで実行）
+
+    画素が一致し、元より小さくなった場合のみ置き換える。
+
+    Returns:
+        {"path", "before", "after", "method", "written"}
+    """
+    path = Path(path)
+    original = path.read_bytes()
+
+    with Image.open(io.BytesIO(original)) as img:
+        img.load()
+        data, method = optimize_image(img, indexed, search)
+
+        with Image.open(io.BytesIO(data)) as result:
+            if not _same_pixels(img, result):
+                raise ValueError("Optimized image does not match the original pixels")
+
+    written = len(data) < len(original) and not dry_run
+    if written:
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    return {
+        "path": str(path),
+        "before": len(original),
+        "after": min(len(data), len(original)),
+        "method": method if len(data) < len(original) else "kept",
+        "written": written,
+    }
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Losslessly shrink PNGs (palette conversion, metadata stripping, compression search)")
+    parser.add_argument("inputs", nargs="+", help="PNG files or glob patterns")
+    parser.add_argument("--search", action="store_true", help="Try every PNG filter / zlib strategy combination")
+    parser.add_argument("--keep-rgba", action="store_true", help="Do not convert to palette images")
+    parser.add_argument("--dry-run", action="store_true", help="Report sizes without rewriting files")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    paths: List[str] = []
+    for pattern in args.inputs:
+        matched = sorted(glob.glob(pattern, recursive=True))
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(p for p in matched if p.lower().endswith(".png"))
+
+    if not paths:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    paths = list(dict.fromkeys(paths))
+    total_before = total_after = 0
+    failed = 0
+
+    with ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(optimize_file, path, not args.keep_rgba, args.search, args.dry_run)
+            for path in paths
+        ]
+        for path, future in zip(paths, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  ❌ {path}: {e}")
+                failed += 1
+                continue
+
+            total_before += result["before"]
+            total_after += result["after"]
+            saved = result["before"] - result["after"]
+            print(f"  {'✅' if saved else '⏭️ '} {path}: {result['before']:,} -> {result['after']:,} bytes "
+                  f"({-100 * saved / result['before']:+.1f}%, {result['method']})")
+
+    print()
+    print(f"📊 {len(paths) - failed} file(s): {total_before:,} -> {total_after:,} bytes "
+          f"({-100 * (total_before - total_after) / max(1, total_before):+.1f}%)"
+          f"{' (dry run)' if args.dry_run else ''}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+pipo-charachip 形式のキャラクターシートを切り出してアトラスに詰め直す
+
+assets/characters 以下の pipo-charachip018b/019/020、pipo-halloweenchara2016_*
+は、RPGツクール形式のグリッド（横に3フレーム、縦に 下・左・右・上 の4方向）です。
+ゲームで使う方向・フレームだけを切り出し、同一のセル（と --mirror 指定時は
+左右反転で一致するセル）をまとめ、透明な余白を除いて1枚のアトラスへ
+詰め直します。テクスチャメモリと、フレームごとのテクスチャ切り替えを減らします。
+
+フレーム名: <シート名>/<方向>/<フレーム番号>
+    （縦に複数キャラクターが並ぶシートは <シート名>/<ブロック番号>_<方向>/<フレーム番号>）
+
+使用例:
+    # 敵シートをまとめて1枚のアトラスに（上向きは使わない）
+    python3 repack_charachip.py "assets/characters/enemies/pipo-*.png" \\
+        --drop-directions up --output assets/characters/enemies/enemies_charachip_atlas
+
+    # 右向きを左向きの左右反転で代用し、SpriteFrames も書き出す
+    python3 repack_charachip.py assets/characters/player/pipo-charachip018b.png --mirror \\
+        --output assets/characters/player/player_atlas --sprite-frames-dir assets/characters/player
+
+    # ボス（96x96セル）
+    python3 repack_charachip.py assets/characters/bosses/pipo-charachip020.png --cell 96x96 \\
+        --output assets/characters/bosses/bosses_atlas
+
+アトラスは既定で使用範囲ぎりぎりのサイズ（2の累乗にしない。Godot 4 はそのまま扱える）。
+2の累乗に切り上げると元のシートより大きくなることがあるため、--power-of-two は必要な場合のみ。
+
+出力:
+    <output>.png / <output>.json（pack_atlas.py と同じ形式のフレームマップ。
+    反転で代用したフレームは "flip_h": true）
+    --sprite-frames-dir 指定時: <シート名>_frames.tres（方向ごとのアニメーション）
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import re
+import sys
+import glob
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+from godot_resources import write_sprite_frames
+from pack_atlas import pack_frames, write_atlas
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+DEFAULT_CELL = (32, 32)
+# 行の並び（この順で繰り返す）
+DIRECTIONS = ("down", "left", "right", "up")
+DEFAULT_FPS = 6.0
+
+
+def slice_sheet(
+    sheet: Image.Image,
+    stem: str,
+    cell: Tuple[int, int] = DEFAULT_CELL,
+    directions: Tuple[str, ...] = DIRECTIONS,
+    drop_directions: Tuple[str, ...] = (),
+    keep_frames: Optional[List[int]] = None
+) -> List[Tuple[str, Image.Image]]:
+    """
+    グリッドのシートをセルに分ける（使わない方向・フレームと空のセルは除く）
+
+    Args:
+        sheet: シート画像
+        stem: フレーム名の接頭辞
+        cell: セルのサイズ (幅, 高さ)
+        directions: 行の方向の並び
+        drop_directions: 除外する方向
+        keep_frames: 残すフレーム番号（Noneで全て）
+
+    Returns:
+        [(フレーム名, セル画像), ...]
+    """
+    sheet = sheet.convert("RGBA")
+    cell_w, cell_h = cell
+    columns, rows = sheet.size[0] // cell_w, sheet.size[1] // cell_h
+    if columns == 0 or rows == 0:
+        raise ValueError(f"{stem}: sheet {sheet.size[0]}x{sheet.size[1]} is smaller than a {cell_w}x{cell_h} cell")
+
+    blocks = (rows + len(directions) - 1) // len(directions)
+    cells = []
+    for row in range(rows):
+        block, direction = divmod(row, len(directions))
+        direction_name = directions[direction]
+        if direction_name in drop_directions:
+            continue
+
+        animation = direction_name if blocks == 1 else f"{block}_{direction_name}"
+        for column in range(columns):
+            if keep_frames is not None and column not in keep_frames:
+                continue
+
+            box = (column * cell_w, row * cell_h, (column + 1) * cell_w, (row + 1) * cell_h)
+            image = sheet.crop(box)
+            if image.getchannel("A").getbbox() is None:
+                continue
+            cells.append((f"{stem}/{animation}/{column}", image))
+
+    return cells
+
+
+def _digest(image: Image.Image) -> str:
+    return hashlib.sha1(f"{image.size}".encode() + image.tobytes()).hexdigest()
+
+
+def mirror_aliases(cells: List[Tuple[str, Image.Image]]) -> Tuple[List[Tuple[str, Image.Image]], Dict[str, str]]:
+    """
+    左右反転すると他のセルと一致するセルを取り除く
+
+    Returns:
+        (残すセル, {取り除いたフレーム名: 反転元のフレーム名})
+    """
+    seen: Dict[str, str] = {}
+    kept = []
+    aliases = {}
+    for name, image in cells:
+        digest = _digest(image)
+        mirrored = _digest(image.transpose(Image.Transpose.FLIP_LEFT_RIGHT))
+        if digest not in seen and mirrored in seen and mirrored != digest:
+            aliases[name] = seen[mirrored]
+            continue
+        seen.setdefault(digest, name)
+        kept.append((name, image))
+    return kept, aliases
+
+
+def add_aliases(frame_map: Dict[str, Any], aliases: Dict[str, str]):
+    """反転で代用するフレームをフレームマップに追加（"flip_h": true）"""
+    for name, source in aliases.items():
+        entry = dict(frame_map["frames"][source])
+        # 反転後の画像内でのトリミング位置
+        width = entry["region"][2]
+        entry["offset"] = [entry["source_size"][0] - entry["offset"][0] - width, entry["offset"][1]]
+        entry["flip_h"] = True
+        frame_map["frames"][name] = entry
+        frame_map["animations"].setdefault(name.rsplit("/", 1)[0], []).append(name)
+
+    for frames in frame_map["animations"].values():
+        frames.sort(key=lambda n: int(n.rsplit("/", 1)[1]))
+
+
+def sprite_frames_animations(
+    frame_map: Dict[str, Any],
+    atlas_paths: List[Path],
+    stem: str,
+    fps: float = DEFAULT_FPS
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    フレームマップから1シート分の SpriteFrames のアニメーション定義を作る
+
+    反転フレームは AtlasTexture で表せないため、反転を含むアニメーションは除外し
+    （ノード側で flip_h を使う）、その名前を返す。
+
+    Returns:
+        (アニメーション定義, 除外したアニメーション名)
+    """
+    animations = []
+    skipped = []
+    for animation, names in frame_map["animations"].items():
+        if not animation.startswith(f"{stem}/"):
+            continue
+        name = "walk_" + animation[len(stem) + 1:]
+        entries = [frame_map["frames"][n] for n in names]
+        if any(entry.get("flip_h") for entry in entries):
+            skipped.append(name)
+            continue
+
+        frames = []
+        for entry in entries:
+            x, y = entry["offset"]
+            w, h = entry["region"][2:]
+            frames.append({
+                "texture": atlas_paths[entry["atlas"]],
+                "region": entry["region"],
+                "margin": [x, y, entry["source_size"][0] - w, entry["source_size"][1] - h],
+            })
+        animations.append({"name": name, "speed": fps, "loop": True, "frames": frames})
+    return animations, skipped
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    width, height = (int(v) for v in value.lower().split("x"))
+    return width, height
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Slice pipo-charachip grid sheets and repack the used cells into one atlas")
+    parser.add_argument("inputs", nargs="+", help="Character sheets (files or glob patterns)")
+    parser.add_argument("--output", required=True, help="Output path without extension")
+    parser.add_argument("--cell", type=_parse_size, default=DEFAULT_CELL, help="Cell size WxH (default: 32x32)")
+    parser.add_argument("--directions", default=",".join(DIRECTIONS),
+                        help=f"Row order, repeated down the sheet (default: {','.join(DIRECTIONS)})")
+    parser.add_argument("--drop-directions", default="", help="Comma-separated directions to leave out")
+    parser.add_argument("--frames", help="Comma-separated frame columns to keep (default: all)")
+    parser.add_argument("--mirror", action="store_true",
+                        help="Drop cells that are horizontal mirrors of kept cells (marked flip_h in the frame map)")
+    parser.add_argument("--max-size", type=int, default=2048, help="Maximum atlas side (default: 2048)")
+    parser.add_argument("--padding", type=int, default=1, help="Padding between frames (default: 1)")
+    parser.add_argument("--power-of-two", action="store_true",
+                        help="Round the atlas up to a power-of-two size (default: tight size, which Godot 4 supports)")
+    parser.add_argument("--sprite-frames-dir", help="Also write <sheet>_frames.tres per sheet into this directory")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help=f"SpriteFrames speed (default: {DEFAULT_FPS})")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Godot project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    directions = tuple(d.strip() for d in args.directions.split(",") if d.strip())
+    drop_directions = tuple(d.strip() for d in args.drop_directions.split(",") if d.strip())
+    keep_frames = [int(v) for v in args.frames.split(",")] if args.frames else None
+
+    unknown = [d for d in drop_directions if d not in directions]
+    if unknown:
+        print(f"❌ Error: Unknown direction(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    paths = []
+    for pattern in args.inputs:
+        matched = sorted(glob.glob(pattern, recursive=True))
+        if not matched:
+            print(f"⚠️  No files matched: {pattern}")
+        paths.extend(matched)
+    paths = list(dict.fromkeys(paths))
+
+    if not paths:
+        print("❌ Error: No input files found")
+        sys.exit(1)
+
+    cells = []
+    source_pixels = 0
+    stems = []
+    for path in paths:
+        stem = re.sub(r"[/\s]", "_", Path(path).stem)
+        with Image.open(path) as img:
+            sheet = img.convert("RGBA")
+        source_pixels += sheet.size[0] * sheet.size[1]
+        try:
+            sliced = slice_sheet(sheet, stem, args.cell, directions, drop_directions, keep_frames)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        print(f"✂️  {Path(path).name}: {len(sliced)} cell(s)")
+        cells.extend(sliced)
+        stems.append(stem)
+
+    aliases: Dict[str, str] = {}
+    if args.mirror:
+        cells, aliases = mirror_aliases(cells)
+
+    try:
+        atlases, frame_map = pack_frames(cells, args.max_size, args.padding, power_of_two=args.power_of_two)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    add_aliases(frame_map, aliases)
+    frame_map["stats"]["frames"] += len(aliases)
+    frame_map["stats"]["mirrored_frames"] = len(aliases)
+    frame_map["stats"]["source_texture_pixels"] = source_pixels
+
+    written = write_atlas(atlases, frame_map, args.output)
+
+    stats = frame_map["stats"]
+    atlas_pixels = stats["atlas_pixels"]
+    print()
+    print(f"✅ Atlas created: {', '.join(str(p) for p in written)}")
+    print(f"   Frames: {stats['frames']} ({stats['unique_frames']} unique, {len(aliases)} mirrored)")
+    print(f"   Textures: {len(paths)} -> {len(atlases)}")
+    print(f"   Texture memory (RGBA8): {source_pixels * 4 / 1024:.0f} KB -> {atlas_pixels * 4 / 1024:.0f} KB "
+          f"({100 * atlas_pixels / source_pixels:.0f}%)")
+    print(f"   Frame map: {args.output}.json")
+    if atlas_pixels > source_pixels:
+        print("⚠️  The atlas uses more texture memory than the source sheets")
+
+    if args.sprite_frames_dir:
+        base_dir = Path(args.base_dir)
+        atlas_paths = [p.resolve() for p in written]
+        for stem in stems:
+            animations, skipped = sprite_frames_animations(frame_map, atlas_paths, stem, args.fps)
+            output = (Path(args.sprite_frames_dir) / f"{stem}_frames.tres").resolve()
+            try:
+                write_sprite_frames(output, animations, base_dir)
+            except ValueError as e:
+                print(f"❌ Error: {e} (atlas must be inside --base-dir)")
+                sys.exit(1)
+            note = f" (flip_h on the node for: {', '.join(skipped)})" if skipped else ""
+            print(f"✅ SpriteFrames: {output.name} ({len(animations)} animation(s)){note}")
+
+
+if __name__ == "__main__":
+    main()
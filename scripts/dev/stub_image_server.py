@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+画像生成APIのローカルスタブサーバー（オフラインでの負荷試験用）
+
+OpenAI Images API（POST /v1/images/generations）と同じ形式で応答し、
+生成した画像を URL（GET /files/<id>.png、Rangeリクエスト対応）または
+b64_json で返します。応答の遅延・エラー率・429（レート制限）・
+ダウンロードの途中切断・画像サイズを設定できるため、
+generate_asset_with_dalle.py のリトライやレート制限の挙動を
+本番サービスなしで確認できます。
+
+使用例:
+    # 起動（遅延0.5秒±0.2、5%で500、10%で429）
+    python3 stub_image_server.py --port 8000 --latency 0.5 --jitter 0.2 \\
+        --error-rate 0.05 --rate-limit-rate 0.1
+
+    # 生成スクリプトをスタブに向ける
+    OPENAI_API_KEY=stub python3 generate_asset_with_dalle.py \\
+        --batch player_idle,basic_enemy --base-url http://127.0.0.1:8000/v1
+
+    # 毎分60件を超えたら429、画像は256x256に縮小して512KBに水増し
+    python3 stub_image_server.py --max-rpm 60 --image-size 256x256 --payload-kb 512
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import io
+import sys
+import json
+import time
+import zlib
+import base64
+import random
+import struct
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+
+DEFAULT_PORT = 8000
+# 画像のバリエーション数（同じ見た目の画像はエンコード結果を使い回す）
+VARIANTS = 8
+
+
+class StubConfig:
+    """スタブサーバーの挙動の設定"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        download_latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        max_rpm: float = 0.0,
+        retry_after: float = 1.0,
+        truncate_rate: float = 0.0,
+        image_size: Optional[Tuple[int, int]] = None,
+        payload_kb: int = 0,
+        seed: Optional[int] = None
+    ):
+        """
+        初期化
+
+        Args:
+            latency: 生成リクエストの平均応答時間（秒）
+            jitter: 応答時間のばらつき（±秒、一様分布）
+            download_latency: 画像ダウンロードの応答時間（秒）
+            error_rate: 生成リクエストが500を返す確率
+            rate_limit_rate: 生成リクエストが429を返す確率
+            max_rpm: 1分あたりの生成リクエスト上限（超過分は429、0以下で無制限）
+            retry_after: 429に付ける Retry-After（秒）
+            truncate_rate: ダウンロードが途中で切断される確率
+            image_size: 返す画像のサイズ（Noneの場合はリクエストの size）
+            payload_kb: PNGの最低サイズ（KB、不足分は補助チャンクで水増し）
+            seed: 乱数シード（エラー発生の再現用）
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.download_latency = download_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_rpm = max_rpm
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+        self.image_size = image_size
+        self.payload_kb = payload_kb
+        self.seed = seed
+
+
+def _pad_png(data: bytes, min_bytes: int) -> bytes:
+    """IENDの前に補助チャンク（stUb）を挿入して min_bytes 以上にする"""
+    missing = min_bytes - len(data)
+    if missing <= 0:
+        return data
+
+    body = bytes(max(0, missing - 12))
+    chunk = struct.pack(">I", len(body)) + b"stUb" + body
+    chunk += struct.pack(">I", zlib.crc32(b"stUb" + body) & 0xFFFFFFFF)
+    return data[:-12] + chunk + data[-12:]
+
+
+class StubImageServer(ThreadingHTTPServer):
+    """画像生成APIのスタブ（スレッドごとにリクエストを処理）"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: Optional[StubConfig] = None):
+        """
+        初期化
+
+        Args:
+            address: (ホスト, ポート)。ポート0で空きポートを使う
+            config: 挙動の設定
+        """
+        super().__init__(address, StubRequestHandler)
+        self.config = config or StubConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._files: Dict[str, bytes] = {}
+        self._encoded: Dict[Tuple[int, int, int], bytes] = {}
+        self._requests: list = []
+        self.stats: Dict[str, int] = {
+            "generate": 0, "ok": 0, "errors": 0, "rate_limited": 0,
+            "downloads": 0, "range_downloads": 0, "truncated": 0, "bytes_sent": 0,
+        }
+
+    @property
+    def base_url(self) -> str:
+        """クライアントに渡すベースURL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, key: str, value: int = 1):
+        with self._lock:
+            self.stats[key] += value
+
+    def chance(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def delay(self) -> float:
+        with self._lock:
+            offset = self._random.uniform(-self.config.jitter, self.config.jitter)
+        return max(0.0, self.config.latency + offset)
+
+    def over_limit(self) -> bool:
+        """直近1分の生成リクエストが max_rpm を超えるか（超えない場合は記録する）"""
+        if self.config.max_rpm <= 0:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            self._requests = [t for t in self._requests if now - t < 60]
+            if len(self._requests) >= self.config.max_rpm:
+                return True
+            self._requests.append(now)
+            return False
+
+    def render(self, prompt: str, size: str) -> bytes:
+        """プロンプトに対応する画像（PNG）を作る"""
+        if self.config.image_size:
+            width, height = self.config.image_size
+        else:
+            width, height = (int(v) for v in size.split("x"))
+
+        variant = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % VARIANTS
+        key = (width, height, variant)
+        with self._lock:
+            data = self._encoded.get(key)
+        if data is not None:
+            return data
+
+        hue = variant * 255 // VARIANTS
+        img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        noise = Image.effect_noise((width // 2, height // 2), 48).convert("RGBA")
+        img.paste(Image.blend(Image.new("RGBA", noise.size, (hue, 255 - hue, 128, 255)), noise, 0.3),
+                  (width // 4, height // 4))
+
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG")
+        data = _pad_png(buffer.getvalue(), self.config.payload_kb * 1024)
+        with self._lock:
+            self._encoded[key] = data
+        return data
+
+    def store(self, data: bytes) -> str:
+        """ダウンロード用に画像を登録してIDを返す"""
+        with self._lock:
+            file_id = f"img-{len(self._files):06d}"
+            self._files[file_id] = data
+        return file_id
+
+    def file(self, file_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._files.get(file_id)
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """スタブのリクエスト処理"""
+
+    server: StubImageServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args):
+        pass  # リクエストごとのログは出さない（負荷試験で邪魔になるため）
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": None}}, headers)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/images/generations":
+            self._send_error(404, f"Unknown endpoint: {self.path}", "invalid_request_error")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_error(400, "Invalid JSON body", "invalid_request_error")
+            return
+
+        server = self.server
+        config = server.config
+        server.count("generate")
+
+        if server.over_limit() or server.chance(config.rate_limit_rate):
+            server.count("rate_limited")
+            self._send_error(429, "Rate limit exceeded (stub)", "rate_limit_exceeded",
+                             {"Retry-After": f"{config.retry_after:g}"})
+            return
+
+        time.sleep(server.delay())
+
+        if server.chance(config.error_rate):
+            server.count("errors")
+            self._send_error(500, "Internal server error (stub)", "server_error")
+            return
+
+        prompt = request.get("prompt", "")
+        data = server.render(prompt, request.get("size", "1024x1024"))
+
+        if request.get("response_format") == "b64_json":
+            item = {"b64_json": base64.b64encode(data).decode("ascii")}
+        else:
+            host = self.headers.get("Host") or "%s:%d" % server.server_address[:2]
+            item = {"url": f"http://{host}/files/{server.store(data)}.png"}
+        item["revised_prompt"] = prompt
+
+        server.count("ok")
+        self._send_json(200, {"created": int(time.time()), "data": [item]})
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server._lock:
+                stats = dict(self.server.stats)
+            self._send_json(200, stats)
+            return
+
+        if not (self.path.startswith("/files/") and self.path.endswith(".png")):
+            self._send_error(404, f"Unknown path: {self.path}", "invalid_request_error")
+            return
+
+        data = self.server.file(self.path[len("/files/"):-len(".png")])
+        if data is None:
+            self._send_error(404, "File not found", "invalid_request_error")
+            return
+
+        server = self.server
+        time.sleep(server.config.download_latency)
+        server.count("downloads")
+
+        start = 0
+        range_header = self.headers.get("Range", "")
+        if range_header.startswith("bytes=") and range_header.endswith("-"):
+            start = min(int(range_header[len("bytes="):-1] or 0), len(data))
+            server.count("range_downloads")
+
+        body = data[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+
+        # 途中切断（Content-Length より短く送って接続を閉じる）
+        if len(body) > 1 and server.chance(server.config.truncate_rate):
+            body = body[:len(body) // 2]
+            server.count("truncated")
+            self.close_connection = True
+
+        self.wfile.write(body)
+        server.count("bytes_sent", len(body))
+
+
+def start_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> StubImageServer:
+    """
+    スタブサーバーをバックグラウンドスレッドで起動
+
+    Args:
+        config: 挙動の設定
+        host: 待ち受けアドレス
+        port: ポート（0で空きポート）
+
+    Returns:
+        起動したサーバー（server.base_url をクライアントに渡す。終了は shutdown()）
+    """
+    server = StubImageServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="stub-image-server", daemon=True).start()
+    return server
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """"256x256" 形式のサイズを解釈"""
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value} (expected WIDTHxHEIGHT)")
+    return width, height
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI images API (offline load testing)")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean generation latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter on the latency in seconds")
+    parser.add_argument("--download-latency", type=float, default=0.0, help="Latency of image downloads in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response (0-1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 response (0-1)")
+    parser.add_argument("--max-rpm", type=float, default=0.0, help="Generation requests per minute before 429s")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--truncate-rate", type=float, default=0.0,
+                        help="Probability that a download is cut off halfway (0-1)")
+    parser.add_argument("--image-size", type=parse_size, help="Returned image size, e.g. 256x256 (default: requested size)")
+    parser.add_argument("--payload-kb", type=int, default=0, help="Pad PNGs to at least this many KB")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible failures")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        download_latency=args.download_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_rpm=args.max_rpm,
+        retry_after=args.retry_after,
+        truncate_rate=args.truncate_rate,
+        image_size=args.image_size,
+        payload_kb=args.payload_kb,
+        seed=args.seed,
+    )
+
+    server = StubImageServer((args.host, args.port), config)
+    print(f"🧪 Stub image server listening on {server.base_url}")
+    print(f"   Stats: http://{args.host}:{server.server_address[1]}/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print(f"📊 {json.dumps(server.stats)}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+テクスチャメモリの見積もりと予算チェック
+
+assets/ 以下の PNG について、PNGヘッダ（IHDR/tRNS）と Godot の .import の
+[params]（compress/mode、mipmaps/generate、process/size_limit）から、
+読み込み時のデコード後サイズ（CPU側の Image）と GPU 上のサイズを
+アセットごと・カテゴリ（ディレクトリ）ごとに見積もります。
+透明部分の多いテクスチャ・大きすぎるシート・2D用なのにミップマップを作る設定・
+.import のないファイルを指摘し、予算を超えた場合は終了コード1で終わります。
+
+テクスチャはインスタンス間で共有されるため、敵が200体いても同じシートの
+GPUメモリは1枚分です。予算はアセットの種類数に対して効きます。
+
+見積もりの前提（Godot 4、RenderingDevice）:
+    compress/mode 0 (Lossless) / 1 (Lossy) / 3 (VRAM Uncompressed):
+        非圧縮。RGB8 は RGBA8 に変換してアップロード（L8/LA8 はそのまま）
+    compress/mode 2 (VRAM Compressed): BC1/DXT1（アルファなし、0.5バイト/画素）、
+        BC3/DXT5（アルファあり、1バイト/画素）、4x4ブロック単位
+    compress/mode 4 (Basis Universal): 同上（実行時にBC/ETCへ変換）
+    mipmaps/generate=true: 1x1 までの全レベルを加算（約 +33%）
+
+予算ファイル（JSON、既定: <base-dir>/config/texture_budget.json）:
+    {
+      "total_mb": 32,
+      "categories": {"characters/enemies": 8, "characters/bosses": 8},
+      "max_size": 2048,
+      "transparent_waste": 0.5
+    }
+    categories のキーはカテゴリ名の前方一致（"characters" なら characters/* 全体）。
+
+使用例:
+    # assets/ 全体を見積もる
+    python3 texture_budget.py
+
+    # 予算を指定してチェック（CI向け。超過で終了コード1）
+    python3 texture_budget.py --budget 16 --category-budget characters/enemies=4
+
+    # 指摘事項も失敗扱いにし、結果をJSONで保存
+    python3 texture_budget.py --strict --json texture_report.json
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import sys
+import json
+import struct
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Any
+
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Error: Pillow library is not installed.")
+    print("Please install it with: pip install Pillow")
+    sys.exit(1)
+
+from godot_resources import parse_frame_spec
+from png_optimize import PNG_SIGNATURE
+
+
+BASE_DIR = Path("/workspaces/05_poc-godot")
+
+DEFAULT_MAX_SIZE = 2048
+DEFAULT_TRANSPARENT_WASTE = 0.5
+
+# .import がない場合に Godot が使う既定値（2D向けのテクスチャインポーター）
+DEFAULT_IMPORT_PARAMS = {
+    "compress/mode": "0",
+    "mipmaps/generate": "false",
+    "process/size_limit": "0",
+}
+
+COMPRESS_MODES = {
+    0: "Lossless",
+    1: "Lossy",
+    2: "VRAM Compressed",
+    3: "VRAM Uncompressed",
+    4: "Basis Universal",
+}
+
+# PNGのカラータイプ -> (Godotの Image 形式, 1画素のバイト数)
+PNG_FORMATS = {
+    0: ("L8", 1),
+    2: ("RGB8", 3),
+    3: ("RGB8", 3),  # パレット（tRNS があれば RGBA8）
+    4: ("LA8", 2),
+    6: ("RGBA8", 4),
+}
+
+MB = 1024 * 1024
+
+
+def read_png_header(path: Path) -> Dict[str, Any]:
+    """
+    PNGのヘッダだけを読む（画素はデコードしない）
+
+    Returns:
+        {"width", "height", "bit_depth", "color_type", "has_alpha"}
+    """
+    with open(path, "rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError(f"Not a PNG file: {path}")
+
+        header = None
+        has_trns = False
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            length, kind = struct.unpack(">I4s", chunk)
+            if kind == b"IHDR":
+                header = struct.unpack(">IIBB", f.read(10))
+                f.seek(length - 10 + 4, 1)
+            elif kind == b"tRNS":
+                has_trns = True
+                break
+            elif kind in (b"IDAT", b"IEND"):
+                break
+            else:
+                f.seek(length + 4, 1)
+
+    if header is None:
+        raise ValueError(f"PNG without IHDR: {path}")
+
+    width, height, bit_depth, color_type = header
+    return {
+        "width": width,
+        "height": height,
+        "bit_depth": bit_depth,
+        "color_type": color_type,
+        "has_alpha": color_type in (4, 6) or has_trns,
+    }
+
+
+def read_import(path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Godot の .import ファイルをセクションごとの {キー: 値（文字列のまま）} に読む
+
+    複数行にわたる値（metadata={...} など）は1行目だけを保持する。
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    current = sections.setdefault("", {})
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            current = sections.setdefault(line[1:-1], {})
+        elif "=" in line:
+            key, value = line.split("=", 1)
+            current[key.strip()] = value.strip().strip('"')
+    return sections
+
+
+def _mip_bytes(width: int, height: int, bytes_per_pixel: float, mipmaps: bool, block: int = 1) -> int:
+    """全レベルのバイト数（block > 1 の場合はブロック単位に切り上げ）"""
+    total = 0.0
+    while True:
+        w = -(-width // block) * block
+        h = -(-height // block) * block
+        total += w * h * bytes_per_pixel
+        if not mipmaps or (width == 1 and height == 1):
+            break
+        width, height = max(1, width // 2), max(1, height // 2)
+    return int(total)
+
+
+def estimate(header: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+    """
+    デコード後と GPU 上のサイズを見積もる
+
+    Args:
+        header: read_png_header() の結果
+        params: .import の [params]
+
+    Returns:
+        {"size", "compress_mode", "mipmaps", "image_format", "gpu_format", "decoded_bytes", "gpu_bytes"}
+    """
+    width, height = header["width"], header["height"]
+    mode = int(params.get("compress/mode", DEFAULT_IMPORT_PARAMS["compress/mode"]))
+    mipmaps = params.get("mipmaps/generate", DEFAULT_IMPORT_PARAMS["mipmaps/generate"]) == "true"
+    size_limit = int(params.get("process/size_limit", DEFAULT_IMPORT_PARAMS["process/size_limit"]))
+
+    if size_limit > 0 and max(width, height) > size_limit:
+        scale = size_limit / max(width, height)
+        width, height = max(1, round(width * scale)), max(1, round(height * scale))
+
+    image_format, bytes_per_pixel = PNG_FORMATS.get(header["color_type"], ("RGBA8", 4))
+    if header["has_alpha"] and image_format == "RGB8":
+        image_format, bytes_per_pixel = "RGBA8", 4
+
+    if mode in (2, 4):
+        gpu_format = "BC3/DXT5" if header["has_alpha"] else "BC1/DXT1"
+        gpu_bytes = _mip_bytes(width, height, 1.0 if header["has_alpha"] else 0.5, mipmaps, block=4)
+        # 圧縮済みのデータをそのまま読み込む
+        decoded_bytes = gpu_bytes
+    else:
+        decoded_bytes = _mip_bytes(width, height, bytes_per_pixel, mipmaps)
+        gpu_format, gpu_bpp = ("RGBA8", 4) if image_format == "RGB8" else (image_format, bytes_per_pixel)
+        gpu_bytes = _mip_bytes(width, height, gpu_bpp, mipmaps)
+
+    return {
+        "size": [width, height],
+        "compress_mode": COMPRESS_MODES.get(mode, str(mode)),
+        "mipmaps": mipmaps,
+        "image_format": image_format,
+        "gpu_format": gpu_format,
+        "decoded_bytes": decoded_bytes,
+        "gpu_bytes": gpu_bytes,
+    }
+
+
+def transparency(path: Path) -> Tuple[float, float]:
+    """
+    完全に透明な画素の割合と、トリミングで削れる面積の割合
+
+    ファイル名が <name>_WxH_Nf.png のスプライトシートはフレームごとに
+    不透明部分の外接矩形を求める（アトラスに詰め直した場合に削れる面積）。
+
+    Returns:
+        (透明な画素の割合, トリミングで削れる面積の割合)
+    """
+    with Image.open(path) as img:
+        if "A" not in img.getbands() and "transparency" not in img.info:
+            return 0.0, 0.0
+        alpha = img.convert("RGBA").getchannel("A")
+
+    width, height = alpha.size
+    total = width * height
+    transparent = alpha.histogram()[0] / total
+
+    spec = parse_frame_spec(path)
+    frame_w, frame_h = spec[:2] if spec else (width, height)
+
+    kept = 0
+    for y in range(0, height - frame_h + 1, frame_h):
+        for x in range(0, width - frame_w + 1, frame_w):
+            bbox = alpha.crop((x, y, x + frame_w, y + frame_h)).getbbox()
+            if bbox is not None:
+                kept += (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+    return transparent, 1.0 - kept / total
+
+
+def category_of(relative: Path, depth: int = 2) -> str:
+    """ディレクトリから決まるカテゴリ名（例: characters/enemies）"""
+    parts = relative.parent.parts[:depth]
+    return "/".join(parts) or "."
+
+
+def analyze(
+    root: Path,
+    depth: int = 2,
+    scan_alpha: bool = True,
+    max_size: int = DEFAULT_MAX_SIZE,
+    transparent_waste: float = DEFAULT_TRANSPARENT_WASTE
+) -> List[Dict[str, Any]]:
+    """
+    root 以下の PNG をすべて見積もる
+
+    Args:
+        root: 走査するディレクトリ（通常は <base-dir>/assets）
+        depth: カテゴリに使うディレクトリの深さ
+        scan_alpha: 画素を読んで透明部分の割合を調べるか
+        max_size: これより長い辺を持つテクスチャを指摘する
+        transparent_waste: 透明な画素の割合がこれ以上なら指摘する
+
+    Returns:
+        アセットごとの結果（GPUサイズの降順）
+    """
+    results = []
+    seen: Dict[str, str] = {}
+    for path in sorted(root.rglob("*.png")):
+        relative = path.relative_to(root)
+        if any(part.startswith(".") for part in relative.parts):
+            continue
+
+        flags = []
+        try:
+            header = read_png_header(path)
+        except (OSError, ValueError) as e:
+            results.append({"path": str(relative), "category": category_of(relative, depth), "error": str(e),
+                            "decoded_bytes": 0, "gpu_bytes": 0, "flags": [f"unreadable: {e}"]})
+            continue
+
+        import_file = path.with_name(path.name + ".import")
+        if import_file.exists():
+            params = read_import(import_file).get("params", {})
+        else:
+            params = {}
+            flags.append("no .import (project defaults on first import)")
+
+        entry = {
+            "path": str(relative),
+            "category": category_of(relative, depth),
+            "file_bytes": path.stat().st_size,
+            **estimate(header, params),
+        }
+
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()
+        if digest in seen:
+            flags.append(f"duplicate of {seen[digest]}")
+        else:
+            seen[digest] = str(relative)
+
+        width, height = header["width"], header["height"]
+        if max(width, height) > max_size:
+            flags.append(f"oversize {width}x{height} (> {max_size})")
+        if entry["mipmaps"]:
+            flags.append("mipmaps on a 2D texture (+33%)")
+
+        if scan_alpha:
+            transparent, trimmable = transparency(path)
+            entry["transparent"] = round(transparent, 3)
+            entry["trimmable"] = round(trimmable, 3)
+            if transparent >= transparent_waste:
+                flags.append(f"{transparent:.0%} transparent"
+                             + (f", {trimmable:.0%} trimmable" if trimmable > 0 else ""))
+
+        entry["flags"] = flags
+        results.append(entry)
+
+    results.sort(key=lambda e: (-e["gpu_bytes"], e["path"]))
+    return results
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """カテゴリごとの合計"""
+    categories: Dict[str, Dict[str, int]] = {}
+    for entry in results:
+        total = categories.setdefault(entry["category"], {"textures": 0, "decoded_bytes": 0, "gpu_bytes": 0})
+        total["textures"] += 1
+        total["decoded_bytes"] += entry["decoded_bytes"]
+        total["gpu_bytes"] += entry["gpu_bytes"]
+    return dict(sorted(categories.items(), key=lambda item: -item[1]["gpu_bytes"]))
+
+
+def check_budget(
+    results: List[Dict[str, Any]],
+    total_mb: Optional[float],
+    category_mb: Dict[str, float]
+) -> List[str]:
+    """
+    予算の超過を調べる
+
+    Returns:
+        超過の説明（なければ空）
+    """
+    violations = []
+    gpu_total = sum(e["gpu_bytes"] for e in results)
+    if total_mb is not None and gpu_total > total_mb * MB:
+        violations.append(f"total {gpu_total / MB:.2f} MB > {total_mb:g} MB")
+
+    for prefix, limit in category_mb.items():
+        used = sum(e["gpu_bytes"] for e in results
+                   if e["category"] == prefix or e["category"].startswith(prefix + "/"))
+        if used > limit * MB:
+            violations.append(f"{prefix}: {used / MB:.2f} MB > {limit:g} MB")
+    return violations
+
+
+def load_budget(path: Path) -> Dict[str, Any]:
+    """予算ファイルを読む（存在しなければ空）"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _kb(value: int) -> str:
+    return f"{value / 1024:,.1f} KB"
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Estimate decoded/GPU texture memory from PNG headers and Godot .import settings")
+    parser.add_argument("root", nargs="?", help="Directory to scan (default: <base-dir>/assets)")
+    parser.add_argument("--config", help="Budget JSON (default: <base-dir>/config/texture_budget.json)")
+    parser.add_argument("--budget", type=float, help="Total GPU budget in MB (overrides the config)")
+    parser.add_argument("--category-budget", action="append", default=[], metavar="CATEGORY=MB",
+                        help="GPU budget for a category prefix (repeatable, overrides the config)")
+    parser.add_argument("--depth", type=int, default=2, help="Directory depth used for categories (default: 2)")
+    parser.add_argument("--max-size", type=int, help=f"Flag textures with a side above this (default: {DEFAULT_MAX_SIZE})")
+    parser.add_argument("--transparent-waste", type=float,
+                        help=f"Flag textures with at least this fraction of transparent pixels (default: {DEFAULT_TRANSPARENT_WASTE})")
+    parser.add_argument("--no-alpha-scan", action="store_true", help="Only read headers (skip the transparency check)")
+    parser.add_argument("--top", type=int, default=20, help="Number of largest textures to list (default: 20, 0 = all)")
+    parser.add_argument("--strict", action="store_true", help="Also fail when any texture is flagged")
+    parser.add_argument("--json", help="Write the full report to this JSON file")
+    parser.add_argument("--base-dir", default=str(BASE_DIR), help=f"Godot project root (default: {BASE_DIR})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir)
+    root = Path(args.root) if args.root else base_dir / "assets"
+    if not root.is_dir():
+        print(f"❌ Error: Directory not found: {root}")
+        sys.exit(1)
+
+    try:
+        config = load_budget(Path(args.config) if args.config else base_dir / "config" / "texture_budget.json")
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Error: Failed to read budget config: {e}")
+        sys.exit(1)
+
+    total_mb = args.budget if args.budget is not None else config.get("total_mb")
+    category_mb = dict(config.get("categories", {}))
+    for item in args.category_budget:
+        category, _, value = item.partition("=")
+        try:
+            category_mb[category.strip("/")] = float(value)
+        except ValueError:
+            print(f"❌ Error: Invalid --category-budget: {item} (expected CATEGORY=MB)")
+            sys.exit(1)
+
+    results = analyze(
+        root,
+        depth=args.depth,
+        scan_alpha=not args.no_alpha_scan,
+        max_size=args.max_size or config.get("max_size", DEFAULT_MAX_SIZE),
+        transparent_waste=args.transparent_waste or config.get("transparent_waste", DEFAULT_TRANSPARENT_WASTE),
+    )
+    if not results:
+        print(f"⚠️  No PNG files under {root}")
+        return
+
+    categories = summarize(results)
+    decoded_total = sum(e["decoded_bytes"] for e in results)
+    gpu_total = sum(e["gpu_bytes"] for e in results)
+
+    print("=" * 70)
+    print(f"  Texture Memory: {len(results)} texture(s) under {root}")
+    print("=" * 70)
+
+    listed = results if args.top == 0 else results[:args.top]
+    w = max([len(e["path"]) for e in listed] + [len(c) for c in categories] + [8])
+    print(f"{'texture':<{w}} {'size':>9} {'format':>9} {'decoded':>11} {'GPU':>11}")
+    for entry in listed:
+        if "error" in entry:
+            print(f"{entry['path']:<{w}} {'-':>9} {'-':>9} {'-':>11} {'-':>11}")
+            continue
+        size = f"{entry['size'][0]}x{entry['size'][1]}"
+        print(f"{entry['path']:<{w}} {size:>9} {entry['gpu_format']:>9} "
+              f"{_kb(entry['decoded_bytes']):>11} {_kb(entry['gpu_bytes']):>11}")
+    if len(listed) < len(results):
+        print(f"... and {len(results) - len(listed)} more")
+
+    print()
+    print(f"{'category':<{w}} {'textures':>9} {'':>9} {'decoded':>11} {'GPU':>11}")
+    for category, total in categories.items():
+        print(f"{category:<{w}} {total['textures']:>9} {'':>9} "
+              f"{_kb(total['decoded_bytes']):>11} {_kb(total['gpu_bytes']):>11}")
+    print(f"{'total':<{w}} {len(results):>9} {'':>9} {_kb(decoded_total):>11} {_kb(gpu_total):>11}")
+
+    flagged = [e for e in results if e["flags"]]
+    if flagged:
+        print()
+        print(f"⚠️  {len(flagged)} texture(s) flagged:")
+        for entry in flagged:
+            print(f"   {entry['path']}: {'; '.join(entry['flags'])}")
+
+    violations = check_budget(results, total_mb, category_mb)
+    print()
+    if violations:
+        print("❌ Over budget:")
+        for violation in violations:
+            print(f"   {violation}")
+    elif total_mb is not None or category_mb:
+        print(f"✅ Within budget (GPU total {gpu_total / MB:.2f} MB"
+              + (f" / {total_mb:g} MB)" if total_mb is not None else ")"))
+
+    if args.json:
+        report = {
+            "root": str(root),
+            "decoded_bytes": decoded_total,
+            "gpu_bytes": gpu_total,
+            "categories": categories,
+            "textures": results,
+            "violations": violations,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"📝 Report: {args.json}")
+
+    if violations or (args.strict and flagged):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
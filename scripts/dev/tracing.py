@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+生成処理の計測（スパン・メトリクス）
+
+API呼び出し・ダウンロード・デコード・シート作成・保存などの各ステージを
+スパンとして記録し、Chrome trace-event 形式（chrome://tracing や
+Perfetto で表示）と、アセットごとのメトリクスJSONLに書き出します。
+
+無効時は NULL_TRACER（何も記録しない）を使うため、計測コードを
+呼び出し側に残したままでもオーバーヘッドはほぼありません。
+
+使用例（Python）:
+    tracer = Tracer()
+    with tracer.asset("basic_enemy"):
+        with tracer.span("api_call", model="dall-e-3"):
+            ...
+        with tracer.span("download") as span:
+            span["bytes"] = 123456
+            tracer.count("bytes_downloaded", 123456)
+    tracer.write_chrome_trace("trace.json")
+    tracer.write_metrics("metrics.jsonl")
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+
+class Tracer:
+    """スパンとアセットごとのメトリクスを記録（スレッドセーフ）"""
+
+    enabled = True
+
+    def __init__(self):
+        """初期化"""
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def current_asset(self) -> Optional[str]:
+        """このスレッドで処理中のアセット名"""
+        return getattr(self._local, "asset", None)
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """
+        ステージの区間を記録
+
+        with の値は辞書で、区間内でバイト数などの属性を追加できる。
+        例外が発生した場合は "error" 属性に記録して再送出する。
+        """
+        span_args: Dict[str, Any] = dict(args)
+        start = self._now_us()
+        try:
+            yield span_args
+        except BaseException as e:
+            span_args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = self._now_us() - start
+            asset = self.current_asset()
+            if asset is not None:
+                span_args.setdefault("asset", asset)
+
+            thread = threading.current_thread()
+            with self._lock:
+                self._threads.setdefault(thread.ident, thread.name)
+                self._events.append({
+                    "name": name,
+                    "cat": "asset",
+                    "ph": "X",
+                    "ts": round(start, 1),
+                    "dur": round(duration, 1),
+                    "pid": os.getpid(),
+                    "tid": thread.ident,
+                    "args": span_args,
+                })
+                if asset is not None:
+                    stages = self._metrics[asset].setdefault("stages", {})
+                    stages[name] = stages.get(name, 0.0) + duration / 1e6
+
+    @contextmanager
+    def asset(self, name: str):
+        """
+        アセット1件分の処理を記録（内側のスパン・カウンタをこのアセットに集計）
+
+        with の値はメトリクスの辞書で、"success" などを設定できる。
+        """
+        previous = self.current_asset()
+        self._local.asset = name
+        with self._lock:
+            metrics = self._metrics.setdefault(name, {"asset": name, "retries": 0, "bytes_downloaded": 0})
+
+        started = time.perf_counter()
+        try:
+            with self.span(f"asset:{name}"):
+                yield metrics
+        finally:
+            with self._lock:
+                metrics["seconds"] = metrics.get("seconds", 0.0) + time.perf_counter() - started
+                metrics.get("stages", {}).pop(f"asset:{name}", None)
+            self._local.asset = previous
+
+    def count(self, key: str, value: float = 1):
+        """処理中のアセットのカウンタに加算（アセット外では無視）"""
+        asset = self.current_asset()
+        if asset is None:
+            return
+        with self._lock:
+            metrics = self._metrics[asset]
+            metrics[key] = metrics.get(key, 0) + value
+
+    def set(self, key: str, value: Any):
+        """処理中のアセットのメトリクスを設定（アセット外では無視）"""
+        asset = self.current_asset()
+        if asset is None:
+            return
+        with self._lock:
+            self._metrics[asset][key] = value
+
+    def write_chrome_trace(self, path: Path):
+        """Chrome trace-event 形式（JSON）で書き出す"""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        _write_atomic(Path(path), json.dumps({"traceEvents": metadata + events, "displayTimeUnit": "ms"}))
+
+    def write_metrics(self, path: Path):
+        """アセットごとのメトリクスをJSONL（1行1アセット）で書き出す"""
+        with self._lock:
+            rows = [dict(metrics) for metrics in self._metrics.values()]
+
+        _write_atomic(Path(path), "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+
+class NullTracer:
+    """何も記録しないトレーサー（計測無効時）"""
+
+    enabled = False
+
+    class _NullContext:
+        def __enter__(self):
+            return {}
+
+        def __exit__(self, *exc):
+            return False
+
+    _NULL = _NullContext()
+
+    def current_asset(self) -> Optional[str]:
+        return None
+
+    def span(self, name: str, **args):
+        return self._NULL
+
+    def asset(self, name: str):
+        return self._NULL
+
+    def count(self, key: str, value: float = 1):
+        pass
+
+    def set(self, key: str, value: Any):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+def _write_atomic(path: Path, content: str):
+    """一時ファイルに書いてから置き換える"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
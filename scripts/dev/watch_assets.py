@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+アセットのソースを監視し、変更に依存するノードだけを再ビルドする
+
+build_assets.py のビルドグラフのソース（*_single.png）と
+アセット定義（generate_asset_with_dalle.py の PROMPTS）を監視します。
+変更を検出すると、まとめて届くイベントを短い待ち時間（デバウンス）で1回分にまとめ、
+そのファイルを入力とするノードと、その下流（SpriteFrames・アトラス）だけを
+再ビルドします。アセット定義が変わった場合は定義を読み直し、パラメータの
+変わったノードを再ビルドします。
+
+Linux では inotify（ctypes 経由、追加ライブラリ不要）、それ以外の環境や
+--poll 指定時は mtime のポーリングで検出します。ワーカープロセスは起動時に
+作って使い回すため（Pillow/NumPy の import も起動時に済ませる）、保存してから
+Godot が再読み込みするまでの遅延は変換そのものの時間だけです。
+
+使用例:
+    # 全アセットを監視（起動時に古いノードをビルドしてから監視を開始）
+    python3 watch_assets.py
+
+    # 敵だけを監視し、アトラスも更新
+    python3 watch_assets.py basic_enemy fast_enemy --atlas assets/characters/enemies/enemies_atlas
+
+    # ネットワークドライブなど inotify が使えない場所
+    python3 watch_assets.py --poll --interval 0.5
+
+必要なライブラリ:
+    pip install Pillow
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Set, Iterable
+
+import generate_asset_with_dalle
+from build_assets import BuildNode, build, build_graph, select_nodes
+
+
+DEFAULT_DEBOUNCE = 0.1
+DEFAULT_INTERVAL = 0.25
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+# エディタは一時ファイルからの rename で保存することが多いので MOVED_TO も見る
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """ファイルの mtime/サイズを一定間隔で比較する監視（どの環境でも動く）"""
+
+    def __init__(self, paths: Iterable[Path], interval: float = DEFAULT_INTERVAL):
+        """
+        初期化
+
+        Args:
+            paths: 監視するファイル（存在しなくてもよい。作成も検出する）
+            interval: 確認間隔（秒）
+        """
+        self.interval = interval
+        self.overflowed = False
+        self._stats: Dict[Path, Optional[tuple]] = {}
+        self.update(paths)
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def update(self, paths: Iterable[Path]):
+        """監視対象を置き換える（既存のファイルの状態は引き継ぐ）"""
+        self._stats = {path: self._stats[path] if path in self._stats else self._stat(path) for path in paths}
+
+    def changes(self, timeout: Optional[float] = None) -> Set[Path]:
+        """
+        変更されたファイルを待つ
+
+        Args:
+            timeout: 最大待ち時間（秒、Noneで変更があるまで）
+
+        Returns:
+            変更されたファイル（タイムアウト時は空）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, previous in self._stats.items():
+                current = self._stat(path)
+                if current != previous:
+                    self._stats[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self):
+        """何もしない（InotifyWatcher と同じインターフェース）"""
+
+
+class InotifyWatcher:
+    """inotify によるファイル監視（Linuxのみ）
+
+    ファイルを置き換える保存（rename）でも監視が外れないよう、ファイルではなく
+    親ディレクトリを監視して名前で絞り込む。
+    """
+
+    def __init__(self, paths: Iterable[Path]):
+        """
+        初期化
+
+        Raises:
+            OSError: inotify が使えない場合（PollingWatcher にフォールバックする）
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs: Dict[int, Path] = {}
+        self._paths: Set[Path] = set()
+        self.overflowed = False
+        self.update(paths)
+
+    def update(self, paths: Iterable[Path]):
+        """監視対象を置き換える（新しいディレクトリだけ監視を追加）"""
+        self._paths = {Path(path) for path in paths}
+        watched = set(self._dirs.values())
+        for directory in sorted({path.parent for path in self._paths} - watched):
+            if not directory.is_dir():
+                continue  # 次のグラフ更新（ファイルの作成後）で追加される
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+            self._dirs[wd] = directory
+
+    def changes(self, timeout: Optional[float] = None) -> Set[Path]:
+        """
+        変更されたファイルを待つ
+
+        キューがあふれた場合（IN_Q_OVERFLOW）は overflowed を立てて
+        監視中の全ファイルを変更扱いにする。
+
+        Args:
+            timeout: 最大待ち時間（秒、Noneで変更があるまで）
+
+        Returns:
+            変更されたファイル（タイムアウト時は空）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return set()
+
+            changed = set()
+            for wd, mask, name in self._read_events():
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    changed.update(self._paths)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is not None and name:
+                    path = directory / name
+                    if path in self._paths:
+                        changed.add(path)
+            if changed:
+                return changed
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        """inotify のファイル記述子を閉じる"""
+        os.close(self._fd)
+
+
+def make_watcher(paths: Iterable[Path], poll: bool = False, interval: float = DEFAULT_INTERVAL):
+    """
+    inotify（使えない場合はポーリング）の監視を作成
+
+    Returns:
+        InotifyWatcher または PollingWatcher
+    """
+    paths = list(paths)
+    if not poll:
+        try:
+            return InotifyWatcher(paths)
+        except OSError as e:
+            print(f"⚠️  inotify unavailable ({e}), polling every {interval}s")
+    return PollingWatcher(paths, interval)
+
+
+def source_files(nodes: Dict[str, BuildNode]) -> Set[str]:
+    """どのノードも出力しない入力ファイル（人が編集・生成するソース）"""
+    outputs = {output for node in nodes.values() for output in node.outputs}
+    return {path for node in nodes.values() for path in node.inputs if path not in outputs}
+
+
+def with_dependents(nodes: Dict[str, BuildNode], names: Iterable[str]) -> Set[str]:
+    """
+    ノードとその下流（それらの出力を入力とするノード）すべて
+
+    Returns:
+        ノード名の集合
+    """
+    affected = set(names)
+    dependents: Dict[str, List[str]] = {}
+    for name, node in nodes.items():
+        for dep in node.deps:
+            dependents.setdefault(dep, []).append(name)
+
+    stack = list(affected)
+    while stack:
+        for name in dependents.get(stack.pop(), []):
+            if name not in affected:
+                affected.add(name)
+                stack.append(name)
+    return affected
+
+
+def affected_nodes(nodes: Dict[str, BuildNode], changed: Set[str]) -> Set[str]:
+    """変更されたファイルを入力とするノードと、その下流のノード"""
+    return with_dependents(nodes, [name for name, node in nodes.items() if changed.intersection(node.inputs)])
+
+
+def watched_nodes(nodes: Dict[str, BuildNode], targets: List[str]) -> Dict[str, BuildNode]:
+    """
+    監視するノード（ターゲットとその下流、それらの依存ノード）
+
+    --atlas 指定時はアトラスが全シートに依存するため、全アセットが対象になる。
+    """
+    if not targets:
+        return nodes
+    select_nodes(nodes, targets)  # 未知のターゲットを検出
+    return select_nodes(nodes, sorted(with_dependents(nodes, targets)))
+
+
+def load_prompts() -> Dict[str, Dict]:
+    """アセット定義（PROMPTS）を読み直す"""
+    return importlib.reload(generate_asset_with_dalle).PROMPTS
+
+
+def _warm_up() -> int:
+    """ワーカーで重いモジュールを先に import しておく（初回の変更を速くする）"""
+    import convert_dalle_to_pixelart  # noqa: F401
+    import create_sprite_sheet  # noqa: F401
+    import pack_atlas  # noqa: F401
+    import godot_resources  # noqa: F401
+    return os.getpid()
+
+
+def watch(
+    base_dir: Path,
+    targets: List[str],
+    placeholder_player: bool = False,
+    atlas: Optional[str] = None,
+    jobs: Optional[int] = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    poll: bool = False,
+    interval: float = DEFAULT_INTERVAL
+):
+    """
+    ソースを監視して再ビルドし続ける（Ctrl+C で終了）
+
+    Args:
+        base_dir: プロジェクトルート
+        targets: 監視するアセット名（空で全て）
+        placeholder_player: build_assets.py --placeholder-player と同じ
+        atlas: 全シートをまとめるアトラスの出力パス（拡張子なし）
+        jobs: ワーカー数（NoneでCPUコア数）
+        debounce: 最後のイベントからこの秒数だけ新しいイベントがなければ再ビルドする
+        poll: inotify を使わずポーリングする
+        interval: ポーリング間隔（秒）
+    """
+    manifest = Path(generate_asset_with_dalle.__file__).resolve()
+    prompts = generate_asset_with_dalle.PROMPTS
+    nodes = watched_nodes(build_graph(placeholder_player, base_dir, atlas, prompts), targets)
+    workers = jobs or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(_warm_up) for _ in range(workers)]:
+            future.result()
+
+        # 監視を始める前の変更を取りこぼさないよう、先に古いノードをビルドする
+        build(nodes, base_dir, executor=executor)
+
+        watcher = make_watcher(
+            [manifest] + [base_dir / path for path in source_files(nodes)], poll, interval
+        )
+        print()
+        print(f"👀 Watching {len(source_files(nodes))} source file(s) and {manifest.name} "
+              f"({type(watcher).__name__}, {workers} worker(s)). Press Ctrl+C to stop.")
+
+        try:
+            while True:
+                changed = watcher.changes()
+                first_event = time.perf_counter()
+                while True:
+                    more = watcher.changes(debounce)
+                    if not more:
+                        break
+                    changed |= more
+
+                if manifest in changed:
+                    try:
+                        prompts = load_prompts()
+                    except Exception as e:
+                        # 保存途中の構文エラーなど。次の保存で読み直す
+                        print(f"❌ {manifest.name}: {e}")
+                        continue
+                try:
+                    nodes = watched_nodes(build_graph(placeholder_player, base_dir, atlas, prompts), targets)
+                except ValueError as e:
+                    print(f"❌ Error: {e}")
+                    continue
+
+                sources = {path.relative_to(base_dir).as_posix() for path in changed if path != manifest}
+                if manifest in changed or watcher.overflowed:
+                    # 定義の変更はパラメータのハッシュで判定させる（変わっていないノードは飛ばされる）
+                    selected = set(nodes)
+                    watcher.overflowed = False
+                else:
+                    selected = affected_nodes(nodes, sources)
+
+                watcher.update([manifest] + [base_dir / path for path in source_files(nodes)])
+                if not selected:
+                    continue
+
+                print()
+                print(f"🔄 Changed: {', '.join(sorted(path.name for path in changed))}")
+                build(select_nodes(nodes, sorted(selected)), base_dir, executor=executor)
+                print(f"⚡ Rebuilt in {time.perf_counter() - first_event:.2f}s after the change")
+        except KeyboardInterrupt:
+            print()
+            print("👋 Stopped watching")
+        finally:
+            watcher.close()
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="Watch sprite sources and the asset definitions, rebuilding only what changed")
+    parser.add_argument("targets", nargs="*", help="Asset names to watch (default: all)")
+    parser.add_argument("--jobs", "-j", type=int, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--atlas", help="Also keep an atlas of all sheets up to date (output path without extension)")
+    parser.add_argument(
+        "--placeholder-player",
+        action="store_true",
+        help="Build player sheets from create_simple_player_sprite.py shapes"
+    )
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help=f"Quiet period before rebuilding, in seconds (default: {DEFAULT_DEBOUNCE})")
+    parser.add_argument("--poll", action="store_true", help="Poll file mtimes instead of using inotify")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Polling interval in seconds (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--base-dir", help=f"Project root (default: {generate_asset_with_dalle.BASE_DIR})")
+    args = parser.parse_args()
+
+    base_dir = Path(args.base_dir).resolve() if args.base_dir else generate_asset_with_dalle.BASE_DIR
+
+    try:
+        watch(base_dir, args.targets, args.placeholder_player, args.atlas, args.jobs,
+              args.debounce, args.poll, args.interval)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()